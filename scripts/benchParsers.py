@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the NEET and IIITD parsing stages
+Runs each stage on its own over fixed synthetic fixtures and reports
+rows/sec and peak memory, so a change to detect_columns,
+lookup_r1_category, convert_to_orcr_format etc. shows up as a number.
+
+Fixtures are generated from a fixed seed (FIXTURE_SEED): pre-extracted
+tabula DataFrames in the dual-column R2 layout, an R1 NDJSON of realistic
+size and OCR text in the IIITD layout for parse_table. Nothing is read
+from a PDF, so no Java, poppler, tesseract or network is needed, only the
+parsers' Python packages.
+
+Timing is the best of --repeat runs. Peak memory is the tracemalloc peak
+of one extra run, so the tracing overhead doesn't skew the timings.
+Results are compared with a stored baseline; a stage more than
+--tolerance slower, or using that much more memory, is a regression and
+the exit status is 1.
+
+Usage:
+    python scripts/benchParsers.py                     # compare with .benchBaseline.json
+    python scripts/benchParsers.py --save-baseline     # record the current numbers
+    python scripts/benchParsers.py --only lookup_r1_category --repeat 5
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import parseNeetPgR1_final as r1_parser
+import parseNeetPgR2_optimized as r2_parser
+import scrapIIITD
+from instituteCache import InstituteCache
+from orcrExport import write_ndjson
+
+
+# Bump when the fixtures change; baselines of another version are not compared
+FIXTURE_VERSION = 2
+FIXTURE_SEED = 20250101
+
+DEFAULT_BASELINE = ".benchBaseline.json"
+DEFAULT_TOLERANCE = 0.15
+
+# Fixture sizes at --scale 1
+R2_TABLES = 40
+R2_ROWS_PER_TABLE = 500
+R1_ORCR_ROWS = 12_000
+R1_QUERIES = 20_000
+
+# Share of R1 rows whose institute the PDF cut to the lookup's 30-char prefix
+R1_TRUNCATED_SHARE = 0.2
+R1_PREFIX_LENGTH = 30
+IIITD_BLOCKS = 200
+
+
+# -------------------- FIXTURES --------------------
+
+CITIES = [
+    ("Kozhikode", "Kerala"), ("Vellore", "Tamil Nadu"), ("Pune", "Maharashtra"),
+    ("Lucknow", "Uttar Pradesh"), ("Jaipur", "Rajasthan"), ("Patna", "Bihar"),
+    ("Hyderabad", "Telangana"), ("Bhopal", "Madhya Pradesh"), ("Cuttack", "Odisha"),
+    ("Guwahati", "Assam"), ("Mysuru", "Karnataka"), ("Surat", "Gujarat"),
+]
+INSTITUTE_KINDS = [
+    "Government Medical College", "Medical College and Hospital", "Institute of Medical Sciences",
+    "Dental College", "Post Graduate Institute of Medical Education and Research",
+]
+COURSES = [
+    "MD (General Medicine)", "MS (General Surgery)", "MD (Paediatrics)", "MD (Radio- Diagnosis)",
+    "MD (Anaesthesiology)", "MS (Orthopaedics)", "MD (Dermatology, Venereology and Leprosy)",
+    "MS (Obstetrics and Gynaecology)", "MD (Psychiatry)", "MD (Pathology)", "DNB (Family Medicine)",
+    "MS (Ophthalmology)", "MD (Community Medicine)", "MDS (Orthodontics)",
+]
+QUOTAS = ["All India", "Open Seat Quota", "Deemed/Paid Seats Quota", "Management/Paid Seats Quota"]
+CATEGORIES = ["Open", "OBC", "SC", "ST", "EWS", "Open PwD", "OBC PwD"]
+R2_HEADER = ["Rank", "R1 Quota", "R1 Institute", "R1 Course", "R1 Allotted Category",
+             "R1 Candidate Category", "R1 Remarks", "R2 Quota", "R2 Institute", "R2 Course",
+             "R2 Allotted Category", "R2 Candidate Category", "R2 Remarks"]
+
+IIITD_PROGRAMS = ["CSAM", "CSAI", "CSB", "CSD", "CSE", "CSSS", "ECE", "EVE"]
+IIITD_CATEGORIES = ["GENN", "GENW", "GEND", "GENWD", "OBCN", "OBCD", "SCN", "SCD", "STN", "EWSN"]
+
+
+def make_institutes(rng, count=400):
+    """Raw comma-separated institute strings, address noise included."""
+    institutes = []
+    for i in range(count):
+        city, state = rng.choice(CITIES)
+        name = f"{rng.choice(INSTITUTE_KINDS)} {city} {i}"
+        parts = [name, f"{rng.randint(1, 200)} Main Road", city, state, str(rng.randint(110001, 855999))]
+        if rng.random() < 0.2:
+            parts.insert(2, f"Near {rng.choice(CITIES)[0]} Bus Stand")
+        institutes.append(", ".join(parts))
+    return institutes
+
+
+def make_r2_tables(rng, institutes, scale):
+    """Pre-extracted tabula DataFrames in the dual-column R1/R2 layout."""
+    tables = []
+    rank = 0
+    for _ in range(max(1, int(R2_TABLES * scale))):
+        rows = [R2_HEADER]
+        for _ in range(R2_ROWS_PER_TABLE):
+            rank += rng.randint(1, 4)
+            r1 = [rng.choice(QUOTAS), rng.choice(institutes), rng.choice(COURSES),
+                  rng.choice(CATEGORIES), rng.choice(CATEGORIES), ""]
+            roll = rng.random()
+            if roll < 0.55:
+                r2 = [rng.choice(QUOTAS), rng.choice(institutes), rng.choice(COURSES),
+                      rng.choice(CATEGORIES), rng.choice(CATEGORIES), "Fresh Allotted in 2nd Round"]
+            elif roll < 0.8:
+                r2 = ["-", "-", "-", "-", "-", "Did not opt for Upgradation"]
+            else:
+                r2 = ["", "", "", "", "", ""]
+            rows.append([str(rank)] + r1 + r2)
+        tables.append(pd.DataFrame(rows))
+    return tables
+
+
+def make_r1_records(rng, institutes, scale):
+    """Consolidated R1 ORCR rows, as parseNeetPgR1_final.py writes them."""
+    records = []
+    rank = 0
+    for _ in range(max(1, int(R1_ORCR_ROWS * scale))):
+        open_rank = rank + rng.randint(1, 3)
+        rank = open_rank + rng.randint(0, 12)
+        institute = rng.choice(institutes).split(",")[0]
+        if rng.random() < R1_TRUNCATED_SHARE:
+            institute = institute[:R1_PREFIX_LENGTH]
+        records.append({
+            "year": 2025, "round": 1, "type": "NEET_PG", "exam": "NEET_PG",
+            "institute": institute,
+            "academicProgramName": rng.choice(COURSES),
+            "quota": rng.choice(QUOTAS),
+            "seatType": rng.choice(CATEGORIES),
+            "gender": "Gender-Neutral",
+            "openRank": open_rank,
+            "closeRank": rank,
+        })
+    return records
+
+
+def make_r1_queries(rng, records, institutes, scale):
+    """
+    (rank, institute, course, quota) lookups hitting every fallback tier.
+    R2 rows carry the full name of a truncated R1 institute, so those
+    resolve on the institute prefix.
+    """
+    full_names = {}
+    for raw in institutes:
+        name = raw.split(",")[0]
+        if len(name) > R1_PREFIX_LENGTH:
+            full_names.setdefault(name[:R1_PREFIX_LENGTH], name)
+
+    queries = []
+    for _ in range(max(1, int(R1_QUERIES * scale))):
+        r = rng.choice(records)
+        institute = full_names.get(r["institute"], r["institute"])
+        rank = rng.randint(r["openRank"], r["closeRank"])
+        roll = rng.random()
+        if roll < 0.5:
+            queries.append((rank, institute, r["academicProgramName"], r["quota"]))
+        elif roll < 0.7:
+            queries.append((rank, institute + " and Research Centre", r["academicProgramName"], r["quota"]))
+        elif roll < 0.85:
+            queries.append((rank, institute, r["academicProgramName"] + " (3 Years)", r["quota"]))
+        else:
+            queries.append((rank, "Unknown Institute", "Unknown Course", rng.choice(QUOTAS)))
+    return queries
+
+
+def make_r2_entries(rng, institutes, count):
+    """Normalized entries as iter_neet_r2_entries yields them."""
+    return [{
+        "rank": i + 1,
+        "quota": rng.choice(QUOTAS),
+        "institute": rng.choice(institutes),
+        "course": rng.choice(COURSES),
+        "category": rng.choice(CATEGORIES),
+        "candidate_category": rng.choice(CATEGORIES),
+        "used_r1": False,
+    } for i in range(count)]
+
+
+def make_iiitd_text(rng, scale):
+    """OCR output in the IIITD cutoff layout: header, then code + (rank, JEE rank) pairs."""
+    lines = []
+    for _ in range(max(1, int(IIITD_BLOCKS * scale))):
+        lines.append("Category IIITD " + " ".join(IIITD_PROGRAMS))
+        for code in IIITD_CATEGORIES:
+            cells = []
+            for _ in IIITD_PROGRAMS:
+                if rng.random() < 0.1:
+                    cells += ["-", "-"]
+                else:
+                    cells += [str(rng.randint(1, 900)), str(rng.randint(1000, 90000))]
+            lines.append(" ".join([code] + cells))
+        lines.append("")
+    return "\n".join(lines)
+
+
+class Fixtures:
+    """Every fixture, built once from FIXTURE_SEED."""
+
+    def __init__(self, scale, tmp_dir):
+        rng = random.Random(FIXTURE_SEED)
+        self.institutes = make_institutes(rng)
+        self.r2_tables = make_r2_tables(rng, self.institutes, scale)
+        self.r2_rows = sum(len(t) - 1 for t in self.r2_tables)
+        self.r1_records = make_r1_records(rng, self.institutes, scale)
+        self.r1_queries = make_r1_queries(rng, self.r1_records, self.institutes, scale)
+        self.r2_entries = make_r2_entries(rng, self.institutes, self.r2_rows)
+        self.iiitd_text = make_iiitd_text(rng, scale)
+        self.detect_rows = [t.iloc[i].tolist() for t in self.r2_tables[:4] for i in range(1, len(t))]
+
+        self.r1_path = os.path.join(tmp_dir, "neetPgR1_bench.ndjson")
+        write_ndjson(self.r1_records, self.r1_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.r1_index = r2_parser.load_r1_data(self.r1_path)
+
+
+# -------------------- BENCHMARKS --------------------
+
+def bench_detect_columns(fx):
+    def run():
+        for row in fx.detect_rows:
+            r2_parser.detect_columns(row)
+    return run, len(fx.detect_rows)
+
+
+def bench_resolve_table_rows(fx):
+    def run():
+        layout_cache = {}
+        for table in fx.r2_tables:
+            r2_parser.resolve_table_rows(table.iloc[1:], layout_cache)
+    return run, fx.r2_rows
+
+
+def bench_lookup_r1_category(fx):
+    def run():
+        for rank, institute, course, quota in fx.r1_queries:
+            r2_parser.lookup_r1_category(fx.r1_index, rank, institute, course, quota)
+    return run, len(fx.r1_queries)
+
+
+def bench_load_r1_data(fx):
+    def run():
+        r2_parser.load_r1_data(fx.r1_path)
+    return run, len(fx.r1_records)
+
+
+def bench_iter_neet_r2_entries(fx):
+    def run():
+        stats = r2_parser.new_extraction_stats()
+        for _ in r2_parser.iter_neet_r2_entries(iter(fx.r2_tables), fx.r1_index, stats):
+            pass
+    return run, fx.r2_rows
+
+
+def bench_convert_r2(fx):
+    def run():
+        # Cold institute cache each run, so extract_institute_and_place is included
+        r2_parser.convert_to_orcr_format(fx.r2_entries, InstituteCache(r2_parser.extract_institute_and_place))
+    return run, len(fx.r2_entries)
+
+
+def bench_convert_r1(fx):
+    def run():
+        r1_parser.convert_to_orcr_format(fx.r2_entries, InstituteCache(r1_parser.extract_institute_and_place))
+    return run, len(fx.r2_entries)
+
+
+def bench_parse_table(fx):
+    lines = fx.iiitd_text.count("\n") + 1
+
+    def run():
+        scrapIIITD.parse_table(fx.iiitd_text)
+    return run, lines
+
+
+BENCHMARKS = {
+    "detect_columns": bench_detect_columns,
+    "resolve_table_rows": bench_resolve_table_rows,
+    "lookup_r1_category": bench_lookup_r1_category,
+    "load_r1_data": bench_load_r1_data,
+    "iter_neet_r2_entries": bench_iter_neet_r2_entries,
+    "convert_to_orcr_format_r2": bench_convert_r2,
+    "convert_to_orcr_format_r1": bench_convert_r1,
+    "parse_table": bench_parse_table,
+}
+
+
+# -------------------- RUNNER --------------------
+
+def measure(run, rows, repeat):
+    """Best-of-repeat rows/sec and the tracemalloc peak of one more run."""
+    best = float("inf")
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "rows": rows,
+        "seconds": round(best, 5),
+        "rows_per_sec": round(rows / best, 1) if best > 0 else None,
+        "peak_kb": peak // 1024,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Print results against the baseline. Returns the names of regressed stages."""
+    regressed = []
+    print(f"{'stage':<28}{'rows/sec':>14}{'baseline':>14}{'Δ':>9}{'peak MB':>10}{'Δ':>9}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        speed = f"{result['rows_per_sec']:>14,.0f}"
+        memory = f"{result['peak_kb'] / 1024:>10.1f}"
+        if base is None:
+            print(f"{name:<28}{speed}{'-':>14}{'':>9}{memory}")
+            continue
+
+        speed_delta = result["rows_per_sec"] / base["rows_per_sec"] - 1
+        memory_delta = (result["peak_kb"] + 1) / (base["peak_kb"] + 1) - 1
+        flag = ""
+        if speed_delta < -tolerance or memory_delta > tolerance:
+            regressed.append(name)
+            flag = "  ⚠ REGRESSION"
+        print(f"{name:<28}{speed}{base['rows_per_sec']:>14,.0f}{speed_delta:>+9.1%}"
+              f"{memory}{memory_delta:>+9.1%}{flag}")
+    return regressed
+
+
+def load_baseline(path, scale):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return None
+    if baseline.get("fixture_version") != FIXTURE_VERSION or baseline.get("scale") != scale:
+        print(f"⚠ {path} was recorded with other fixtures (version {baseline.get('fixture_version')}, "
+              f"scale {baseline.get('scale')}); not comparing")
+        return None
+    return baseline
+
+
+# -------------------- MAIN --------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the NEET and IIITD parsing stages")
+    parser.add_argument("--only", action="append", choices=list(BENCHMARKS), metavar="STAGE",
+                        help=f"run only these stages; repeatable ({', '.join(BENCHMARKS)})")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage; the best counts (default: 3)")
+    parser.add_argument("--scale", type=float, default=1.0, help="fixture size multiplier (default: 1)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help=f"baseline JSON to compare with (default: {DEFAULT_BASELINE})")
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"allowed slowdown / memory growth before a stage counts as regressed "
+                             f"(default: {DEFAULT_TOLERANCE})")
+    parser.add_argument("--out", metavar="JSON_PATH", help="also write the results to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    names = args.only or list(BENCHMARKS)
+
+    print("=" * 60)
+    print(f"Parser benchmarks (fixtures v{FIXTURE_VERSION}, scale {args.scale}, best of {args.repeat})")
+    print("=" * 60)
+
+    tmp_dir = tempfile.mkdtemp(prefix="bench-parsers-")
+    try:
+        start = time.perf_counter()
+        fixtures = Fixtures(args.scale, tmp_dir)
+        print(f"📦 Fixtures built in {time.perf_counter() - start:.1f}s: {len(fixtures.r2_tables)} R2 tables "
+              f"({fixtures.r2_rows} rows), {len(fixtures.r1_records)} R1 rows, "
+              f"{len(fixtures.r1_queries)} R1 lookups\n")
+
+        results = {}
+        for name in names:
+            run, rows = BENCHMARKS[name](fixtures)
+            results[name] = measure(run, rows, max(1, args.repeat))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    report = {
+        "fixture_version": FIXTURE_VERSION,
+        "scale": args.scale,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "pandas": pd.__version__,
+        "results": results,
+    }
+
+    baseline = None if args.save_baseline else load_baseline(args.baseline, args.scale)
+    regressed = compare(results, (baseline or {}).get("results", {}), args.tolerance)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Results written to {args.out}")
+
+    if args.save_baseline:
+        # Keep stages that weren't rerun (--only) from a compatible baseline
+        previous = load_baseline(args.baseline, args.scale)
+        if previous is not None:
+            report["results"] = {**previous["results"], **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Baseline saved to {args.baseline}")
+    elif baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one")
+
+    if regressed:
+        print(f"\n❌ Regressed beyond {args.tolerance:.0%}: {', '.join(regressed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Fuzzy institute -> College resolver
+Matches parsed institute strings ("Govt. Medical College, Kozhikode") to
+existing College rows even when spelling, punctuation or abbreviations
+differ, so spelling variants stop turning into new colleges.
+
+College names are normalized and indexed by character trigram. A query
+reads only the postings of its rarer trigrams (blocking), counts shared
+trigrams per college with one numpy bincount, and scores just the top few
+candidates exactly (Dice over trigram sets), instead of comparing every
+string pairwise.
+
+Names that share a long prefix but differ in place ("Government Medical
+College Kozhikode" / "... Kottayam") score high on trigrams alone, so a
+candidate is rejected when both names carry a distinctive word (not an
+institution word like "college" or "hospital") that the other lacks even
+approximately.
+
+Usage:
+    python scripts/collegeResolver.py neet/neetPgR2_2025_optimized.ndjson --colleges scripts/clgMap.json
+    python scripts/collegeResolver.py neet/neetPgR2_2025_optimized.ndjson --db prisma/prisma/db.sqlite --out matches.json
+"""
+
+import argparse
+import functools
+import json
+import re
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+
+# Minimum score for resolve() to accept a match
+DEFAULT_THRESHOLD = 0.8
+
+# Blocking: trigrams carried by more than this share of colleges are too
+# common to narrow anything down (at least MIN_BLOCK_TRIGRAMS are kept)
+COMMON_TRIGRAM_SHARE = 0.02
+MIN_BLOCK_TRIGRAMS = 3
+
+# Candidates from the block that get an exact score
+MAX_CANDIDATES = 8
+
+# Two words are spelling variants of each other at this trigram score
+WORD_MATCH = 0.5
+
+
+ABBREVIATIONS = {
+    "govt": "government",
+    "gov": "government",
+    "med": "medical",
+    "medl": "medical",
+    "coll": "college",
+    "clg": "college",
+    "inst": "institute",
+    "instt": "institute",
+    "hosp": "hospital",
+    "univ": "university",
+    "sci": "sciences",
+    "science": "sciences",
+    "res": "research",
+    "dr": "doctor",
+    "st": "saint",
+    "&": "and",
+}
+
+STOP_WORDS = {"of", "the", "and"}
+
+# Words that name the kind of institution rather than which one it is;
+# variants add or drop them freely ("... College and Hospital")
+INSTITUTION_WORDS = {
+    "government", "medical", "college", "hospital", "institute", "sciences",
+    "research", "university", "centre", "center",
+}
+
+
+# -------------------- NORMALIZATION --------------------
+
+def normalize(name: str) -> str:
+    """Lowercase, drop punctuation, expand common abbreviations."""
+    text = name.lower().replace("&", " & ")
+    tokens = re.findall(r"[a-z0-9]+|&", text)
+    tokens = [ABBREVIATIONS.get(t, t) for t in tokens]
+    return " ".join(t for t in tokens if t not in STOP_WORDS)
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of a normalized name, padded at word edges."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def dice(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def distinctive_words(text: str) -> set:
+    """Words of a normalized name that tell two institutions apart (places, founders)."""
+    return {w for w in text.split() if w not in INSTITUTION_WORDS and not w.isdigit()}
+
+
+@functools.lru_cache(maxsize=65536)
+def same_word(a: str, b: str) -> bool:
+    """Spelling variants: one edit apart, run into a neighbour, or close on trigrams."""
+    if a in b or b in a:
+        return True
+    if abs(len(a) - len(b)) <= 1:
+        i = 0
+        while i < min(len(a), len(b)) and a[i] == b[i]:
+            i += 1
+        if a[i + (len(a) >= len(b)):] == b[i + (len(b) >= len(a)):]:
+            return True
+    return dice(trigrams(a), trigrams(b)) >= WORD_MATCH
+
+
+def words_conflict(a: set, b: set) -> bool:
+    """
+    True when each of two distinctive word sets has a word the other lacks,
+    not even as a spelling variant: kozhikode vs kottayam conflict,
+    kozhikode vs kozhikkode don't.
+    """
+    only_a, only_b = a - b, b - a
+    if not only_a or not only_b:
+        return False
+    return (any(not any(same_word(w, o) for o in only_b) for w in only_a)
+            and any(not any(same_word(w, o) for o in only_a) for w in only_b))
+
+
+# -------------------- RESOLVER --------------------
+
+class CollegeResolver:
+    """
+    Trigram-blocked index over College names.
+    resolve(institute) returns (college_id, name, score) for the best
+    match at or above the threshold, or None.
+    """
+
+    def __init__(self, colleges, threshold=DEFAULT_THRESHOLD):
+        """colleges: {name: id}"""
+        self.threshold = threshold
+        self._names = []
+        self._ids = []
+        self._exact = {}
+        self._memo = {}
+
+        self._grams = []
+        self._words = []
+
+        postings = defaultdict(list)
+        for name, college_id in colleges.items():
+            norm = normalize(name)
+            i = len(self._names)
+            self._names.append(name)
+            self._ids.append(college_id)
+            self._exact.setdefault(norm, i)
+            self._words.append(distinctive_words(norm))
+            grams = trigrams(norm)
+            self._grams.append(grams)
+            for gram in grams:
+                postings[gram].append(i)
+
+        self._postings = {g: np.array(p, dtype=np.int32) for g, p in postings.items()}
+        self._common = max(MAX_CANDIDATES, int(len(self._names) * COMMON_TRIGRAM_SHARE))
+
+    @classmethod
+    def from_json(cls, path, threshold=DEFAULT_THRESHOLD):
+        """Seed from a {name: id} map such as scripts/clgMap.json."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), threshold)
+
+    @classmethod
+    def from_db(cls, db_path, threshold=DEFAULT_THRESHOLD):
+        """Seed from the College table of a SQLite database."""
+        conn = sqlite3.connect(db_path)
+        try:
+            colleges = dict(conn.execute('SELECT "name", "id" FROM "College"'))
+        finally:
+            conn.close()
+        return cls(colleges, threshold)
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, name, college_id):
+        """Index a college created after construction, so later rows resolve to it."""
+        norm = normalize(name)
+        i = len(self._names)
+        self._names.append(name)
+        self._ids.append(college_id)
+        self._exact.setdefault(norm, i)
+        self._words.append(distinctive_words(norm))
+        grams = trigrams(norm)
+        self._grams.append(grams)
+        for gram in grams:
+            posting = self._postings.get(gram)
+            self._postings[gram] = (np.array([i], dtype=np.int32) if posting is None
+                                    else np.append(posting, np.int32(i)))
+        self._common = max(MAX_CANDIDATES, int(len(self._names) * COMMON_TRIGRAM_SHARE))
+        # Earlier results (including misses) may no longer be the best match
+        self._memo.clear()
+
+    def best_match(self, *texts):
+        """
+        Return (index, score) of the college closest to any of texts, or
+        (None, 0.0). Candidates are blocked on the first text's trigrams,
+        so pass the most specific variant first.
+        """
+        norms = [normalize(t) for t in texts]
+        for norm in norms:
+            if norm in self._exact:
+                return self._exact[norm], 1.0
+
+        variants = [trigrams(norm) for norm in norms]
+        words = set().union(*(distinctive_words(norm) for norm in norms))
+        known = [self._postings[g] for g in variants[0] if g in self._postings]
+        if not known:
+            return None, 0.0
+
+        known.sort(key=len)
+        rare = [p for p in known if len(p) <= self._common]
+        block = rare if len(rare) >= MIN_BLOCK_TRIGRAMS else known[:MIN_BLOCK_TRIGRAMS]
+
+        # Shared rare-trigram counts for every college in the block at once
+        overlap = np.bincount(np.concatenate(block))
+        candidates = np.flatnonzero(overlap)
+        if len(candidates) > MAX_CANDIDATES:
+            top = np.argpartition(overlap[candidates], -MAX_CANDIDATES)[-MAX_CANDIDATES:]
+            candidates = candidates[top]
+
+        best, best_score = None, 0.0
+        for i in candidates.tolist():
+            if words_conflict(words, self._words[i]):
+                continue
+            college_grams = self._grams[i]
+            for grams in variants:
+                score = dice(grams, college_grams)
+                if score > best_score:
+                    best, best_score = i, score
+        return best, best_score
+
+    def match(self, institute: str):
+        """
+        Best (college_id, name, score) for an institute string, scoring both
+        the full string and the name before the first comma. None if no
+        college shares a trigram with it.
+        """
+        if institute in self._memo:
+            return self._memo[institute]
+
+        name = institute.split(",")[0].strip()
+        if name and name != institute:
+            # Block on the bare name: place trigrams mostly add noise
+            best, best_score = self.best_match(name, institute)
+        else:
+            best, best_score = self.best_match(institute)
+
+        result = None
+        if best is not None:
+            result = (self._ids[best], self._names[best], round(best_score, 4))
+        self._memo[institute] = result
+        return result
+
+    def resolve(self, institute: str):
+        """match(), but only if the score reaches the threshold."""
+        result = self.match(institute)
+        if result is None or result[2] < self.threshold:
+            return None
+        return result
+
+
+# -------------------- MAIN --------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Resolve parsed institute strings to College rows")
+    parser.add_argument("input", help="parser output (.ndjson) with an institute field per row")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--colleges", metavar="JSON_PATH", help="{name: id} college map, e.g. scripts/clgMap.json")
+    source.add_argument("--db", metavar="SQLITE_PATH", help="SQLite database with a College table")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"minimum score to accept a match (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--out", metavar="JSON_PATH",
+                        help="write {institute: {id, name, score}} for every match to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    from orcrExport import iter_ndjson
+
+    if args.colleges:
+        resolver = CollegeResolver.from_json(args.colleges, args.threshold)
+    else:
+        resolver = CollegeResolver.from_db(args.db, args.threshold)
+    print(f"📚 Indexed {len(resolver)} colleges")
+
+    institutes = sorted({row["institute"] for row in iter_ndjson(args.input)})
+    print(f"📄 {len(institutes)} distinct institute strings in {args.input}")
+
+    start = time.perf_counter()
+    matches = {}
+    for institute in institutes:
+        result = resolver.resolve(institute)
+        if result is not None:
+            college_id, name, score = result
+            matches[institute] = {"id": college_id, "name": name, "score": score}
+    elapsed = time.perf_counter() - start
+
+    print(f"✓ Resolved {len(matches)}/{len(institutes)} institutes in {elapsed:.3f}s "
+          f"(threshold {args.threshold})")
+
+    fuzzy = [(k, v) for k, v in matches.items() if v["score"] < 1.0]
+    if fuzzy:
+        print("\nFuzzy matches (sample):")
+        for institute, m in fuzzy[:10]:
+            print(f"  {m['score']:.2f}  {institute}  →  {m['name']}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(matches, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Matches written to {args.out}")
+
+    if not matches and institutes:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Synthetic NEET PG allotment data for load testing
+Generates Round 1 and dual-column Round 2 allotment tables at any size
+(e.g. 10k -> 500k rows) so the parsers' scaling can be measured without
+the real PDFs.
+
+Candidates get increasing ranks with growing gaps. Institutes, courses,
+quotas and categories are drawn from skewed (Zipf-like) distributions, so
+a few big institutes and popular courses take most seats, and raw
+institute strings are messy comma-separated addresses (repeated names,
+emails, line breaks, state and pincode tokens). In Round 2 an R1 candidate
+may upgrade, keep their seat, decline ("Did not opt for Upgradation") or
+have blank R2 cells, and candidates without an R1 seat may get a fresh one.
+
+Tables come as a list of DataFrames, one per page with the header row
+first, the way tabula reads the PDFs, so they can be fed straight to
+iter_neet_entries / iter_neet_r2_entries. They can also be written as CSV,
+as the consolidated R1 NDJSON the R2 parser takes with --r1, and, with
+reportlab installed, as ruled-table PDFs for the full parsers.
+
+Usage:
+    python scripts/generateNeetData.py --rows 10000 50000 500000
+    python scripts/generateNeetData.py --rows 20000 --pdf --out neet/synthetic
+"""
+
+import argparse
+import bisect
+import itertools
+import os
+import random
+import sys
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+from orcrConsolidate import RankAccumulator
+from orcrExport import write_ndjson
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Table, TableStyle
+except ImportError:
+    colors = None
+
+
+DEFAULT_SEED = 2025
+
+# Rows per page, i.e. per tabula table
+ROWS_PER_TABLE = 25
+
+# Share of candidates holding an R1 seat; the rest only appear in R2
+R1_ALLOTTED_SHARE = 0.75
+
+# What happens to an R1 seat holder in Round 2
+R2_OUTCOMES = [("upgraded", 0.35), ("retained", 0.25), ("did_not_opt", 0.25), ("blank", 0.15)]
+
+# Share of candidates without an R1 seat who get one in Round 2
+R2_FRESH_SHARE = 0.8
+
+# Share of R2 rows with some cells missing
+MISSING_CELL_SHARE = 0.05
+
+R1_HEADER = ["SNo", "Rank", "Allotted Quota", "Allotted Institute", "Course",
+             "Allotted Category", "Candidate Category", "Remarks"]
+R2_HEADER = ["Rank", "R1 Allotted Quota", "R1 Allotted Institute", "R1 Course",
+             "R1 Allotted Category", "R1 Candidate Category", "R1 Remarks",
+             "R2 Allotted Quota", "R2 Allotted Institute", "R2 Course",
+             "R2 Allotted Category", "R2 Candidate Category", "R2 Remarks"]
+
+Seat = namedtuple("Seat", ["quota", "institute", "course", "category"])
+Dataset = namedtuple("Dataset", ["r1_tables", "r2_tables", "r1_orcr"])
+
+
+# -------------------- DISTRIBUTIONS --------------------
+
+QUOTAS = [
+    ("All India", 45), ("Open Seat Quota", 12), ("Deemed/Paid Seats Quota", 14),
+    ("Management/Paid Seats Quota", 14), ("Non-Resident Indian", 5), ("Delhi University Quota", 3),
+    ("IP University Quota", 2), ("Aligarh Muslim University Quota", 2), ("Armed Forces Medical", 1),
+    ("Jain Minority Quota", 1), ("Muslim Minority Quota", 1),
+]
+
+CATEGORIES = [("Open", 45), ("OBC", 25), ("SC", 13), ("ST", 6), ("EWS", 8),
+              ("Open PwD", 1.2), ("OBC PwD", 0.8), ("SC PwD", 0.5), ("EWS PwD", 0.3), ("ST PwD", 0.2)]
+
+CANDIDATE_CATEGORIES = [("General", 50), ("OBC", 25), ("SC", 10), ("ST", 5), ("EWS", 10)]
+
+COURSES = [
+    "MD (General Medicine)", "MS (General Surgery)", "MD (Radio- Diagnosis)", "MD (Paediatrics)",
+    "MS (Obstetrics and Gynaecology)", "MS (Orthopaedics)", "MD (Dermatology, Venereology and Leprosy)",
+    "MD (Anaesthesiology)", "MD (Pathology)", "MD (Pharmacology)", "MD (Microbiology)",
+    "MS (Ophthalmology)", "MS (ENT)", "MD (Psychiatry)", "MD (Respiratory Medicine)",
+    "MD (Community Medicine)", "MD (Forensic Medicine)", "MD (Physiology)", "MD (Biochemistry)",
+    "MD (Anatomy)", "MD (Emergency Medicine)", "MD (Radiation Oncology)", "MD (Physical Medicine and Rehabilitation)",
+    "DNB (General Medicine)", "DNB (Family Medicine)", "DNB (Paediatrics)", "DNB (Anaesthesiology)",
+    "Diploma in Child Health", "Diploma in Anaesthesia", "MD (Hospital Administration)",
+]
+
+CITIES = [
+    ("Kozhikode", "Kerala"), ("Thiruvananthapuram", "Kerala"), ("Vellore", "Tamil Nadu"),
+    ("Chennai", "Tamil Nadu"), ("Madurai", "Tamil Nadu"), ("Pune", "Maharashtra"),
+    ("Mumbai", "Maharashtra"), ("Nagpur", "Maharashtra"), ("Lucknow", "Uttar Pradesh"),
+    ("Kanpur", "Uttar Pradesh"), ("Agra", "Uttar Pradesh"), ("Jaipur", "Rajasthan"),
+    ("Jodhpur", "Rajasthan"), ("Patna", "Bihar"), ("Darbhanga", "Bihar"), ("Hyderabad", "Telangana"),
+    ("Warangal", "Telangana"), ("Bhopal", "Madhya Pradesh"), ("Indore", "Madhya Pradesh"),
+    ("Cuttack", "Odisha"), ("Guwahati", "Assam"), ("Bengaluru", "Karnataka"), ("Mysuru", "Karnataka"),
+    ("Surat", "Gujarat"), ("Ahmedabad", "Gujarat"), ("Kolkata", "West Bengal"), ("New Delhi", "Delhi (NCT)"),
+    ("Chandigarh", "Chandigarh"), ("Raipur", "Chhattisgarh"), ("Dehradun", "Uttarakhand"),
+    ("Shimla", "Himachal Pradesh"), ("Ranchi", "Jharkhand"), ("Puducherry", "Puducherry"),
+]
+
+INSTITUTE_PATTERNS = [
+    "Government Medical College {city}", "{city} Medical College", "Institute of Medical Sciences {city}",
+    "All India Institute of Medical Sciences {city}", "{founder} Medical College and Hospital",
+    "{founder} Institute of Medical Sciences", "{founder} Memorial Medical College {city}",
+    "Post Graduate Institute of Medical Education and Research {city}",
+    "{founder} Medical College and Research Centre", "ESIC Medical College {city}",
+]
+
+FOUNDERS = ["Sri Ramachandra", "Dr. D.Y. Patil", "Kasturba", "St. Johns", "Mahatma Gandhi", "Sardar Patel",
+            "Rajiv Gandhi", "Sree Gokulam", "Maharaja Agrasen", "Dr. B.R. Ambedkar", "Netaji Subhas",
+            "Lokmanya Tilak", "Guru Gobind Singh", "Swami Vivekanand", "Jawaharlal Nehru"]
+
+STREETS = ["Main Road", "Medical College Road", "Hospital Road", "NH 48", "Ring Road", "Station Road",
+           "Civil Lines", "Mahatma Gandhi Marg", "Cantonment", "Bypass Road"]
+
+
+def weighted(pairs):
+    """(values, cumulative weights) for SeatSampler.pick."""
+    values = [v for v, _ in pairs]
+    return values, list(itertools.accumulate(w for _, w in pairs))
+
+
+def zipf_weights(count, s=0.9):
+    return list(itertools.accumulate(1 / (i + 1) ** s for i in range(count)))
+
+
+# -------------------- INSTITUTES --------------------
+
+def messy_address(rng, name, city, state):
+    """A raw institute string as the allotment PDFs print it."""
+    parts = [name]
+    if rng.random() < 0.15:
+        parts.append(name.upper())  # Name repeated in caps
+    parts.append(f"{rng.randint(1, 400)}, {rng.choice(STREETS)}")
+    if rng.random() < 0.3:
+        parts.append(f"Near {rng.choice(CITIES)[0]} Bus Stand")
+    if rng.random() < 0.1:
+        parts.append(f"dean.{city.lower().replace(' ', '')}@gmail.com")
+    parts.append(city)
+    if rng.random() < 0.05:
+        parts.append(state.upper() + " STATE")  # Malformed state token
+    parts.append(state)
+    parts.append(str(rng.randint(110001, 855999)))
+    raw = ", ".join(parts)
+    if rng.random() < 0.1:
+        raw = raw.replace(", ", ",\r", 1)  # Cell wrapped across lines
+    if rng.random() < 0.05:
+        raw = raw.replace(", ", ",, ", 1)  # Doubled comma
+    return raw
+
+
+def make_institutes(rng, count):
+    """
+    Institutes as (raw strings, canonical "Name, City"). A few have two
+    spellings of their raw string, like real PDFs across pages.
+    """
+    institutes = []
+    seen = set()
+    while len(institutes) < count:
+        city, state = rng.choice(CITIES)
+        name = rng.choice(INSTITUTE_PATTERNS).format(city=city, founder=rng.choice(FOUNDERS))
+        if (name, city) in seen:
+            name = f"{name} {len(institutes)}"
+        seen.add((name, city))
+        raws = [messy_address(rng, name, city, state)]
+        if rng.random() < 0.05:
+            raws.append(messy_address(rng, name.replace("Government", "Govt."), city, state))
+        institutes.append((raws, f"{name}, {city}"))
+    return institutes
+
+
+# -------------------- ALLOTMENTS --------------------
+
+class SeatSampler:
+    """Skewed random seats: (quota, institute index, course, category)."""
+
+    def __init__(self, rng, institute_count):
+        self.rng = rng
+        self.quotas = weighted(QUOTAS)
+        self.categories = weighted(CATEGORIES)
+        self.candidate_categories = weighted(CANDIDATE_CATEGORIES)
+        self.r2_outcomes = weighted(R2_OUTCOMES)
+        self.courses = (COURSES, zipf_weights(len(COURSES), 0.7))
+        self.institutes = (range(institute_count), zipf_weights(institute_count, 0.6))
+
+    def pick(self, table):
+        values, cum_weights = table
+        return values[bisect.bisect(cum_weights, self.rng.random() * cum_weights[-1])]
+
+    def seat(self):
+        return Seat(self.pick(self.quotas), self.pick(self.institutes),
+                    self.pick(self.courses), self.pick(self.categories))
+
+    def candidate_category(self, seat):
+        category = seat.category.replace(" PwD", "")
+        if category == "Open":
+            return self.pick(self.candidate_categories)
+        return category
+
+
+def iter_candidates(rng, count):
+    """Increasing ranks; gaps widen further down the merit list."""
+    rank = 0
+    for i in range(count):
+        rank += 1 + int(rng.expovariate(1.0) * (1 + i / 2000))
+        yield rank
+
+
+def generate(rows, seed=DEFAULT_SEED, rows_per_table=ROWS_PER_TABLE):
+    """
+    Build a Dataset for `rows` Round 2 candidates (about
+    R1_ALLOTTED_SHARE of them also form the Round 1 table).
+    """
+    rng = random.Random(seed)
+    institutes = make_institutes(rng, max(150, min(2500, rows // 80)))
+    sampler = SeatSampler(rng, len(institutes))
+
+    def raw(seat):
+        return rng.choice(institutes[seat.institute][0])
+
+    r1_rows, r2_rows = [], []
+    r1_groups = RankAccumulator()
+
+    for rank in iter_candidates(rng, rows):
+        r1_seat = sampler.seat() if rng.random() < R1_ALLOTTED_SHARE else None
+        if r1_seat is not None:
+            r1_cand = sampler.candidate_category(r1_seat)
+            r1_cells = [r1_seat.quota, raw(r1_seat), r1_seat.course, r1_seat.category, r1_cand]
+            r1_rows.append([str(len(r1_rows) + 1), str(rank)] + r1_cells + [""])
+            r1_groups.add((institutes[r1_seat.institute][1], r1_seat.course, r1_seat.quota,
+                           r1_seat.category, "Gender-Neutral"), rank)
+            r2_r1 = r1_cells + ["Allotted"]
+
+            outcome = sampler.pick(sampler.r2_outcomes)
+            if outcome == "upgraded":
+                seat = sampler.seat()
+                r2 = [seat.quota, raw(seat), seat.course, seat.category,
+                      sampler.candidate_category(seat), "Upgraded"]
+            elif outcome == "retained":
+                r2 = r1_cells + ["No Upgradation"]
+            elif outcome == "did_not_opt":
+                r2 = ["-", "-", "-", "-", "-", rng.choice(["Did not opt for Upgradation",
+                                                           "Not Opted for Upgradation"])]
+            else:
+                r2 = [""] * 6
+        else:
+            r2_r1 = ["-"] * 5 + ["Not Allotted"]
+            if rng.random() < R2_FRESH_SHARE:
+                seat = sampler.seat()
+                r2 = [seat.quota, raw(seat), seat.course, seat.category,
+                      sampler.candidate_category(seat), "Fresh Allotted in 2nd Round"]
+            else:
+                r2 = [""] * 6
+
+        if rng.random() < MISSING_CELL_SHARE:
+            for i in rng.sample(range(6), rng.randint(1, 3)):
+                r2[i] = ""
+        r2_rows.append([str(rank)] + r2_r1 + r2)
+
+    return Dataset(paginate(r1_rows, R1_HEADER, rows_per_table),
+                   paginate(r2_rows, R2_HEADER, rows_per_table),
+                   r1_groups.to_orcr(year=2025, round=1))
+
+
+def paginate(rows, header, rows_per_table):
+    """One DataFrame per page, header row first, like tabula's lattice output."""
+    return [pd.DataFrame([header] + rows[i:i + rows_per_table])
+            for i in range(0, len(rows), rows_per_table)]
+
+
+def to_frame(tables):
+    """All pages as one DataFrame with named columns."""
+    header = tables[0].iloc[0].tolist()
+    frame = pd.concat([t.iloc[1:] for t in tables], ignore_index=True)
+    frame.columns = header
+    return frame
+
+
+# -------------------- OUTPUT --------------------
+
+def write_csv(tables, path):
+    to_frame(tables).to_csv(path, index=False)
+
+
+def write_pdf(tables, path, title):
+    """Ruled-table PDF, one tabula table per page. Needs reportlab."""
+    if colors is None:
+        raise RuntimeError("reportlab is not installed (pip install reportlab)")
+
+    style = ParagraphStyle("cell", fontName="Helvetica", fontSize=5, leading=6)
+    grid = TableStyle([
+        ("GRID", (0, 0), (-1, -1), 0.4, colors.black),
+        ("FONTSIZE", (0, 0), (-1, -1), 5),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("TOPPADDING", (0, 0), (-1, -1), 1),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 1),
+    ])
+    width = landscape(A4)[0] - 40
+    story = []
+    for table in tables:
+        rows = [[Paragraph(str(cell).replace("\r", "<br/>"), style) for cell in row]
+                for row in table.itertuples(index=False)]
+        ncols = len(rows[0])
+        # Institute columns get four times the width of the others
+        wide = {i for i, name in enumerate(table.iloc[0]) if "Institute" in str(name)}
+        units = [4 if i in wide else 1 for i in range(ncols)]
+        widths = [width * u / sum(units) for u in units]
+        pdf_table = Table(rows, colWidths=widths, repeatRows=1)
+        pdf_table.setStyle(grid)
+        pdf_table.hAlign = "LEFT"
+        story.append(pdf_table)
+        story.append(PageBreak())
+
+    doc = SimpleDocTemplate(path, pagesize=landscape(A4), leftMargin=20, rightMargin=20,
+                            topMargin=20, bottomMargin=20, title=title)
+    doc.build(story[:-1])
+
+
+def write_dataset(dataset, out_dir, pdf=False):
+    """Write CSVs, the R1 NDJSON and optionally PDFs to out_dir. Returns the paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {
+        "r1_csv": os.path.join(out_dir, "neet_pg_r1.csv"),
+        "r2_csv": os.path.join(out_dir, "neet_pg_r2.csv"),
+        "r1_ndjson": os.path.join(out_dir, "neetPgR1_synthetic.ndjson"),
+    }
+    write_csv(dataset.r1_tables, paths["r1_csv"])
+    write_csv(dataset.r2_tables, paths["r2_csv"])
+    write_ndjson(dataset.r1_orcr, paths["r1_ndjson"])
+    if pdf:
+        paths["r1_pdf"] = os.path.join(out_dir, "neet_pg_r1.pdf")
+        paths["r2_pdf"] = os.path.join(out_dir, "neet_pg_r2.pdf")
+        write_pdf(dataset.r1_tables, paths["r1_pdf"], "Synthetic NEET PG Round 1 allotments")
+        write_pdf(dataset.r2_tables, paths["r2_pdf"], "Synthetic NEET PG Round 2 allotments")
+    return paths
+
+
+# -------------------- MAIN --------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic NEET PG R1/R2 allotment data")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000],
+                        help="Round 2 candidates per dataset; one dataset per value (default: 10000)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--rows-per-table", type=int, default=ROWS_PER_TABLE,
+                        help=f"rows per page / tabula table (default: {ROWS_PER_TABLE})")
+    parser.add_argument("--out", default="neet/synthetic",
+                        help="output directory; each dataset goes in <out>/<rows>/")
+    parser.add_argument("--pdf", action="store_true", help="also render ruled-table PDFs (needs reportlab)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.pdf and colors is None:
+        print("❌ --pdf needs reportlab (pip install reportlab)")
+        sys.exit(1)
+
+    for rows in args.rows:
+        start = time.perf_counter()
+        dataset = generate(rows, args.seed, args.rows_per_table)
+        r1_count = sum(len(t) - 1 for t in dataset.r1_tables)
+        print(f"🧪 {rows} candidates: {r1_count} R1 rows, {len(dataset.r2_tables)} R2 tables, "
+              f"{len(dataset.r1_orcr)} R1 ORCR rows ({time.perf_counter() - start:.1f}s)")
+
+        paths = write_dataset(dataset, os.path.join(args.out, str(rows)), args.pdf)
+        for path in paths.values():
+            print(f"   ✓ {path}")
+
+    print("\nDone ✔")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Institute canonicalization cache for the NEET PG parsers
+Memoizes extract_institute_and_place in a bounded in-process LRU and,
+optionally, in a local SQLite file shared by later runs, rounds and years.
+
+Disk entries are keyed by the raw institute string and a parser version:
+a hash of the canonicalizer's bytecode and of every helper and constant
+it reaches. Editing the logic (or a keyword list) changes the version, so
+stale results are never reused; comment-only edits keep it.
+
+Several parser processes may share one cache file (runParsers.py runs
+jobs in parallel), so the file is opened in WAL mode, where readers
+never wait for a writer, with a long busy timeout. New entries are
+buffered and written in one short transaction per batch instead of
+holding the write lock while parsing.
+"""
+
+import functools
+import hashlib
+import inspect
+import re
+import sqlite3
+import types
+
+
+DEFAULT_MAXSIZE = 65536
+
+# Pending disk inserts before a commit
+COMMIT_EVERY = 500
+
+# Seconds to wait for another process's write transaction to finish
+BUSY_TIMEOUT = 60.0
+
+
+# -------------------- PARSER VERSION --------------------
+
+def _stable_repr(value):
+    """repr() that doesn't depend on set ordering or string hash seeds."""
+    if isinstance(value, (set, frozenset)):
+        return "{" + ",".join(sorted(_stable_repr(v) for v in value)) + "}"
+    if isinstance(value, dict):
+        items = sorted((_stable_repr(k), _stable_repr(v)) for k, v in value.items())
+        return "{" + ",".join(f"{k}:{v}" for k, v in items) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_stable_repr(v) for v in value) + "]"
+    if isinstance(value, re.Pattern):
+        return f"re({value.pattern!r},{value.flags})"
+    return repr(value)
+
+
+def _hash_code(code, namespace, digest, seen, doc=None):
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _hash_code(const, namespace, digest, seen)
+        elif const is not doc:
+            digest.update(_stable_repr(const).encode())
+    for name in code.co_names:
+        digest.update(name.encode())
+        if name in namespace:
+            _hash_value(namespace[name], digest, seen)
+
+
+def _hash_value(value, digest, seen):
+    if id(value) in seen:
+        return
+    seen.add(id(value))
+
+    if inspect.isfunction(value):
+        _hash_code(value.__code__, value.__globals__, digest, seen, value.__doc__)
+    elif isinstance(value, (str, int, float, bool, bytes, type(None), set,
+                            frozenset, dict, list, tuple, re.Pattern)):
+        digest.update(_stable_repr(value).encode())
+    # Modules, classes and builtins are treated as stable
+
+
+def parser_version(fn) -> str:
+    """Hash of fn's logic and everything it references, for cache keys."""
+    digest = hashlib.sha256()
+    _hash_value(fn, digest, set())
+    return digest.hexdigest()[:16]
+
+
+# -------------------- CACHE --------------------
+
+class InstituteCache:
+    """
+    Callable wrapper around an institute canonicalizer.
+    Looks up the in-process LRU first, then the SQLite file (if any),
+    and only runs the canonicalizer on a miss in both.
+    """
+
+    def __init__(self, canonicalize, db_path=None, maxsize=DEFAULT_MAXSIZE):
+        self._canonicalize = canonicalize
+        self.version = parser_version(canonicalize)
+        self._cached = functools.lru_cache(maxsize=maxsize)(self._resolve)
+        self._db = None
+        self._pending = []
+        self.disk_hits = 0
+
+        if db_path:
+            self._db = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS institute_cache ("
+                    " raw TEXT NOT NULL,"
+                    " version TEXT NOT NULL,"
+                    " canonical TEXT NOT NULL,"
+                    " PRIMARY KEY (raw, version))"
+                )
+
+    def __call__(self, raw_institute: str) -> str:
+        return self._cached(raw_institute)
+
+    def _resolve(self, raw_institute):
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT canonical FROM institute_cache WHERE raw = ? AND version = ?",
+                (raw_institute, self.version),
+            ).fetchone()
+            if row is not None:
+                self.disk_hits += 1
+                return row[0]
+
+        canonical = self._canonicalize(raw_institute)
+
+        if self._db is not None:
+            self._pending.append((raw_institute, self.version, canonical))
+            if len(self._pending) >= COMMIT_EVERY:
+                self._flush()
+
+        return canonical
+
+    def _flush(self):
+        """Write buffered entries in one short transaction."""
+        if self._pending:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO institute_cache (raw, version, canonical) VALUES (?, ?, ?)",
+                    self._pending,
+                )
+            self._pending = []
+
+    def stats(self):
+        info = self._cached.cache_info()
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "disk_hits": self.disk_hits,
+            "size": info.currsize,
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._flush()
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Keyword matcher for the NEET PG parsers
+Classifies a cell or address token against every keyword family
+(institute, course, address, malformed) in a single regex scan.
+
+The old helpers looped over Python keyword lists with `kw in text`.
+Here all keywords are compiled once, at import, into one alternation
+inside a lookahead, tried longest first, so the scan finds the longest
+keyword starting at each position. Any shorter keyword starting at the
+same position is a prefix of that one, so per-family hits are recovered
+exactly, including overlaps like 'st' inside 'street'.
+"""
+
+import re
+from collections import defaultdict
+
+
+KEYWORD_FAMILIES = {
+    "institute": ['medical', 'college', 'hospital', 'institute', 'university',
+                  'aiims', 'pgimer', 'jipmer', 'dental', 'nursing'],
+    "course": ['md', 'ms', 'm.d', 'm.s', 'diploma', 'dnb', 'dch', 'da', 'dgo',
+               'medicine', 'surgery', 'paediatrics', 'pediatrics', 'orthopaedics',
+               'ophthalmology', 'anaesthesia', 'anesthesia', 'radiology', 'pathology'],
+    "address": ['road', 'rd', 'street', 'st', 'marg', 'salai', 'sector',
+                'block', 'phase', 'near', 'opposite'],
+    "malformed": ['state', 'stateuttar', 'stateuttar pradesh', 'pradesh,', 'nadu,'],
+}
+
+
+def _build():
+    keywords = sorted({kw for kws in KEYWORD_FAMILIES.values() for kw in kws},
+                      key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(re.escape(kw) for kw in keywords) + "))")
+
+    # Longest match at a position -> every (family, keyword) it implies
+    implied = {}
+    for longest in keywords:
+        implied[longest] = frozenset(
+            (family, kw)
+            for family, kws in KEYWORD_FAMILIES.items()
+            for kw in kws
+            if longest.startswith(kw)
+        )
+    return pattern, implied
+
+
+_PATTERN, _IMPLIED = _build()
+
+
+def classify(text: str) -> dict:
+    """
+    Return {family: number of distinct family keywords found in text}.
+    Matching is case-insensitive substring matching, like `kw in text.lower()`.
+    """
+    hits = set()
+    for longest in _PATTERN.findall(text.lower()):
+        hits |= _IMPLIED[longest]
+
+    counts = defaultdict(int)
+    for family, _ in hits:
+        counts[family] += 1
+    return counts
+
+
+def family_pattern(family: str) -> str:
+    """Regex source matching any keyword of one family, e.g. for pandas str.contains."""
+    return "|".join(re.escape(kw) for kw in KEYWORD_FAMILIES[family])
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Bulk SQL loader for parsed ORCR output
+Takes the NDJSON (or legacy JS module) written by the NEET parsers,
+resolves each row's collegeId against the College table, creating missing
+colleges the way pushNeetOrcr.js does, and loads the rows with multi-row
+INSERT statements instead of per-row ORM calls.
+
+Statements are capped at D1's 100 KB statement size, which also keeps
+them far below SQLite's own limits. Values are inlined as SQL literals,
+so the same statements can be run on a local SQLite file (--db) or saved
+for `wrangler d1 execute --file` (--sql). D1 rejects explicit
+BEGIN/COMMIT and runs a file atomically on its own, so transaction
+wrappers are only added for --target sqlite.
+
+Colleges are read from --db, or from a {name: id} map such as the one
+createClgMap.ts writes (--colleges scripts/clgMap.json) when only a --sql
+file for D1 is being produced. A map can be stale, so new colleges are
+inserted with ON CONFLICT("name") DO NOTHING and their Orcr rows look the
+id up by name, which also picks up a college someone else created in the
+meantime. Given both --db and --colleges, ids that disagree are an error.
+--fuzzy also matches spelling variants to existing colleges
+(collegeResolver.py) before creating new ones.
+
+Usage:
+    python scripts/loadOrcrSql.py neet/neetPgR2_2025_optimized.ndjson --db prisma/prisma/db.sqlite
+    python scripts/loadOrcrSql.py neet/neetPgR2_2025_optimized.ndjson --colleges scripts/clgMap.json --sql neet_r2.sql
+"""
+
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+from collegeResolver import DEFAULT_THRESHOLD, CollegeResolver
+from orcrExport import college_id_for, iter_ndjson
+
+
+# D1 caps a single SQL statement at 100 KB
+D1_MAX_STATEMENT_BYTES = 100_000
+
+ORCR_COLUMNS = (
+    "id", "year", "round", "type", "exam", "collegeId", "institute",
+    "academicProgramName", "quota", "seatType", "gender",
+    "openRank", "closeRank", "updatedAt",
+)
+
+COLLEGE_COLUMNS = (
+    "id", "name", "location", "collegeType", "bongs", "moderated", "updatedAt",
+)
+
+MIGRATIONS_GLOB = "prisma/migrations/*.sql"
+
+
+# -------------------- INPUT --------------------
+
+def load_records(path):
+    """Yield ORCR rows from an NDJSON file or a legacy `export const x = [...]` module."""
+    if not path.endswith(".js"):
+        yield from iter_ndjson(path)
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    json_start = content.find('[')
+    json_end = content.rfind(']') + 1
+    if json_start == -1 or json_end == 0:
+        raise ValueError(f"no JSON array found in {path}")
+    yield from json.loads(content[json_start:json_end])
+
+
+def now_iso():
+    """Timestamp in the same form as JS Date.toISOString(), like the backups use."""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+# -------------------- COLLEGES --------------------
+
+def fetch_colleges(conn):
+    """Return {name: id} for every College row."""
+    return dict(conn.execute('SELECT "name", "id" FROM "College"'))
+
+
+def resolve_colleges(records, college_ids, exam, timestamp, resolver=None):
+    """
+    Attach collegeId to every row, matching the full institute string first
+    and then the name before the first comma, like pushNeetOrcr.js, then
+    the fuzzy resolver (a CollegeResolver over the existing colleges) if
+    one is given.
+
+    Institutes that match nothing get a new College row (name before the
+    comma, place after it), which is also added to the resolver. Returns
+    (rows, new_colleges); college_ids is updated in place.
+    """
+    rows = []
+    new_colleges = []
+
+    for record in records:
+        institute = record["institute"]
+        parts = [p.strip() for p in institute.split(",")]
+        name = parts[0]
+
+        college_id = college_id_for(institute, college_ids)
+        if college_id is None and resolver is not None:
+            match = resolver.resolve(institute)
+            if match is not None:
+                college_id = match[0]
+                # Keyed by the full string: the bare name may be another city's college
+                college_ids[institute] = college_id
+        if college_id is None:
+            college_id = str(uuid.uuid4())
+            college_ids[name] = college_id
+            if resolver is not None:
+                # Later spelling variants of this institute should find it
+                resolver.add(name, college_id)
+            new_colleges.append({
+                "id": college_id,
+                "name": name,
+                "location": parts[1] if len(parts) > 1 and parts[1] else None,
+                "collegeType": exam,
+                "bongs": 0,
+                "moderated": False,
+                "updatedAt": timestamp,
+            })
+
+        rows.append({**record, "collegeId": college_id})
+
+    return rows, new_colleges
+
+
+def conflicting_ids(db_ids, map_ids):
+    """Names the college map gives a different id than the database, sorted."""
+    return sorted(name for name, college_id in map_ids.items()
+                  if name in db_ids and db_ids[name] != college_id)
+
+
+# -------------------- SQL --------------------
+
+class SqlExpr(str):
+    """SQL text that sql_literal inlines as-is, e.g. a subquery."""
+
+
+def college_id_by_name(name):
+    return SqlExpr(f'(SELECT "id" FROM "College" WHERE "name" = {sql_literal(name)})')
+
+
+def sql_literal(value):
+    """Inline SQL literal, escaped the same way as d1-migration.ts."""
+    if isinstance(value, SqlExpr):
+        return value
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def iter_insert_statements(table, columns, rows, max_bytes=D1_MAX_STATEMENT_BYTES, verb="INSERT",
+                           suffix=""):
+    """
+    Yield multi-row INSERT statements for rows, each at most max_bytes of
+    UTF-8 and ending in suffix (e.g. an ON CONFLICT clause). A single row
+    that alone exceeds max_bytes raises ValueError.
+    """
+    head = f'{verb} INTO "{table}" (' + ", ".join(f'"{c}"' for c in columns) + ") VALUES\n"
+    tail = (f"\n{suffix}" if suffix else "") + ";"
+    head_size = len(head.encode("utf-8")) + len(tail.encode("utf-8")) - 1
+
+    batch = []
+    size = head_size
+    for row in rows:
+        values = "(" + ", ".join(sql_literal(row.get(c)) for c in columns) + ")"
+        value_size = len(values.encode("utf-8")) + 2  # ",\n" or ";"
+
+        if head_size + value_size > max_bytes:
+            raise ValueError(f"row does not fit in a {max_bytes}-byte statement: {values[:80]}...")
+        if batch and size + value_size > max_bytes:
+            yield head + ",\n".join(batch) + tail
+            batch = []
+            size = head_size
+
+        batch.append(values)
+        size += value_size
+
+    if batch:
+        yield head + ",\n".join(batch) + tail
+
+
+def delete_statements(rows):
+    """DELETE statements clearing every (exam, year, round) present in rows."""
+    keys = sorted({(r["exam"], r["year"], r["round"]) for r in rows})
+    return [
+        f'DELETE FROM "Orcr" WHERE "exam" = {sql_literal(exam)} '
+        f'AND "year" = {sql_literal(year)} AND "round" = {sql_literal(round)};'
+        for exam, year, round in keys
+    ]
+
+
+def build_statements(rows, new_colleges, replace=False, max_bytes=D1_MAX_STATEMENT_BYTES):
+    """
+    All statements for one load, in execution order. Rows of a new college
+    take its id from the College row with that name, whichever id it has.
+    """
+    timestamp = new_colleges[0]["updatedAt"] if new_colleges else now_iso()
+    new_names = {college["id"]: college["name"] for college in new_colleges}
+
+    def orcr_row(row):
+        name = new_names.get(row["collegeId"])
+        college_id = row["collegeId"] if name is None else college_id_by_name(name)
+        return {**row, "id": str(uuid.uuid4()), "collegeId": college_id, "updatedAt": timestamp}
+
+    statements = []
+    if replace:
+        statements.extend(delete_statements(rows))
+    statements.extend(iter_insert_statements(
+        "College", COLLEGE_COLUMNS, new_colleges, max_bytes, suffix='ON CONFLICT ("name") DO NOTHING'))
+    statements.extend(iter_insert_statements(
+        "Orcr", ORCR_COLUMNS, (orcr_row(row) for row in rows), max_bytes))
+    return statements
+
+
+def write_sql_file(path, statements, transaction):
+    with open(path, "w", encoding="utf-8") as f:
+        if transaction:
+            f.write("BEGIN TRANSACTION;\n")
+        for statement in statements:
+            f.write(statement)
+            f.write("\n")
+        if transaction:
+            f.write("COMMIT;\n")
+
+
+# -------------------- SQLITE --------------------
+
+def has_schema(conn):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'College'"
+    ).fetchone()
+    return row is not None
+
+
+def apply_migrations(conn, pattern=MIGRATIONS_GLOB):
+    for path in sorted(glob.glob(pattern)):
+        print(f"   ⏳ Applying {path}...")
+        with open(path, "r", encoding="utf-8") as f:
+            conn.executescript(f.read())
+
+
+def execute_statements(conn, statements):
+    """Run statements in one transaction; nothing is kept if any fails."""
+    conn.execute("BEGIN")
+    try:
+        for statement in statements:
+            conn.execute(statement)
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+# -------------------- MAIN --------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bulk-load parsed ORCR output with multi-row INSERTs")
+    parser.add_argument("input", help="parser output (.ndjson, or a legacy .js module)")
+    parser.add_argument("--db", metavar="SQLITE_PATH",
+                        help="SQLite database to read colleges from and load into (e.g. prisma/prisma/db.sqlite)")
+    parser.add_argument("--colleges", metavar="JSON_PATH",
+                        help="{name: id} college map (e.g. scripts/clgMap.json), used instead of --db's College table")
+    parser.add_argument("--sql", metavar="OUT",
+                        help="write the statements to this file instead of (or as well as) executing them")
+    parser.add_argument("--target", choices=("d1", "sqlite"), default="d1",
+                        help="dialect of the --sql file; d1 omits BEGIN/COMMIT (default: d1)")
+    parser.add_argument("--exam", default="NEET_PG",
+                        help="collegeType for newly created colleges (default: NEET_PG)")
+    parser.add_argument("--fuzzy", type=float, nargs="?", const=DEFAULT_THRESHOLD, metavar="THRESHOLD",
+                        help="match spelling variants to existing colleges before creating new ones "
+                             f"(score threshold, default {DEFAULT_THRESHOLD})")
+    parser.add_argument("--replace", action="store_true",
+                        help="delete existing rows for each (exam, year, round) in the input first")
+    parser.add_argument("--init-schema", action="store_true",
+                        help=f"apply {MIGRATIONS_GLOB} when the database has no College table")
+    parser.add_argument("--max-bytes", type=int, default=D1_MAX_STATEMENT_BYTES,
+                        help=f"max size of one INSERT statement (default: {D1_MAX_STATEMENT_BYTES})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if not args.db and not args.sql:
+        print("❌ Nothing to do: pass --db, --sql or both")
+        sys.exit(1)
+    if not args.db and not args.colleges:
+        print("❌ --sql without --db needs --colleges to resolve collegeIds")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("ORCR Bulk SQL Loader")
+    print("=" * 60)
+
+    conn = None
+    college_ids = {}
+    if args.db:
+        conn = sqlite3.connect(args.db, isolation_level=None)
+        if not has_schema(conn):
+            if not args.init_schema:
+                print(f"❌ {args.db} has no College table (run the migrations or pass --init-schema)")
+                sys.exit(1)
+            apply_migrations(conn)
+        college_ids = fetch_colleges(conn)
+        print(f"📚 Found {len(college_ids)} existing colleges in {args.db}")
+    if args.colleges:
+        with open(args.colleges, "r", encoding="utf-8") as f:
+            map_ids = json.load(f)
+        conflicts = conflicting_ids(college_ids, map_ids)
+        if conflicts:
+            print(f"❌ {args.colleges} disagrees with {args.db} on {len(conflicts)} college ids, e.g.:")
+            for name in conflicts[:5]:
+                print(f"   - {name}: {map_ids[name]} (map) vs {college_ids[name]} (db)")
+            print("   Re-export the college map from the database")
+            sys.exit(1)
+        college_ids.update(map_ids)
+        print(f"📚 Loaded college map from {args.colleges} ({len(college_ids)} colleges)")
+
+    start = time.perf_counter()
+    resolver = None
+    if args.fuzzy is not None:
+        resolver = CollegeResolver(college_ids, args.fuzzy)
+    rows, new_colleges = resolve_colleges(
+        load_records(args.input), college_ids, args.exam, now_iso(), resolver)
+    print(f"📄 Read {len(rows)} ORCR rows from {args.input}")
+    print(f"🏫 {len(new_colleges)} new colleges to create")
+
+    statements = build_statements(rows, new_colleges, args.replace, args.max_bytes)
+    print(f"🧾 Built {len(statements)} statements (max {args.max_bytes} bytes each)")
+
+    if args.sql:
+        write_sql_file(args.sql, statements, transaction=args.target == "sqlite")
+        print(f"✓ SQL written to {args.sql} ({os.path.getsize(args.sql)} bytes, target {args.target})")
+
+    if conn is not None:
+        execute_statements(conn, statements)
+        conn.close()
+        print(f"✓ Loaded {len(rows)} rows into {args.db}")
+
+    print(f"\nDone ✔ ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+NEET PG Round 1 seat-type index
+Used by the Round 2 parsers to recover the R1 seatType of candidates
+that fall back to their Round 1 allotment.
+
+Every consolidated R1 row is kept as one (openRank, closeRank) interval
+instead of one dict key per rank, so memory grows with the number of R1
+rows and not with the width of their rank ranges.
+"""
+
+import heapq
+from bisect import bisect_right
+from collections import defaultdict
+
+
+# -------------------- SEGMENTS --------------------
+
+def flatten_intervals(intervals, latest=True):
+    """
+    Flatten overlapping (openRank, closeRank, order, value) intervals into
+    disjoint, sorted segments.
+
+    Where intervals overlap, the one with the highest order wins when
+    `latest` is True (later R1 rows overwrite earlier ones, like the old
+    per-rank dict did), otherwise the one with the lowest order wins.
+
+    Returns (starts, ends, values) lists with inclusive ends.
+    """
+    events = sorted(intervals, key=lambda iv: iv[0])
+    bounds = sorted({b for open_rank, close_rank, _, _ in events
+                     for b in (open_rank, close_rank + 1)})
+    sign = -1 if latest else 1
+
+    starts, ends, values = [], [], []
+    active = []
+    i = 0
+
+    for lo, hi in zip(bounds, bounds[1:]):
+        while i < len(events) and events[i][0] <= lo:
+            open_rank, close_rank, order, value = events[i]
+            heapq.heappush(active, (sign * order, close_rank, value))
+            i += 1
+
+        # Drop intervals that ended before this segment
+        while active and active[0][1] < lo:
+            heapq.heappop(active)
+
+        if not active:
+            continue
+
+        value = active[0][2]
+        if values and values[-1] == value and ends[-1] == lo - 1:
+            ends[-1] = hi - 1
+        else:
+            starts.append(lo)
+            ends.append(hi - 1)
+            values.append(value)
+
+    return starts, ends, values
+
+
+def flatten_candidates(intervals):
+    """
+    Flatten overlapping (openRank, closeRank, order, value) intervals into
+    disjoint, sorted segments whose value is the tuple of distinct values
+    covering them, ordered by the earliest interval carrying each value.
+
+    Returns (starts, ends, values) lists with inclusive ends.
+    """
+    events = sorted(intervals, key=lambda iv: iv[0])
+    bounds = sorted({b for open_rank, close_rank, _, _ in events
+                     for b in (open_rank, close_rank + 1)})
+
+    starts, ends, values = [], [], []
+    active = defaultdict(list)
+    i = 0
+
+    for lo, hi in zip(bounds, bounds[1:]):
+        while i < len(events) and events[i][0] <= lo:
+            open_rank, close_rank, order, value = events[i]
+            heapq.heappush(active[value], (order, close_rank))
+            i += 1
+
+        covering = []
+        for value, heap in list(active.items()):
+            # Drop intervals that ended before this segment
+            while heap and heap[0][1] < lo:
+                heapq.heappop(heap)
+            if heap:
+                covering.append((heap[0][0], value))
+            else:
+                del active[value]
+
+        if not covering:
+            continue
+
+        value = tuple(v for _, v in sorted(covering))
+        if values and values[-1] == value and ends[-1] == lo - 1:
+            ends[-1] = hi - 1
+        else:
+            starts.append(lo)
+            ends.append(hi - 1)
+            values.append(value)
+
+    return starts, ends, values
+
+
+def find_segment(segments, rank):
+    """Return the value of the segment covering rank, or None."""
+    starts, ends, values = segments
+    i = bisect_right(starts, rank) - 1
+    if i >= 0 and rank <= ends[i]:
+        return values[i]
+    return None
+
+
+# -------------------- INDEX --------------------
+
+class R1Index:
+    """
+    Interval index over consolidated R1 ORCR rows.
+    Answers "which seatType covers rank N" for an
+    (institute, course, quota) key in O(log n).
+
+    A secondary index keyed by quota alone holds the candidate seatTypes
+    of any R1 row covering a rank, for the rank+quota fallback.
+    """
+
+    def __init__(self):
+        self._intervals = defaultdict(list)
+        self._quota_intervals = defaultdict(list)
+        self._segments = {}
+        self._quota_segments = {}
+        self.row_count = 0
+
+    @classmethod
+    def from_entries(cls, entries):
+        index = cls()
+        for entry in entries:
+            index.add(entry)
+        index.build()
+        return index
+
+    def add(self, entry):
+        """Add one consolidated R1 ORCR row."""
+        if entry['openRank'] > entry['closeRank']:
+            return
+
+        inst_norm = entry['institute'].lower().strip()
+        course_norm = entry['academicProgramName'].lower().strip()
+        quota = entry.get('quota', 'All India')
+
+        interval = (entry['openRank'], entry['closeRank'], self.row_count, entry['seatType'])
+        self._intervals[(inst_norm, course_norm, quota)].append(interval)
+        self._quota_intervals[quota].append(interval)
+        self.row_count += 1
+
+    def build(self):
+        """Flatten the collected intervals into per-key sorted segments."""
+        self._segments = {
+            key: flatten_intervals(intervals, latest=True)
+            for key, intervals in self._intervals.items()
+        }
+        self._quota_segments = {
+            quota: flatten_candidates(intervals)
+            for quota, intervals in self._quota_intervals.items()
+        }
+        self._intervals.clear()
+        self._quota_intervals.clear()
+
+    def lookup(self, rank, inst_norm, course_norm, quota):
+        """Return the R1 seatType covering rank for the normalized key, or None."""
+        segments = self._segments.get((inst_norm, course_norm, quota))
+        if segments is None:
+            return None
+        return find_segment(segments, rank)
+
+    def candidates(self, rank, quota):
+        """
+        Return the seatTypes of every R1 row with this quota covering rank,
+        earliest R1 row first. Empty tuple when none match.
+        """
+        segments = self._quota_segments.get(quota)
+        if segments is None:
+            return ()
+        return find_segment(segments, rank) or ()
+
+    def segment_count(self):
+        return sum(len(starts) for starts, _, _ in self._segments.values())
+
+    def __len__(self):
+        return self.row_count
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Batched OCR backends for the scanned-PDF scrapers
+pytesseract starts a tesseract process, and reloads its language data,
+for every image. A backend here OCRs a whole batch of images (rendered
+pages or cropped cells) per call and returns one string per image:
+
+- TesseractCli: one tesseract process per batch. The images go in a list
+  file and the combined output is split back per image on tesseract's
+  page separator.
+- TesserocrApi: a persistent in-process tesseract (tesserocr), loaded
+  once per process and reused for every image. Used by get_backend("auto")
+  when tesserocr is installed.
+
+Images are PIL images or paths of files already on disk. `config` takes
+the same options as pytesseract, e.g. "--psm 7 -c tessedit_char_whitelist=0123456789".
+"""
+
+import os
+import shlex
+import subprocess
+import tempfile
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+
+DEFAULT_LANG = "eng"
+
+# Tesseract's default page separator in text output
+PAGE_SEPARATOR = "\f"
+
+
+def parse_config(config):
+    """Split a pytesseract-style config string into (psm or None, {variable: value})."""
+    args = shlex.split(config)
+    psm, variables = None, {}
+    i = 0
+    while i < len(args):
+        if args[i] == "--psm" and i + 1 < len(args):
+            psm = int(args[i + 1])
+            i += 2
+        elif args[i] == "-c" and i + 1 < len(args):
+            name, _, value = args[i + 1].partition("=")
+            variables[name] = value
+            i += 2
+        else:
+            raise ValueError(f"unsupported OCR option {args[i]!r} in {config!r}")
+    return psm, variables
+
+
+def split_pages(text, count):
+    """Per-image texts from one multi-image tesseract run, or None if they don't line up."""
+    pages = text.split(PAGE_SEPARATOR)
+    # Older tesseract versions end every page with the separator, newer ones only separate
+    if len(pages) == count + 1 and not pages[-1].strip():
+        pages.pop()
+    return pages if len(pages) == count else None
+
+
+# -------------------- BACKENDS --------------------
+
+class TesseractCli:
+    """One tesseract process per batch of images."""
+
+    name = "cli"
+
+    def __init__(self, lang=DEFAULT_LANG, cmd="tesseract"):
+        self.lang = lang
+        self.cmd = cmd
+        self.calls = 0
+
+    def _run(self, source, config):
+        self.calls += 1
+        cmd = [self.cmd, source, "stdout", "-l", self.lang, *shlex.split(config)]
+        result = subprocess.run(cmd, capture_output=True, check=True)
+        return result.stdout.decode("utf-8", "replace")
+
+    def ocr_batch(self, images, config=""):
+        if not images:
+            return []
+
+        with tempfile.TemporaryDirectory(prefix="ocr-batch-") as tmp_dir:
+            paths = []
+            for i, image in enumerate(images):
+                if isinstance(image, str):
+                    paths.append(os.path.abspath(image))
+                else:
+                    path = os.path.join(tmp_dir, f"{i:05d}.png")
+                    image.save(path)
+                    paths.append(path)
+
+            if len(paths) == 1:
+                return [self._run(paths[0], config)]
+
+            list_path = os.path.join(tmp_dir, "images.txt")
+            with open(list_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(paths) + "\n")
+
+            pages = split_pages(self._run(list_path, config), len(paths))
+            if pages is None:
+                # A page's own text contained the separator: fall back to one call per image
+                pages = [self._run(path, config) for path in paths]
+        return pages
+
+
+class TesserocrApi:
+    """Persistent in-process tesseract; language data is loaded once."""
+
+    name = "tesserocr"
+
+    def __init__(self, lang=DEFAULT_LANG):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed")
+        self.api = tesserocr.PyTessBaseAPI(lang=lang)
+        self.calls = 0
+
+    def ocr_batch(self, images, config=""):
+        psm, variables = parse_config(config)
+        api = self.api
+        api.SetPageSegMode(tesserocr.PSM.AUTO if psm is None else psm)
+        previous = {name: api.GetVariableAsString(name) for name in variables}
+        for name, value in variables.items():
+            api.SetVariable(name, value)
+
+        texts = []
+        try:
+            for image in images:
+                self.calls += 1
+                if isinstance(image, str):
+                    api.SetImageFile(image)
+                else:
+                    api.SetImage(image)
+                texts.append(api.GetUTF8Text())
+        finally:
+            for name, value in previous.items():
+                api.SetVariable(name, value or "")
+        return texts
+
+    def close(self):
+        self.api.End()
+
+
+BACKENDS = {
+    "cli": TesseractCli,
+    "tesserocr": TesserocrApi,
+}
+
+_backends = {}
+
+
+def get_backend(name="auto", lang=DEFAULT_LANG):
+    """
+    Shared backend for this process ("auto" prefers tesserocr, then the
+    tesseract CLI). Each pool worker builds its own on first use.
+    """
+    if name == "auto":
+        name = "tesserocr" if tesserocr is not None else "cli"
+    if name not in BACKENDS:
+        raise ValueError(f"unknown OCR backend {name!r} (known: auto, {', '.join(BACKENDS)})")
+
+    key = (name, lang)
+    if key not in _backends:
+        _backends[key] = BACKENDS[name](lang)
+    return _backends[key]
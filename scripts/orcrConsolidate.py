@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+ORCR rank consolidation for the NEET PG parsers
+Duplicate (institute, academicProgramName, quota, seatType, gender) rows
+collapse into one ORCR row with openRank = min(rank) and closeRank =
+max(rank). RankAccumulator keeps only those two numbers and a row count
+per group, updated as each rank arrives, instead of a list of every rank,
+so memory grows with the number of groups, not rows.
+
+Accumulators built over separate shards of the input (e.g. per worker)
+merge into the same result as one accumulator over the whole stream,
+including the order groups were first seen in.
+"""
+
+OPEN, CLOSE, COUNT = 0, 1, 2
+
+
+class RankAccumulator:
+    """Running (openRank, closeRank, count) per consolidation key."""
+
+    def __init__(self):
+        self.groups = {}
+        self.count = 0
+
+    def add(self, key, rank):
+        group = self.groups.get(key)
+        if group is None:
+            self.groups[key] = [rank, rank, 1]
+        else:
+            if rank < group[OPEN]:
+                group[OPEN] = rank
+            elif rank > group[CLOSE]:
+                group[CLOSE] = rank
+            group[COUNT] += 1
+        self.count += 1
+
+    def update(self, pairs):
+        """Consume an iterable of (key, rank) pairs, e.g. a streaming row source."""
+        for key, rank in pairs:
+            self.add(key, rank)
+        return self
+
+    def merge(self, other):
+        """Fold another accumulator (e.g. from a later shard) into this one."""
+        for key, (open_rank, close_rank, count) in other.groups.items():
+            group = self.groups.get(key)
+            if group is None:
+                self.groups[key] = [open_rank, close_rank, count]
+            else:
+                group[OPEN] = min(group[OPEN], open_rank)
+                group[CLOSE] = max(group[CLOSE], close_rank)
+                group[COUNT] += count
+        self.count += other.count
+        return self
+
+    @classmethod
+    def merged(cls, accumulators):
+        """Merge shard accumulators, in shard order, into a new one."""
+        result = cls()
+        for accumulator in accumulators:
+            result.merge(accumulator)
+        return result
+
+    def __len__(self):
+        return len(self.groups)
+
+    def items(self):
+        """Yield (key, openRank, closeRank, count) in first-seen order."""
+        for key, (open_rank, close_rank, count) in self.groups.items():
+            yield key, open_rank, close_rank, count
+
+    def to_orcr(self, year, round, exam="NEET_PG", type="NEET_PG"):
+        """
+        ORCR rows for (institute, academicProgramName, quota, seatType,
+        gender) keys, in first-seen order.
+        """
+        orcr = []
+        for (institute, course, quota, seat_type, gender), (open_rank, close_rank, _) in self.groups.items():
+            orcr.append({
+                "year": year,
+                "round": round,
+                "type": type,
+                "exam": exam,
+                "institute": institute,
+                "academicProgramName": course,
+                "quota": quota,
+                "seatType": seat_type,
+                "gender": gender,
+                "openRank": open_rank,
+                "closeRank": close_rank,
+            })
+        return orcr
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+ORCR exporters for the NEET PG parsers
+Writes consolidated ORCR rows without ever building the whole output as
+one string.
+
+NDJSON (one compact JSON object per line) is the default output: it is
+written record by record and read back record by record, by load_r1_data
+here and by readNdjson in pushNeetOrcr.js, so neither side holds the
+serialized file in memory. write_js_module keeps the old
+`export const ... = [...]` module available, streamed the same way.
+
+write_cloudfront_shards emits the static files the /orcr pages fetch,
+`{year}-{round}-{exam}-{counselling}.json`, sorted by closeRank, with
+.gz and (if the brotli package is installed) .br variants of the same bytes.
+With columnar=True each shard also gets a dictionary-encoded columnar
+twin (see encode_columnar), checked against decode_columnar before writing.
+The /orcr table links every row to /explore/{collegeId}, so shard rows
+must carry collegeId: attach_college_ids resolves it from a College map
+first, and write_cloudfront_shards refuses rows without one.
+"""
+
+import gzip
+import json
+import os
+import sqlite3
+from collections import defaultdict
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def dump_record(record):
+    """Compact, single-line JSON for one ORCR row."""
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+# -------------------- NDJSON --------------------
+
+def write_ndjson(records, path):
+    """Stream records to path, one JSON object per line. Returns the count."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(dump_record(record))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def iter_ndjson(path):
+    """Yield the records of an NDJSON file one at a time, skipping blank lines."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+# -------------------- JS MODULE --------------------
+
+def write_js_module(records, path, const_name, header_lines=()):
+    """
+    Stream records into an ES module `export const <const_name> = [...]`,
+    one compact record per line. Returns the count.
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for line in header_lines:
+            f.write(f"// {line}\n")
+        if header_lines:
+            f.write("\n")
+        f.write(f"export const {const_name} = [")
+        for record in records:
+            f.write(",\n  " if count else "\n  ")
+            f.write(dump_record(record))
+            count += 1
+        f.write("\n];\n" if count else "];\n")
+    return count
+
+
+# -------------------- CLOUDFRONT SHARDS --------------------
+
+def shard_name(year, round, exam="NEET_PG", counselling="NEET_PG"):
+    """File name the frontend fetches, e.g. 2025-2-NEET_PG-NEET_PG.json."""
+    return f"{year}-{round}-{exam}-{counselling}.json"
+
+
+def close_rank_order(record):
+    """Sort key: closeRank, then openRank, then the text columns, so output is stable."""
+    return (
+        record["closeRank"],
+        record["openRank"],
+        record["institute"],
+        record["academicProgramName"],
+        record["quota"],
+        record["seatType"],
+        record["gender"],
+    )
+
+
+def encode_shard(records):
+    """Compact JSON array, one record per line, as UTF-8 bytes."""
+    return ("[" + ",\n".join(dump_record(r) for r in records) + "]\n").encode("utf-8")
+
+
+def write_shard_file(path, data):
+    """
+    Write data to path plus path.gz and path.br (when brotli is available).
+    The compressed files decompress to exactly these bytes, and carry no
+    timestamps, so rerunning on the same data gives identical files.
+    Returns the written paths.
+    """
+    paths = [path]
+    with open(path, "wb") as f:
+        f.write(data)
+
+    with open(path + ".gz", "wb") as raw:
+        with gzip.GzipFile(filename="", fileobj=raw, mode="wb", compresslevel=9, mtime=0) as f:
+            f.write(data)
+    paths.append(path + ".gz")
+
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data, mode=brotli.MODE_TEXT, quality=11))
+        paths.append(path + ".br")
+
+    return paths
+
+
+def load_college_ids(path):
+    """{name: id} from a college map (.json, e.g. scripts/clgMap.json) or a SQLite db's College table."""
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute('SELECT "name", "id" FROM "College"'))
+    finally:
+        conn.close()
+
+
+def college_id_for(institute, college_ids):
+    """collegeId for the full institute string, else for the name before the first comma."""
+    return college_ids.get(institute) or college_ids.get(institute.split(",")[0].strip())
+
+
+def attach_college_ids(records, college_ids):
+    """
+    Copy ORCR rows with collegeId set, matched like pushNeetOrcr.js does.
+    Returns (rows, missing), missing being the sorted institutes that
+    matched no college; their rows are left out of rows.
+    """
+    rows = []
+    missing = set()
+    for record in records:
+        college_id = college_id_for(record["institute"], college_ids)
+        if college_id is None:
+            missing.add(record["institute"])
+        else:
+            rows.append({**record, "collegeId": college_id})
+    return rows, sorted(missing)
+
+
+def variant_suffixes(paths):
+    """(".gz", ".br") for the compressed files write_shard_file wrote next to paths[0]."""
+    return tuple(path[len(paths[0]):] for path in paths[1:])
+
+
+def write_cloudfront_shards(records, out_dir, exam="NEET_PG", counselling="NEET_PG",
+                            columnar=False):
+    """
+    Split ORCR rows by (year, round), sort each shard by closeRank and write
+    it under out_dir with its compressed variants. Every row needs a
+    collegeId (see attach_college_ids); ValueError otherwise.
+    Returns {shard file name: (row count, compressed suffixes written)},
+    e.g. {"2025-2-NEET_PG-NEET_PG.json": (5120, (".gz", ".br"))}.
+    """
+    unlinked = sum(1 for record in records if not record.get("collegeId"))
+    if unlinked:
+        raise ValueError(f"{unlinked} ORCR rows have no collegeId; run attach_college_ids first")
+
+    shards = defaultdict(list)
+    for record in records:
+        shards[(record["year"], record["round"])].append(record)
+
+    os.makedirs(out_dir, exist_ok=True)
+    written = {}
+    for (year, round), rows in sorted(shards.items()):
+        rows.sort(key=close_rank_order)
+        name = shard_name(year, round, exam, counselling)
+        paths = write_shard_file(os.path.join(out_dir, name), encode_shard(rows))
+        written[name] = (len(rows), variant_suffixes(paths))
+
+        if columnar:
+            table = encode_columnar(rows)
+            if decode_columnar(table) != rows:
+                raise ValueError(f"columnar round trip changed {name}")
+            name = columnar_name(name)
+            paths = write_shard_file(os.path.join(out_dir, name), dump_columnar(table))
+            written[name] = (len(rows), variant_suffixes(paths))
+    return written
+
+
+# -------------------- COLUMNAR SHARDS --------------------
+
+# String columns stored as a dictionary plus one integer code per row
+DICT_FIELDS = ("institute", "academicProgramName", "quota", "seatType", "gender")
+
+COLUMNAR_FORMAT = "orcr-columnar"
+COLUMNAR_VERSION = 1
+
+
+def columnar_name(name):
+    """2025-2-NEET_PG-NEET_PG.json -> 2025-2-NEET_PG-NEET_PG.columnar.json"""
+    return name[:-len(".json")] + ".columnar.json"
+
+
+def encode_columnar(records):
+    """
+    Dictionary-encode ORCR rows into one JSON-serializable table:
+
+        fields     record keys, in order
+        constants  fields with the same value in every row (year, round, ...)
+        dicts      field -> distinct values, by first appearance
+        codes      field -> per-row index into dicts[field]
+        openRank   per-row ranks
+        closeRank  per-row difference from the previous row's closeRank,
+                   small numbers once rows are sorted by closeRank
+
+    DICT_FIELDS are always dictionary-encoded; any other non-rank field is
+    a constant when it never varies and dictionary-encoded otherwise.
+    Raises ValueError when rows don't all have the same keys.
+    """
+    fields = list(records[0]) if records else []
+    for record in records:
+        if list(record) != fields:
+            raise ValueError(f"columnar rows must share one key order, got {list(record)}")
+
+    table = {
+        "format": COLUMNAR_FORMAT,
+        "version": COLUMNAR_VERSION,
+        "count": len(records),
+        "fields": fields,
+        "constants": {},
+        "dicts": {},
+        "codes": {},
+    }
+
+    for field in fields:
+        if field in ("openRank", "closeRank"):
+            continue
+        values = [record[field] for record in records]
+        if field not in DICT_FIELDS and all(v == values[0] for v in values):
+            table["constants"][field] = values[0]
+            continue
+
+        index = {}
+        table["codes"][field] = [index.setdefault(v, len(index)) for v in values]
+        table["dicts"][field] = list(index)
+
+    if "openRank" in fields:
+        table["openRank"] = [record["openRank"] for record in records]
+    if "closeRank" in fields:
+        previous = 0
+        deltas = []
+        for record in records:
+            deltas.append(record["closeRank"] - previous)
+            previous = record["closeRank"]
+        table["closeRank"] = deltas
+
+    return table
+
+
+def decode_columnar(table):
+    """Rebuild the row list encode_columnar was given, keys in their original order."""
+    if table.get("format") != COLUMNAR_FORMAT or table.get("version") != COLUMNAR_VERSION:
+        raise ValueError(f"not an {COLUMNAR_FORMAT} v{COLUMNAR_VERSION} table")
+
+    columns = {}
+    for field, value in table["constants"].items():
+        columns[field] = [value] * table["count"]
+    for field, codes in table["codes"].items():
+        values = table["dicts"][field]
+        columns[field] = [values[code] for code in codes]
+    if "openRank" in table:
+        columns["openRank"] = table["openRank"]
+    if "closeRank" in table:
+        close_ranks = []
+        current = 0
+        for delta in table["closeRank"]:
+            current += delta
+            close_ranks.append(current)
+        columns["closeRank"] = close_ranks
+
+    fields = table["fields"]
+    return [
+        {field: columns[field][i] for field in fields}
+        for i in range(table["count"])
+    ]
+
+
+def dump_columnar(table):
+    """Compact JSON bytes for a columnar table."""
+    return (json.dumps(table, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
@@ -3,18 +3,22 @@
 NEET PG Round 1 PDF Parser
 Extracts institute as: <Institute Name>, <Place>
 Exports as JavaScript module for database import
+Streams pages -> tables -> rows -> consolidation with bounded memory
+Writes per-stage timing/memory metrics as JSON (--metrics)
 """
 
+import argparse
 import json
+import os
 import sys
 import re
 
-try:
-    import tabula
-except ImportError:
-    print("Error: tabula-py not installed.")
-    print("Install with: pip install tabula-py")
-    sys.exit(1)
+from instituteCache import InstituteCache
+from keywordMatcher import classify
+from orcrConsolidate import RankAccumulator
+from orcrExport import attach_college_ids, load_college_ids, write_cloudfront_shards, write_js_module, write_ndjson
+from pipelineMetrics import PipelineMetrics
+from tabulaExtract import get_service, resolve_workers
 
 
 # -------------------- UTIL --------------------
@@ -127,9 +131,8 @@ def extract_institute_and_place(raw_institute: str) -> str:
             continue
         
         # Skip malformed tokens (likely parsing errors)
-        token_lower = token.lower()
-        malformed_keywords = ['state', 'stateuttar', 'stateuttar pradesh', 'pradesh,', 'nadu,']
-        if any(kw in token_lower for kw in malformed_keywords):
+        hits = classify(token)
+        if hits["malformed"]:
             continue
         
         # Skip tokens that are just addresses/details (too long or contain address keywords)
@@ -137,9 +140,7 @@ def extract_institute_and_place(raw_institute: str) -> str:
             continue
             
         # Skip if it contains too many address keywords
-        address_keywords = ['road', 'rd', 'street', 'st', 'marg', 'salai', 'sector', 
-                           'block', 'phase', 'near', 'opposite']
-        if sum(1 for kw in address_keywords if kw in token_lower) >= 2:
+        if hits["address"] >= 2:
             continue
         
         # This looks like a valid place!
@@ -173,16 +174,20 @@ def extract_institute_and_place(raw_institute: str) -> str:
 
 # -------------------- PDF EXTRACTION --------------------
 
-def extract_neet_data(pdf_path: str):
-    print("Extracting data from PDF...")
-    dfs = tabula.read_pdf(pdf_path, pages="all", multiple_tables=True)
-    print(f"Found {len(dfs)} tables")
-
-    all_entries = []
-
-    for df in dfs:
+def iter_neet_entries(tables, metrics=None):
+    """
+    Yield raw R1 allotment rows from a stream of tabula tables, counting
+    tables and rows in metrics.
+    """
+    metrics = metrics or PipelineMetrics()
+    for df in tables:
+        metrics.count("tables")
         if df.empty or len(df.columns) < 7:
+            metrics.count("tables_skipped")
             continue
+        metrics.count("rows", len(df))
+        if metrics.progress_due("tables"):
+            print(f"  ... {metrics.counters['tables']} tables, {metrics.counters['rows']} rows read")
 
         first_row = df.iloc[0].tolist()
         has_header = "Rank" in str(first_row) or "SNo" in str(first_row)
@@ -197,116 +202,168 @@ def extract_neet_data(pdf_path: str):
             if not rank.isdigit():
                 continue
 
-            all_entries.append({
+            yield {
                 "rank": int(rank),
                 "quota": clean_text(row[2]),
                 "institute": clean_text(row[3]),
                 "course": clean_text(row[4]),
                 "category": clean_text(row[5]),
                 "candidate_category": clean_text(row[6]),
-            })
+            }
 
-    return all_entries
+
+def extract_neet_data(pdf_path: str, service=None):
+    print("Extracting data from PDF...")
+    service = service or get_service()
+    return list(iter_neet_entries(service.iter_tables(pdf_path, multiple_tables=True)))
 
 
 # -------------------- ORCR FORMAT --------------------
 
-def convert_to_orcr_format(entries):
+def convert_to_orcr_format(entries, canonicalize=None, year=2025, round=1):
     """
     Convert entries to ORCR format and consolidate duplicates.
     For duplicate (institute, academicProgramName, quota, seatType, gender) combinations,
     set openRank = min(ranks) and closeRank = max(ranks).
+
+    Accepts any iterable of entries and groups them as they arrive.
+    Institute names go through canonicalize (an InstituteCache around
+    extract_institute_and_place by default).
+    Returns (orcr, entry_count).
     """
-    # First, create all entries
-    all_entries = []
-    for e in entries:
-        all_entries.append({
-            "year": 2025,
-            "round": 1,
-            "type": "NEET_PG",
-            "exam": "NEET_PG",
-            "institute": extract_institute_and_place(e["institute"]),
-            "academicProgramName": e["course"],
-            "quota": e["quota"],
-            "seatType": e["category"],
-            "gender": "Gender-Neutral",
-            "rank": e["rank"],
-        })
-
-    # Group by (institute, academicProgramName, quota, seatType, gender)
-    from collections import defaultdict
-    groups = defaultdict(list)
-    
-    for entry in all_entries:
-        key = (
-            entry["institute"],
-            entry["academicProgramName"],
-            entry["quota"],
-            entry["seatType"],
-            entry["gender"]
-        )
-        groups[key].append(entry["rank"])
-    
-    # Consolidate: openRank = min, closeRank = max
-    orcr = []
-    for key, ranks in groups.items():
-        institute, course, quota, seatType, gender = key
-        orcr.append({
-            "year": 2025,
-            "round": 1,
-            "type": "NEET_PG",
-            "exam": "NEET_PG",
-            "institute": institute,
-            "academicProgramName": course,
-            "quota": quota,
-            "seatType": seatType,
-            "gender": gender,
-            "openRank": min(ranks),
-            "closeRank": max(ranks),
-        })
-
-    return orcr
+    canonicalize = canonicalize or InstituteCache(extract_institute_and_place)
+
+    # Running openRank/closeRank per
+    # (institute, academicProgramName, quota, seatType, gender)
+    groups = RankAccumulator()
+    groups.update(
+        ((canonicalize(e["institute"]), e["course"], e["quota"], e["category"], "Gender-Neutral"),
+         e["rank"])
+        for e in entries
+    )
+
+    orcr = groups.to_orcr(year=year, round=round)
+    entry_count = groups.count
+
+    return orcr, entry_count
 
 
 # -------------------- MAIN --------------------
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="NEET PG Round 1 PDF Parser")
+    parser.add_argument("--pdf", default="neet/neet_pg_r1.pdf", help="allotment PDF to parse")
+    parser.add_argument("--out", default="neet/neetPgR1_2025.ndjson", help="NDJSON output path")
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--round", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="parallel tabula workers over page shards (0 = one per CPU core)")
+    parser.add_argument("--institute-cache", metavar="SQLITE_PATH",
+                        help="persist canonicalized institute names across runs in this SQLite file")
+    parser.add_argument("--page-cache", metavar="DIR",
+                        help="cache tabula output per PDF page in DIR; reruns on an unchanged PDF skip tabula")
+    parser.add_argument("--js", action="store_true",
+                        help="also write the legacy neetPgR1_<year>.js module next to the NDJSON output")
+    parser.add_argument("--shards", metavar="DIR",
+                        help="also write the CloudFront shard ({year}-{round}-NEET_PG-NEET_PG.json + .gz/.br) to DIR")
+    parser.add_argument("--columnar", action="store_true",
+                        help="with --shards, also write dictionary-encoded .columnar.json shards")
+    parser.add_argument("--colleges", metavar="PATH",
+                        help="{name: id} college map (e.g. scripts/clgMap.json) or SQLite db with a College "
+                             "table; required by --shards to set each row's collegeId")
+    parser.add_argument("--metrics", metavar="JSON_PATH",
+                        help="per-stage timing/memory report (default: <out>.metrics.json)")
+    args = parser.parse_args()
+    if args.shards and not args.colleges:
+        parser.error("--shards needs --colleges: shard rows link to /explore/{collegeId}")
+    return args
+
+
 def main():
-    pdf_path = "neet/neet_pg_r1.pdf"
-    output_js_path = "neet/neetPgR1_2025.js"
-    sample_path = "neet/cutoff_2025_r1_sample.json"
+    args = parse_args()
+    pdf_path = args.pdf
+    output_path = args.out
+    output_js_path = os.path.splitext(output_path)[0] + ".js"
+    sample_path = os.path.join(os.path.dirname(output_path), f"cutoff_{args.year}_r{args.round}_sample.json")
+    metrics_path = args.metrics or os.path.splitext(output_path)[0] + ".metrics.json"
+    metrics = PipelineMetrics(f"NEET_PG-{args.year}-R{args.round}")
+    metrics.info.update(parser="parseNeetPgR1_final.py", pdf=pdf_path, out=output_path,
+                        workers=args.workers)
 
     print("=" * 60)
     print("NEET PG Parser (Institute Name, Place)")
     print("=" * 60)
 
-    entries = extract_neet_data(pdf_path)
-    print(f"Extracted {len(entries)} raw rows")
+    college_ids = load_college_ids(args.colleges) if args.colleges else {}
+    shards_failed = False
 
-    if not entries:
+    # Stream pages -> tables -> rows -> groups without holding every row
+    print("Extracting data from PDF...")
+    service = get_service(resolve_workers(args.workers), args.page_cache)
+    tables = metrics.iterate("tabula", service.iter_tables(pdf_path, multiple_tables=True))
+    entries = metrics.iterate("rows", iter_neet_entries(tables, metrics))
+    with InstituteCache(extract_institute_and_place, args.institute_cache) as canonicalize:
+        with metrics.stage("consolidate"):
+            orcr, entry_count = convert_to_orcr_format(
+                entries, metrics.timed("institute", canonicalize), args.year, args.round)
+        cache_stats = canonicalize.stats()
+    metrics.count("entries", entry_count)
+    metrics.count("orcr_rows", len(orcr))
+    metrics.count("institute_cache.hits", cache_stats["hits"])
+    metrics.count("institute_cache.disk_hits", cache_stats["disk_hits"])
+    print(f"Institute cache: {cache_stats['size']} names, "
+          f"{cache_stats['hits']} hits, {cache_stats['disk_hits']} from disk")
+    if service.page_cache is not None:
+        print(f"Page cache: {service.page_cache.hits} pages reused, {service.page_cache.misses} read")
+        metrics.count("page_cache.hits", service.page_cache.hits)
+        metrics.count("page_cache.misses", service.page_cache.misses)
+    print(f"Extracted {entry_count} raw rows")
+
+    if not entry_count:
         print("❌ No data extracted")
         sys.exit(1)
 
-    orcr = convert_to_orcr_format(entries)
-
     print(f"After consolidation: {len(orcr)} unique entries")
-    print(f"Duplicates merged: {len(entries) - len(orcr)}")
-
-    # Export as JavaScript module
-    with open(output_js_path, "w", encoding="utf-8") as f:
-        f.write("// NEET PG Round 1 2025 Cutoff Data\n")
-        f.write("// Generated by parseNeetPgR1_final.py\n")
-        f.write("// Total entries: " + str(len(orcr)) + "\n")
-        f.write("// Duplicates consolidated with openRank/closeRank\n\n")
-        f.write("export const neetPgR1_2025 = ")
-        f.write(json.dumps(orcr, indent=2))
-        f.write(";\n")
-
-    # Save sample JSON for inspection
-    with open(sample_path, "w", encoding="utf-8") as f:
-        json.dump(orcr[:10], f, indent=2)
-
-    print(f"\n✓ Saved {len(orcr)} entries to {output_js_path}")
-    print(f"✓ Sample written to {sample_path}")
+    print(f"Duplicates merged: {entry_count - len(orcr)}")
+
+    with metrics.stage("write"):
+        # Stream records out as NDJSON, one compact object per line
+        write_ndjson(orcr, output_path)
+        print(f"\n✓ Saved {len(orcr)} entries to {output_path}")
+
+        if args.js:
+            write_js_module(orcr, output_js_path, f"neetPgR{args.round}_{args.year}", [
+                f"NEET PG Round {args.round} {args.year} Cutoff Data",
+                "Generated by parseNeetPgR1_final.py",
+                "Total entries: " + str(len(orcr)),
+                "Duplicates consolidated with openRank/closeRank",
+            ])
+            print(f"✓ Saved {len(orcr)} entries to {output_js_path}")
+
+        # Save sample JSON for inspection
+        with open(sample_path, "w", encoding="utf-8") as f:
+            json.dump(orcr[:10], f, indent=2)
+
+        print(f"✓ Sample written to {sample_path}")
+
+        if args.shards:
+            shard_rows, missing = attach_college_ids(orcr, college_ids)
+            if missing:
+                shards_failed = True
+                print(f"❌ {len(missing)} institutes have no College in {args.colleges}; shards not written:")
+                for institute in missing[:10]:
+                    print(f"   - {institute}")
+                print(f"   Load {output_path} with loadOrcrSql.py (it creates missing colleges), "
+                      "re-export the college map and rerun")
+            else:
+                for name, (count, suffixes) in write_cloudfront_shards(shard_rows, args.shards, columnar=args.columnar).items():
+                    print(f"✓ Shard {name} (+{'/'.join(suffixes)}): {count} entries → {args.shards}")
+
+    report = metrics.write(metrics_path)
+    print(f"✓ Metrics written to {metrics_path}")
+    metrics.print_summary(report)
+    if shards_failed:
+        sys.exit(1)
 
     print("\nSample output (showing rank ranges):")
     for x in orcr[:5]:
@@ -6,13 +6,20 @@ Extracts only Round 2 allotments (ignores Round 1 and "Did not opt" cases)
 Exports as JavaScript module for database import
 
 IMPORTANT: When R2 data is missing, falls back to R1 data and looks up
-the correct seatType from neetPgR1_2025.js by matching rank.
+the correct seatType from neetPgR1_2025.ndjson (or the legacy .js) by
+matching rank.
 """
 
 import json
 import sys
 import re
 
+from instituteCache import InstituteCache
+from keywordMatcher import classify
+from neetR1Index import R1Index
+from orcrConsolidate import RankAccumulator
+from orcrExport import iter_ndjson
+
 try:
     import tabula
 except ImportError:
@@ -31,56 +38,44 @@ def clean_text(text):
 
 # -------------------- R1 DATA LOADER --------------------
 
-def load_r1_data(r1_js_path):
+def load_r1_data(r1_path):
     """
-    Load R1 data from neetPgR1_2025.js for category lookup.
-    Returns a dict mapping (rank, institute_key, course_key, quota) -> seatType
+    Load R1 data from neetPgR1_2025.ndjson (or the legacy .js module) for category lookup.
+    Returns an R1Index of (institute, course, quota) -> rank intervals -> seatType
     """
-    print(f"📂 Loading R1 data from {r1_js_path}...")
+    print(f"📂 Loading R1 data from {r1_path}...")
     
     try:
-        with open(r1_js_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        if r1_path.endswith(".js"):
+            with open(r1_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+                
+            # Extract JSON array from JS file
+            json_start = content.find('[')
+            json_end = content.rfind(']') + 1
             
-        # Extract JSON array from JS file
-        json_start = content.find('[')
-        json_end = content.rfind(']') + 1
-        
-        if json_start == -1 or json_end == 0:
-            print("   ⚠️ Could not parse R1 JS file, skipping R1 lookup")
-            return {}
-        
-        r1_entries = json.loads(content[json_start:json_end])
-        print(f"   ✓ Loaded {len(r1_entries)} R1 entries")
-        
-        # Create lookup dict
-        r1_lookup = {}
-        
-        for entry in r1_entries:
-            inst_norm = entry['institute'].lower().strip()
-            course_norm = entry['academicProgramName'].lower().strip()
-            quota = entry.get('quota', 'All India')
-            seat_type = entry['seatType']
+            if json_start == -1 or json_end == 0:
+                print("   ⚠️ Could not parse R1 JS file, skipping R1 lookup")
+                return R1Index()
             
-            # Add all ranks in the range
-            for rank in range(entry['openRank'], entry['closeRank'] + 1):
-                key = (rank, inst_norm, course_norm, quota)
-                r1_lookup[key] = seat_type
-                
-                # Fallback key
-                simple_key = (rank, quota, seat_type)
-                if simple_key not in r1_lookup:
-                    r1_lookup[simple_key] = seat_type
+            r1_entries = json.loads(content[json_start:json_end])
+        else:
+            # NDJSON streams straight into the index, one record at a time
+            r1_entries = iter_ndjson(r1_path)
+        
+        # Interval index keyed by (institute, course, quota)
+        r1_lookup = R1Index.from_entries(r1_entries)
+        print(f"   ✓ Loaded {len(r1_lookup)} R1 entries")
         
-        print(f"   ✓ Created lookup table with {len(r1_lookup)} entries")
+        print(f"   ✓ Created lookup index with {r1_lookup.segment_count()} rank segments")
         return r1_lookup
         
     except FileNotFoundError:
-        print(f"   ⚠️ R1 file not found: {r1_js_path}")
-        return {}
+        print(f"   ⚠️ R1 file not found: {r1_path}")
+        return R1Index()
     except Exception as e:
         print(f"   ⚠️ Error loading R1 data: {e}")
-        return {}
+        return R1Index()
 
 
 def lookup_r1_category(r1_lookup, rank, institute, course, quota):
@@ -95,26 +90,25 @@ def lookup_r1_category(r1_lookup, rank, institute, course, quota):
     course_norm = course.lower().strip()
     
     # Try exact match
-    key = (rank, inst_norm, course_norm, quota)
-    if key in r1_lookup:
-        seat_type = r1_lookup[key]
+    seat_type = r1_lookup.lookup(rank, inst_norm, course_norm, quota)
+    if seat_type is not None:
         return seat_type, seat_type
     
     # Try partial matches
     if len(inst_norm) > 30:
-        key_short = (rank, inst_norm[:30], course_norm, quota)
-        if key_short in r1_lookup:
-            return r1_lookup[key_short], r1_lookup[key_short]
+        seat_type = r1_lookup.lookup(rank, inst_norm[:30], course_norm, quota)
+        if seat_type is not None:
+            return seat_type, seat_type
     
     if len(course_norm) > 20:
-        key_course = (rank, inst_norm, course_norm[:20], quota)
-        if key_course in r1_lookup:
-            return r1_lookup[key_course], r1_lookup[key_course]
+        seat_type = r1_lookup.lookup(rank, inst_norm, course_norm[:20], quota)
+        if seat_type is not None:
+            return seat_type, seat_type
     
     # Last resort: just rank and quota
-    for (r, q, st) in r1_lookup:
-        if isinstance(r, int) and r == rank and q == quota:
-            return st, st
+    candidates = r1_lookup.candidates(rank, quota)
+    if candidates:
+        return candidates[0], candidates[0]
     
     return "Open", "General"
 
@@ -221,9 +215,8 @@ def extract_institute_and_place(raw_institute: str) -> str:
             continue
         
         # Skip malformed tokens (likely parsing errors)
-        token_lower = token.lower()
-        malformed_keywords = ['state', 'stateuttar', 'stateuttar pradesh', 'pradesh,', 'nadu,']
-        if any(kw in token_lower for kw in malformed_keywords):
+        hits = classify(token)
+        if hits["malformed"]:
             continue
         
         # Skip tokens that are just addresses/details (too long or contain address keywords)
@@ -231,9 +224,7 @@ def extract_institute_and_place(raw_institute: str) -> str:
             continue
             
         # Skip if it contains too many address keywords
-        address_keywords = ['road', 'rd', 'street', 'st', 'marg', 'salai', 'sector', 
-                           'block', 'phase', 'near', 'opposite']
-        if sum(1 for kw in address_keywords if kw in token_lower) >= 2:
+        if hits["address"] >= 2:
             continue
         
         # This looks like a valid place!
@@ -503,65 +494,29 @@ def convert_to_orcr_format(entries):
     print("🔄 Converting to ORCR format...")
     print(f"   Processing {len(entries)} entries...")
     
-    # First, create all entries
-    all_entries = []
+    # Raw institute strings repeat a lot; parse each distinct one once
+    canonicalize = InstituteCache(extract_institute_and_place)
+    
+    # Running openRank/closeRank per
+    # (institute, academicProgramName, quota, seatType, gender)
+    groups = RankAccumulator()
     for idx, e in enumerate(entries):
         if (idx + 1) % 500 == 0:
             print(f"   ... processed {idx + 1}/{len(entries)} entries")
             
-        all_entries.append({
-            "year": 2025,
-            "round": 2,
-            "type": "NEET_PG",
-            "exam": "NEET_PG",
-            "institute": extract_institute_and_place(e["institute"]),
-            "academicProgramName": e["course"],
-            "quota": e["quota"],
-            "seatType": e["category"],
-            "gender": "Gender-Neutral",
-            "rank": e["rank"],
-        })
-
-    print(f"   ✓ Created {len(all_entries)} ORCR entries")
-    print(f"\n🔗 Consolidating duplicates...")
-
-    # Group by (institute, academicProgramName, quota, seatType, gender)
-    from collections import defaultdict
-    groups = defaultdict(list)
-    
-    for entry in all_entries:
         key = (
-            entry["institute"],
-            entry["academicProgramName"],
-            entry["quota"],
-            entry["seatType"],
-            entry["gender"]
+            canonicalize(e["institute"]),
+            e["course"],
+            e["quota"],
+            e["category"],
+            "Gender-Neutral"
         )
-        groups[key].append(entry["rank"])
-    
+        groups.add(key, e["rank"])
+
     print(f"   ✓ Grouped into {len(groups)} unique combinations")
-    print(f"   ✓ Will merge {len(all_entries) - len(groups)} duplicate entries")
-    
-    # Consolidate: openRank = min, closeRank = max
-    orcr = []
-    for idx, (key, ranks) in enumerate(groups.items()):
-        if (idx + 1) % 500 == 0:
-            print(f"   ... consolidated {idx + 1}/{len(groups)} groups")
-            
-        institute, course, quota, seatType, gender = key
-        orcr.append({
-            "year": 2025,
-            "round": 2,
-            "type": "NEET_PG",
-            "exam": "NEET_PG",
-            "institute": institute,
-            "academicProgramName": course,
-            "quota": quota,
-            "seatType": seatType,
-            "gender": gender,
-            "openRank": min(ranks),
-            "closeRank": max(ranks),
-        })
+    print(f"   ✓ Merged {groups.count - len(groups)} duplicate entries")
+
+    orcr = groups.to_orcr(year=2025, round=2)
 
     print(f"   ✓ Consolidation complete!\n")
     return orcr
@@ -571,7 +526,7 @@ def convert_to_orcr_format(entries):
 
 def main():
     pdf_path = "neet/neet_pg_r2.pdf"
-    r1_js_path = "neet/neetPgR1_2025.js"
+    r1_path = "neet/neetPgR1_2025.ndjson"
     output_js_path = "neet/neetPgR2_2025.js"
     sample_path = "neet/cutoff_2025_r2_sample.json"
 
@@ -579,7 +534,7 @@ def main():
     print("         NEET PG Round 2 Parser - 2025")
     print("=" * 60)
     print(f"📄 Input PDF: {pdf_path}")
-    print(f"📄 R1 Data: {r1_js_path} (for category lookup)")
+    print(f"📄 R1 Data: {r1_path} (for category lookup)")
     print(f"💾 Output JS: {output_js_path}")
     print(f"📋 Sample JSON: {sample_path}")
     print("=" * 60 + "\n")
@@ -594,8 +549,11 @@ def main():
     
     print(f"✓ PDF file found: {pdf_path}\n")
     
-    # Load R1 data for category lookup
-    r1_lookup = load_r1_data(r1_js_path)
+    # Load R1 data for category lookup (older R1 runs only wrote the JS module)
+    legacy_r1_path = os.path.splitext(r1_path)[0] + ".js"
+    if not os.path.exists(r1_path) and os.path.exists(legacy_r1_path):
+        r1_path = legacy_r1_path
+    r1_lookup = load_r1_data(r1_path)
 
     try:
         entries = extract_neet_r2_data(pdf_path, r1_lookup)
@@ -12,125 +12,123 @@ OPTIMIZATIONS:
 - Progress tracking
 - Better error handling
 - R1 category lookup from neetPgR1_2025.js
+- Optional page-sharded parallel extraction (--workers)
+- Streaming pages -> tables -> rows -> consolidation with bounded memory
+- Vectorized per-table cleaning, layout detection and R1/R2 selection
+- Column layout detected once per table and cached by column count
+- Memoized institute canonicalization, optionally persisted (--institute-cache)
+- Per-page tabula output cached on disk by PDF hash and mode (--page-cache)
+- Running min/max consolidation, O(groups) memory instead of O(rows)
+- Per-stage wall/CPU/RSS metrics and R1 lookup tier counts (--metrics), rate-limited progress
 """
 
+import argparse
 import json
+import os
 import sys
 import re
-from collections import defaultdict
+from collections import Counter
 
-try:
-    import tabula
-except ImportError:
-    print("Error: tabula-py not installed.")
-    print("Install with: pip install tabula-py")
-    sys.exit(1)
+import numpy as np
+import pandas as pd
+
+from instituteCache import InstituteCache
+from keywordMatcher import classify, family_pattern
+from neetR1Index import R1Index
+from orcrConsolidate import RankAccumulator
+from orcrExport import attach_college_ids, load_college_ids, iter_ndjson, write_cloudfront_shards, write_js_module, write_ndjson
+from pipelineMetrics import PipelineMetrics
+from tabulaExtract import TabulaReadError, get_service, resolve_workers
 
 
 # -------------------- UTIL --------------------
 
 def clean_text(text):
-    if not text or text != text:
+    # pd.NA (StringDtype's missing value) has no truth value
+    if text is pd.NA or not text or text != text:
         return ""
     return str(text).replace("\r", " ").replace("\n", " ").strip()
 
 
 # -------------------- R1 DATA LOADER --------------------
 
-def load_r1_data(r1_js_path):
+def load_r1_data(r1_path):
     """
-    Load R1 data from neetPgR1_2025.js for category lookup.
-    Returns a dict mapping (rank, institute_key, course_key, quota) -> seatType
+    Load R1 data from neetPgR1_2025.ndjson (or the legacy .js module) for category lookup.
+    Returns an R1Index of (institute, course, quota) -> rank intervals -> seatType
     """
-    print(f"📂 Loading R1 data from {r1_js_path}...")
+    print(f"📂 Loading R1 data from {r1_path}...")
     
     try:
-        with open(r1_js_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        if r1_path.endswith(".js"):
+            with open(r1_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+                
+            # Extract JSON array from JS file (after "export const neetPgR1_2025 = ")
+            json_start = content.find('[')
+            json_end = content.rfind(']') + 1
             
-        # Extract JSON array from JS file (after "export const neetPgR1_2025 = ")
-        json_start = content.find('[')
-        json_end = content.rfind(']') + 1
-        
-        if json_start == -1 or json_end == 0:
-            print("   ⚠️ Could not parse R1 JS file, skipping R1 lookup")
-            return {}
-        
-        r1_entries = json.loads(content[json_start:json_end])
-        print(f"   ✓ Loaded {len(r1_entries)} R1 entries")
-        
-        # Create lookup dict: For each rank in range, map to seatType
-        # We'll create a more flexible lookup
-        r1_lookup = {}
-        
-        for entry in r1_entries:
-            # Normalize institute and course for matching
-            inst_norm = entry['institute'].lower().strip()
-            course_norm = entry['academicProgramName'].lower().strip()
-            quota = entry.get('quota', 'All India')
-            seat_type = entry['seatType']
+            if json_start == -1 or json_end == 0:
+                print("   ⚠️ Could not parse R1 JS file, skipping R1 lookup")
+                return R1Index()
             
-            # Add all ranks in the range
-            for rank in range(entry['openRank'], entry['closeRank'] + 1):
-                # Create multiple keys for better matching
-                key = (rank, inst_norm, course_norm, quota)
-                r1_lookup[key] = seat_type
-                
-                # Also add a simpler key with just rank and quota for fallback
-                simple_key = (rank, quota, seat_type)
-                if simple_key not in r1_lookup:
-                    r1_lookup[simple_key] = seat_type
+            r1_entries = json.loads(content[json_start:json_end])
+        else:
+            # NDJSON streams straight into the index, one record at a time
+            r1_entries = iter_ndjson(r1_path)
         
-        print(f"   ✓ Created lookup table with {len(r1_lookup)} entries")
+        # Interval index keyed by (institute, course, quota)
+        r1_lookup = R1Index.from_entries(r1_entries)
+        print(f"   ✓ Loaded {len(r1_lookup)} R1 entries")
+        
+        print(f"   ✓ Created lookup index with {r1_lookup.segment_count()} rank segments")
         return r1_lookup
         
     except FileNotFoundError:
-        print(f"   ⚠️ R1 file not found: {r1_js_path}")
+        print(f"   ⚠️ R1 file not found: {r1_path}")
         print(f"   R1 category lookup will not be available")
-        return {}
+        return R1Index()
     except Exception as e:
         print(f"   ⚠️ Error loading R1 data: {e}")
-        return {}
+        return R1Index()
 
 
-def lookup_r1_category(r1_lookup, rank, institute, course, quota):
+def lookup_r1_category(r1_lookup, rank, institute, course, quota, metrics=None):
     """
     Lookup seatType from R1 data based on rank, institute, course, and quota.
     Returns (allotted_cat, cand_cat) tuple.
+    Each tier tried is counted in metrics as r1_lookup.<tier>.hit/miss.
     """
     if not r1_lookup:
+        if metrics is not None:
+            metrics.count("r1_lookup.no_index")
         return "Open", "General"
     
     # Normalize for matching
     inst_norm = institute.lower().strip()
     course_norm = course.lower().strip()
     
-    # Try exact match first
-    key = (rank, inst_norm, course_norm, quota)
-    if key in r1_lookup:
-        seat_type = r1_lookup[key]
-        return seat_type, seat_type  # Use same for both
-    
-    # Try partial institute name match (first 30 chars)
+    # Try exact match first, then partial institute name match (first 30 chars),
+    # then simplified course matching (first 20 chars)
+    tiers = [("exact", inst_norm, course_norm)]
     if len(inst_norm) > 30:
-        inst_short = inst_norm[:30]
-        key_short = (rank, inst_short, course_norm, quota)
-        if key_short in r1_lookup:
-            seat_type = r1_lookup[key_short]
-            return seat_type, seat_type
-    
-    # Try with simplified course matching (first 20 chars)
+        tiers.append(("institute_prefix", inst_norm[:30], course_norm))
     if len(course_norm) > 20:
-        course_short = course_norm[:20]
-        key_course = (rank, inst_norm, course_short, quota)
-        if key_course in r1_lookup:
-            seat_type = r1_lookup[key_course]
-            return seat_type, seat_type
+        tiers.append(("course_prefix", inst_norm, course_norm[:20]))
+    
+    for tier, inst_key, course_key in tiers:
+        seat_type = r1_lookup.lookup(rank, inst_key, course_key, quota)
+        if metrics is not None:
+            metrics.count(f"r1_lookup.{tier}.{'miss' if seat_type is None else 'hit'}")
+        if seat_type is not None:
+            return seat_type, seat_type  # Use same for both
     
     # Last resort: just find ANY entry with this rank and quota
-    for (r, q, st) in r1_lookup:
-        if isinstance(r, int) and r == rank and q == quota:
-            return st, st
+    candidates = r1_lookup.candidates(rank, quota)
+    if metrics is not None:
+        metrics.count(f"r1_lookup.rank_quota.{'hit' if candidates else 'miss'}")
+    if candidates:
+        return candidates[0], candidates[0]
     
     # Default fallback
     return "Open", "General"
@@ -210,17 +208,14 @@ def extract_institute_and_place(raw_institute: str) -> str:
         if token.lower().strip() == institute_name.lower().strip():
             continue
         
-        token_lower = token.lower()
-        malformed_keywords = ['state', 'stateuttar', 'stateuttar pradesh', 'pradesh,', 'nadu,']
-        if any(kw in token_lower for kw in malformed_keywords):
+        hits = classify(token)
+        if hits["malformed"]:
             continue
         
         if len(token) > 100:
             continue
             
-        address_keywords = ['road', 'rd', 'street', 'st', 'marg', 'salai', 'sector', 
-                           'block', 'phase', 'near', 'opposite']
-        if sum(1 for kw in address_keywords if kw in token_lower) >= 2:
+        if hits["address"] >= 2:
             continue
         
         place = token
@@ -245,29 +240,26 @@ def extract_institute_and_place(raw_institute: str) -> str:
         return institute_name
 
 
-def is_likely_institute(text: str) -> bool:
+# Same test as is_likely_institute, for pandas str.contains
+INSTITUTE_PATTERN = family_pattern("institute")
+
+
+def is_likely_institute(text: str, hits=None) -> bool:
     """Check if text looks like an institute name"""
     if not text or len(text) < 5:
         return False
     
-    text_lower = text.lower()
-    keywords = ['medical', 'college', 'hospital', 'institute', 'university', 
-                'aiims', 'pgimer', 'jipmer', 'dental', 'nursing']
-    
-    return any(kw in text_lower for kw in keywords)
+    hits = hits if hits is not None else classify(text)
+    return hits["institute"] > 0
 
 
-def is_likely_course(text: str) -> bool:
+def is_likely_course(text: str, hits=None) -> bool:
     """Check if text looks like a course name"""
     if not text or len(text) < 3:
         return False
     
-    text_lower = text.lower()
-    keywords = ['md', 'ms', 'm.d', 'm.s', 'diploma', 'dnb', 'dch', 'da', 'dgo',
-                'medicine', 'surgery', 'paediatrics', 'pediatrics', 'orthopaedics',
-                'ophthalmology', 'anaesthesia', 'anesthesia', 'radiology', 'pathology']
-    
-    return any(kw in text_lower for kw in keywords)
+    hits = hits if hits is not None else classify(text)
+    return hits["course"] > 0
 
 
 # -------------------- SMART COLUMN DETECTION --------------------
@@ -286,6 +278,26 @@ def detect_columns(row):
     5: R1 Candidate Category (optional)
     Then R2 data starts...
     """
+    # Search for institutes (there should be 2: R1 and R2)
+    institute_indices = []
+    course_indices = []
+    
+    for i in range(1, len(row)):
+        cell = clean_text(row[i])
+        hits = classify(cell)
+        if is_likely_institute(cell, hits):
+            institute_indices.append(i)
+        elif is_likely_course(cell, hits):
+            course_indices.append(i)
+    
+    return layout_from_institutes(institute_indices, len(row))
+
+
+def layout_from_institutes(institute_indices, ncols):
+    """
+    Build the detect_columns result for a row of ncols cells whose
+    institute-like cells sit at institute_indices (in column order).
+    """
     result = {
         'rank': None,
         'r1_quota': None,
@@ -303,20 +315,9 @@ def detect_columns(row):
     }
     
     # First column should be rank
-    if len(row) > 0:
+    if ncols > 0:
         result['rank'] = 0
     
-    # Search for institutes (there should be 2: R1 and R2)
-    institute_indices = []
-    course_indices = []
-    
-    for i in range(1, len(row)):
-        cell = clean_text(row[i])
-        if is_likely_institute(cell):
-            institute_indices.append(i)
-        elif is_likely_course(cell):
-            course_indices.append(i)
-    
     # Typically R1 institute is around index 2, R2 institute is around 5-7
     if len(institute_indices) >= 2:
         # First institute is likely R1
@@ -345,205 +346,293 @@ def detect_columns(row):
     
     # Courses typically follow institutes
     # R1 structure: Quota, Institute, Course, Allotted Category, Candidate Category, Remarks
-    if result['r1_institute'] and result['r1_institute'] + 1 < len(row):
+    if result['r1_institute'] and result['r1_institute'] + 1 < ncols:
         result['r1_course'] = result['r1_institute'] + 1
         # Category info comes after course
-        if result['r1_course'] + 1 < len(row):
+        if result['r1_course'] + 1 < ncols:
             result['r1_allotted_cat'] = result['r1_course'] + 1
-        if result['r1_course'] + 2 < len(row):
+        if result['r1_course'] + 2 < ncols:
             result['r1_cand_cat'] = result['r1_course'] + 2
-        if result['r1_course'] + 3 < len(row):
+        if result['r1_course'] + 3 < ncols:
             result['r1_remarks'] = result['r1_course'] + 3
     
-    if result['r2_institute'] and result['r2_institute'] + 1 < len(row):
+    if result['r2_institute'] and result['r2_institute'] + 1 < ncols:
         result['r2_course'] = result['r2_institute'] + 1
         # Categories come after course
-        if result['r2_course'] + 1 < len(row):
+        if result['r2_course'] + 1 < ncols:
             result['r2_allotted_cat'] = result['r2_course'] + 1
-        if result['r2_course'] + 2 < len(row):
+        if result['r2_course'] + 2 < ncols:
             result['r2_cand_cat'] = result['r2_course'] + 2
         # Remarks is typically the last column
-        result['r2_remarks'] = len(row) - 1
+        result['r2_remarks'] = ncols - 1
     
     return result
 
 
 # -------------------- PDF EXTRACTION --------------------
 
-def extract_neet_r2_data(pdf_path: str, r1_lookup: dict):
+# Row outcomes of resolve_table_rows
+ROW_USE_R2 = 0
+ROW_USE_R1 = 1
+ROW_INVALID = 2
+ROW_NO_DATA = 3
+
+PLACEHOLDERS = ["-", "--", "---", "NA", "N/A"]
+
+# Rows sampled to detect a table's column layout
+LAYOUT_SAMPLE_ROWS = 25
+
+
+def clean_column(col):
+    """Vectorized clean_text over one DataFrame column."""
+    values = col.astype(object)
+    blank = values.isna() | (values == 0) | (values == "")
+    text = values.where(~blank, "").astype(str)
+    # Most columns have no line breaks; skip the replace pass for them
+    if text.str.contains("[\r\n]", regex=True).any():
+        text = text.str.replace("[\r\n]", " ", regex=True)
+    return text.str.strip()
+
+
+def institute_like(cells):
+    """Vectorized is_likely_institute over a cleaned column, as a numpy mask."""
+    return ((cells.str.len() >= 5)
+            & cells.str.contains(INSTITUTE_PATTERN, case=False, regex=True)).to_numpy()
+
+
+def institute_signature(cleaned):
     """
-    Extract Round 2 data from NEET PG Round 2 PDF with optimized parsing.
-    Uses r1_lookup to get correct categories for R1 fallback entries.
+    Positions of the first two institute-like cells (columns 1..) of every
+    row, -1 where missing. These two positions fully decide detect_columns.
     """
-    print("\n🔍 Starting optimized PDF extraction...")
-    print("   Reading PDF with tabula (lattice mode for better accuracy)...")
-    
-    # Try lattice mode first (better for structured tables)
-    try:
-        dfs = tabula.read_pdf(
-            pdf_path, 
-            pages="all", 
-            multiple_tables=True,
-            lattice=True,  # Better for structured tables
-            pandas_options={'header': None}  # Don't assume first row is header
-        )
-        print(f"   ✓ Successfully read PDF using lattice mode")
-    except:
-        # Fallback to stream mode
-        print("   ⚠ Lattice mode failed, trying stream mode...")
-        dfs = tabula.read_pdf(
-            pdf_path, 
-            pages="all", 
-            multiple_tables=True,
-            stream=True
-        )
-        print(f"   ✓ Successfully read PDF using stream mode")
-    
-    print(f"   ✓ Found {len(dfs)} tables to process\n")
+    mask = np.column_stack([institute_like(cleaned[i]) for i in cleaned.columns[1:]])
+    rows = np.arange(len(mask))
+
+    first_pos = mask.argmax(axis=1)
+    first = np.where(mask.any(axis=1), first_pos + 1, -1)
+
+    rest = mask.copy()
+    rest[rows, first_pos] = False
+    second = np.where(rest.any(axis=1), rest.argmax(axis=1) + 1, -1)
+    return first, second
+
+
+def table_signature(cleaned, layout_cache):
+    """
+    institute_signature for a whole table, using a cached per-table layout.
+
+    The layout (first two institute columns) is detected once from a sample
+    of rows and cached by column count, since a tabula table, and usually a
+    whole PDF, keeps one layout. A row fits the cached layout when both
+    institute columns match and nothing before the second one does, which
+    only needs the columns up to the second institute. Rows that don't fit
+    fall back to full detection, so results match per-row detect_columns.
+    A sample without two institute columns (a header or notes table) is
+    not cached, so the next table of that width is sampled again.
+    """
+    ncols = cleaned.shape[1]
+    layout = layout_cache.get(ncols)
+    if layout is None:
+        sample_first, sample_second = institute_signature(cleaned.head(LAYOUT_SAMPLE_ROWS))
+        pairs = Counter(zip(sample_first.tolist(), sample_second.tolist()))
+        layout = pairs.most_common(1)[0][0]
+        if layout[1] >= 0:
+            layout_cache[ncols] = layout
+
+    a, b = layout
+    if b < 0:
+        # Fewer than two institutes: confirming a fit needs every column anyway
+        return institute_signature(cleaned)
+
+    fits = institute_like(cleaned[a]) & institute_like(cleaned[b])
+    for i in range(1, b):
+        if i != a:
+            fits &= ~institute_like(cleaned[i])
+
+    first = np.full(len(cleaned), a)
+    second = np.full(len(cleaned), b)
+    misfit = ~fits
+    if misfit.any():
+        first[misfit], second[misfit] = institute_signature(cleaned[misfit])
+    return first, second
+
+
+def resolve_table_rows(rows, layout_cache=None):
+    """
+    Vectorized equivalent of running clean_text + detect_columns + the R2/R1
+    validity checks on every row of a tabula table.
+
+    Rows sharing an institute signature share a column layout, so each
+    layout is resolved once and its rows are cleaned, filtered and picked
+    with column-wise boolean masks. Returns parallel lists
+    (status, rank, quota, institute, course, allotted_cat, cand_cat) in
+    row order; R1 rows carry empty categories for the caller to look up.
+
+    layout_cache maps column count -> detected layout and is shared across
+    the tables of one PDF.
+    """
+    if layout_cache is None:
+        layout_cache = {}
+    ncols = rows.shape[1]
+    n = len(rows)
+    cleaned = pd.DataFrame(
+        {i: clean_column(rows.iloc[:, i]) for i in range(ncols)}
+    ).reset_index(drop=True)
+
+    status = np.full(n, ROW_INVALID)
+    out = {name: np.full(n, "", dtype=object)
+           for name in ("quota", "institute", "course", "allotted_cat", "cand_cat")}
+
+    rank = cleaned[0]
+    rank_ok = rank.str.isdigit().to_numpy()
+    valid = cleaned[rank_ok]
+
+    if len(valid):
+        first, second = table_signature(valid, layout_cache)
+        positions = np.flatnonzero(rank_ok)
+        signatures = pd.DataFrame({"first": first, "second": second})
+
+        for (a, b), group in signatures.groupby(["first", "second"]).indices.items():
+            cols = layout_from_institutes([i for i in (a, b) if i >= 0], ncols)
+            sub = valid.iloc[group]
+            idx = positions[group]
+
+            def pick(name, default):
+                col = cols[name]
+                if col is None:
+                    return pd.Series(default, index=sub.index)
+                return sub[col]
+
+            # R2 data is valid when present, not a placeholder and not "did not opt"
+            if cols['r2_institute'] is not None and cols['r2_course'] is not None:
+                r2_institute = sub[cols['r2_institute']]
+                r2_course = sub[cols['r2_course']]
+                r2_remarks = pick('r2_remarks', "")
+                r2_valid = ((r2_institute != "") & (r2_course != "")
+                            & ~r2_institute.isin(PLACEHOLDERS)
+                            & ~r2_course.isin(PLACEHOLDERS)
+                            & ~r2_remarks.str.lower().str.contains("not opt", regex=False))
+            else:
+                r2_valid = pd.Series(False, index=sub.index)
+
+            has_r1 = cols['r1_institute'] is not None and cols['r1_course'] is not None
+            r2_valid = r2_valid.to_numpy()
+
+            if has_r1:
+                r1_institute = sub[cols['r1_institute']]
+                r1_course = sub[cols['r1_course']]
+                r1_ok = ((r1_institute != "") & (r1_course != "")
+                         & ~r1_institute.isin(PLACEHOLDERS)
+                         & ~r1_course.isin(PLACEHOLDERS)).to_numpy()
+                r1_status = np.where(r1_ok, ROW_USE_R1, ROW_INVALID)
+
+                quota = np.where(r2_valid, pick('r2_quota', "All India"), pick('r1_quota', "All India"))
+                institute = np.where(r2_valid, sub[cols['r2_institute']] if cols['r2_institute'] is not None else "", r1_institute)
+                course = np.where(r2_valid, sub[cols['r2_course']] if cols['r2_course'] is not None else "", r1_course)
+            else:
+                r1_status = np.full(len(sub), ROW_NO_DATA)
+                quota = pick('r2_quota', "All India").to_numpy()
+                institute = pick('r2_institute', "").to_numpy()
+                course = pick('r2_course', "").to_numpy()
+
+            status[idx] = np.where(r2_valid, ROW_USE_R2, r1_status)
+            out["quota"][idx] = quota
+            out["institute"][idx] = institute
+            out["course"][idx] = course
+            out["allotted_cat"][idx] = np.where(r2_valid, pick('r2_allotted_cat', "Open"), "")
+            out["cand_cat"][idx] = np.where(r2_valid, pick('r2_cand_cat', "General"), "")
+
+    return (status.tolist(), rank.tolist(), out["quota"].tolist(), out["institute"].tolist(),
+            out["course"].tolist(), out["allotted_cat"].tolist(), out["cand_cat"].tolist())
+
+
+# tabula options per read mode, tried in order
+READ_MODES = [
+    ("lattice", {
+        "multiple_tables": True,
+        "lattice": True,  # Better for structured tables
+        "pandas_options": {'header': None},  # Don't assume first row is header
+    }),
+    ("stream", {
+        "multiple_tables": True,
+        "stream": True,
+    }),
+]
+
+
+def new_extraction_stats():
+    return {
+        "entries": 0,
+        "rows_with_r2": 0,
+        "rows_with_r1_only": 0,
+        "skipped_invalid": 0,
+        "skipped_no_data": 0,
+        "tables_processed": 0,
+        "tables_skipped_too_small": 0,
+    }
 
-    all_entries = []
-    skipped_invalid = 0
-    used_r1_fallback = 0
-    skipped_no_data = 0
-    
-    # Statistics
-    tables_processed = 0
-    tables_skipped_too_small = 0
-    rows_with_r2 = 0
-    rows_with_r1_only = 0
 
-    for table_idx, df in enumerate(dfs):
+def iter_neet_r2_entries(tables, r1_lookup: R1Index, stats: dict, metrics=None):
+    """
+    Yield normalized Round 2 entries from a stream of tabula tables.
+    Uses r1_lookup to get correct categories for R1 fallback entries.
+    Counters are accumulated into stats as rows are consumed; column
+    detection and R1 lookups are timed as stages of metrics.
+    """
+    metrics = metrics or PipelineMetrics()
+    layout_cache = {}
+    rows_seen = 0
+    
+    for table_idx, df in enumerate(tables):
         if df.empty:
-            print(f"⊘ Table {table_idx + 1}/{len(dfs)}: Empty, skipping...")
             continue
 
-        valid_in_table = 0
-        print(f"\n{'='*60}")
-        print(f"📊 Processing table {table_idx + 1}/{len(dfs)}")
-        print(f"{'='*60}")
-        print(f"   Columns: {len(df.columns)}")
-        print(f"   Rows: {len(df)}")
-
         # IMPROVED: Don't skip tables with fewer columns - they might have data
         # Only skip if < 5 columns (definitely not enough)
         if len(df.columns) < 5:
-            print(f"   ⚠ Skipping table (too few columns: {len(df.columns)} < 5)\n")
-            tables_skipped_too_small += 1
+            stats["tables_skipped_too_small"] += 1
             continue
 
-        print(f"   ✓ Valid column count, processing rows...")
-
         # Check if first row is header
         first_row = df.iloc[0].tolist()
         has_header = any("Rank" in str(cell) or "Quota" in str(cell) or "Institute" in str(cell) 
                         for cell in first_row if cell and cell == cell)
         start_idx = 1 if has_header else 0
-        
-        if has_header:
-            print(f"   ✓ Detected header row, starting from row 2")
-        else:
-            print(f"   ✓ No header detected, starting from row 1")
+        rows_seen += len(df) - start_idx
 
-        total_rows = len(df.iloc[start_idx:])
-        print(f"   ⏳ Processing {total_rows} data rows...")
+        if metrics.progress_due("tables"):
+            print(f"   ⏳ Table {table_idx + 1}: {len(df.columns)} columns, "
+                  f"{stats['entries']} entries from {rows_seen} rows so far")
         
-        rows_processed = 0
+        with metrics.stage("detect_columns"):
+            table = resolve_table_rows(df.iloc[start_idx:], layout_cache)
 
-        for row_idx, row in df.iloc[start_idx:].iterrows():
-            rows_processed += 1
-            
-            # Show progress every 50 rows (more frequent updates)
-            if rows_processed % 50 == 0:
-                print(f"      ... {rows_processed}/{total_rows} rows (found {valid_in_table} valid entries, skipped {skipped_invalid})")
-            
-            row = row.tolist()
-            
-            # IMPROVED: Process rows with at least 5 columns (was 10)
-            if len(row) < 5:
+        for status, rank, quota, institute, course, allotted_cat, cand_cat in zip(*table):
+            if status == ROW_INVALID:
+                stats["skipped_invalid"] += 1
                 continue
-
-            # Extract rank from first column
-            rank = clean_text(row[0])
-            if not rank or not rank.isdigit():
-                skipped_invalid += 1
+            if status == ROW_NO_DATA:
+                stats["skipped_no_data"] += 1
                 continue
-
-            # SMART COLUMN DETECTION
-            cols = detect_columns(row)
             
-            # Determine if we should use R2 or R1 data
-            use_r1_data = False
-            r2_data_valid = False
-            
-            # Check if R2 data exists
-            if cols['r2_institute'] is not None and cols['r2_course'] is not None:
-                r2_institute = clean_text(row[cols['r2_institute']])
-                r2_course = clean_text(row[cols['r2_course']])
-                
-                # Check if R2 remarks indicate "did not opt"
-                r2_remarks = ""
-                if cols['r2_remarks'] is not None:
-                    r2_remarks = clean_text(row[cols['r2_remarks']])
-                
-                # Validate R2 data
-                if r2_institute and r2_course and \
-                   r2_institute not in ["-", "--", "---", "NA", "N/A"] and \
-                   r2_course not in ["-", "--", "---", "NA", "N/A"]:
-                    
-                    # Check if user opted out
-                    if "did not opt" not in r2_remarks.lower() and "not opt" not in r2_remarks.lower():
-                        r2_data_valid = True
-            
-            # If R2 data is not valid, try R1
-            if not r2_data_valid:
-                use_r1_data = True
-            
-            # Extract data based on which round we're using
+            use_r1_data = status == ROW_USE_R1
             try:
-                if use_r1_data and cols['r1_institute'] is not None and cols['r1_course'] is not None:
-                    # Use Round 1 data
-                    quota = clean_text(row[cols['r1_quota']]) if cols['r1_quota'] is not None else "All India"
-                    institute = clean_text(row[cols['r1_institute']])
-                    course = clean_text(row[cols['r1_course']])
-                    
-                    # Validate R1 data
-                    if not institute or not course:
-                        skipped_invalid += 1
-                        continue
-                    
-                    if institute in ["-", "--", "---", "NA", "N/A"] or \
-                       course in ["-", "--", "---", "NA", "N/A"]:
-                        skipped_invalid += 1
-                        continue
-                    
+                if use_r1_data:
                     # Lookup R1 category from R1 data using rank
-                    allotted_cat, cand_cat = lookup_r1_category(
-                        r1_lookup, 
-                        int(rank), 
-                        institute, 
-                        course, 
-                        quota
-                    )
-                    
-                    used_r1_fallback += 1
-                    rows_with_r1_only += 1
-                    
-                elif r2_data_valid:
-                    # Use Round 2 data
-                    quota = clean_text(row[cols['r2_quota']]) if cols['r2_quota'] is not None else "All India"
-                    institute = clean_text(row[cols['r2_institute']])
-                    course = clean_text(row[cols['r2_course']])
-                    allotted_cat = clean_text(row[cols['r2_allotted_cat']]) if cols['r2_allotted_cat'] is not None else "Open"
-                    cand_cat = clean_text(row[cols['r2_cand_cat']]) if cols['r2_cand_cat'] is not None else "General"
-                    
-                    rows_with_r2 += 1
-                    
+                    with metrics.stage("r1_lookup"):
+                        allotted_cat, cand_cat = lookup_r1_category(
+                            r1_lookup, 
+                            int(rank), 
+                            institute, 
+                            course, 
+                            quota,
+                            metrics
+                        )
+                    stats["rows_with_r1_only"] += 1
                 else:
-                    # No valid data found
-                    skipped_no_data += 1
-                    continue
+                    stats["rows_with_r2"] += 1
 
-                all_entries.append({
+                entry = {
                     "rank": int(rank),
                     "quota": quota if quota and quota != "-" else "All India",
                     "institute": institute,
@@ -551,51 +640,113 @@ def extract_neet_r2_data(pdf_path: str, r1_lookup: dict):
                     "category": allotted_cat if allotted_cat and allotted_cat not in ["-", "NA"] else "Open",
                     "candidate_category": cand_cat if cand_cat and cand_cat not in ["-", "NA"] else "General",
                     "used_r1": use_r1_data,
-                })
-                valid_in_table += 1
-                
-            except (ValueError, IndexError) as e:
-                skipped_invalid += 1
+                }
+            except ValueError:
+                stats["skipped_invalid"] += 1
                 continue
 
-        tables_processed += 1
-        print(f"   ✓ Table {table_idx + 1} complete: Found {valid_in_table} valid entries")
+            stats["entries"] += 1
+            yield entry
+
+        stats["tables_processed"] += 1
 
     print(f"\n{'='*60}")
     print(f"📊 EXTRACTION SUMMARY")
     print(f"{'='*60}")
-    print(f"  ✅ Valid entries extracted: {len(all_entries)}")
-    print(f"  📊 Used Round 2 data: {rows_with_r2}")
-    print(f"  📊 Used Round 1 fallback: {rows_with_r1_only}")
-    print(f"  ⊘ Skipped (invalid rank/data): {skipped_invalid}")
-    print(f"  ⊘ Skipped (no valid R1/R2 data): {skipped_no_data}")
-    print(f"  📊 Tables processed: {tables_processed}")
-    print(f"  ⊘ Tables skipped (too small): {tables_skipped_too_small}")
+    print(f"  ✅ Valid entries extracted: {stats['entries']}")
+    print(f"  📊 Used Round 2 data: {stats['rows_with_r2']}")
+    print(f"  📊 Used Round 1 fallback: {stats['rows_with_r1_only']}")
+    print(f"  ⊘ Skipped (invalid rank/data): {stats['skipped_invalid']}")
+    print(f"  ⊘ Skipped (no valid R1/R2 data): {stats['skipped_no_data']}")
+    print(f"  📊 Tables processed: {stats['tables_processed']}")
+    print(f"  ⊘ Tables skipped (too small): {stats['tables_skipped_too_small']}")
+    print(f"  📊 Rows read: {rows_seen}")
     print(f"{'='*60}\n")
 
-    return all_entries
+
+def iter_tables_with_fallback(pdf_path: str, service=None):
+    """
+    Yield (mode, tables) for each tabula read mode in order, lattice first.
+    The caller moves on to the next mode when tables raises TabulaReadError.
+    """
+    service = service or get_service()
+    for mode, options in READ_MODES:
+        print(f"   Reading PDF with tabula ({mode} mode)...")
+        yield mode, service.iter_tables(pdf_path, **options)
+
+
+def extract_neet_r2_data(pdf_path: str, r1_lookup: R1Index, service=None):
+    """
+    Extract Round 2 data from NEET PG Round 2 PDF with optimized parsing.
+    Returns the full list of entries; parse_neet_r2 streams instead.
+    """
+    print("\n🔍 Starting optimized PDF extraction...")
+    for mode, tables in iter_tables_with_fallback(pdf_path, service):
+        try:
+            return list(iter_neet_r2_entries(tables, r1_lookup, new_extraction_stats()))
+        except TabulaReadError:
+            if mode == READ_MODES[-1][0]:
+                raise
+            print(f"   ⚠ {mode.capitalize()} mode failed, trying next mode...")
+
+
+def parse_neet_r2(pdf_path: str, r1_lookup: R1Index, service=None, canonicalize=None,
+                  year=2025, round=2, metrics=None):
+    """
+    Streaming pipeline: pages -> tables -> normalized entries -> consolidated
+    ORCR rows. Each stage pulls lazily, so only a few pages of tables are
+    held at once. If tabula fails in lattice mode the pipeline restarts in
+    stream mode, matching the old read-everything-then-fallback behaviour.
+    Each step is timed as a stage of metrics; a failed mode's partial pass
+    is kept apart under "aborted_<mode>.". Returns (orcr, stats).
+    """
+    metrics = metrics or PipelineMetrics()
+    canonicalize = canonicalize or InstituteCache(extract_institute_and_place)
+    print("\n🔍 Starting optimized PDF extraction...")
+    for mode, tables in iter_tables_with_fallback(pdf_path, service):
+        stats = new_extraction_stats()
+        attempt = PipelineMetrics(metrics.run, metrics.progress_interval)
+        tables = attempt.iterate("tabula", tables)
+        entries = attempt.iterate("rows", iter_neet_r2_entries(tables, r1_lookup, stats, attempt))
+        try:
+            with attempt.stage("consolidate"):
+                orcr = convert_to_orcr_format(
+                    entries, attempt.timed("institute", canonicalize), year, round, attempt)
+        except TabulaReadError:
+            metrics.merge(attempt, f"aborted_{mode}.")
+            if mode == READ_MODES[-1][0]:
+                raise
+            print(f"   ⚠ {mode.capitalize()} mode failed, trying next mode...")
+            continue
+        metrics.merge(attempt)
+        metrics.info["tabula_mode"] = mode
+        print(f"   ✓ Successfully read PDF using {mode} mode")
+        return orcr, stats
 
 
 # -------------------- ORCR FORMAT --------------------
 
-def convert_to_orcr_format(entries):
+def convert_to_orcr_format(entries, canonicalize=None, year=2025, round=2, metrics=None):
     """
     Convert entries to ORCR format and consolidate duplicates.
-    OPTIMIZED: Process in batches and use efficient grouping.
+    OPTIMIZED: Consumes any iterable of entries, grouping as they arrive.
+    Institute names go through canonicalize (an InstituteCache around
+    extract_institute_and_place by default), so repeated raw strings are
+    only parsed once.
     """
+    canonicalize = canonicalize or InstituteCache(extract_institute_and_place)
+    metrics = metrics or PipelineMetrics()
     print("🔄 Converting to ORCR format...")
-    print(f"   Processing {len(entries)} entries...")
     
-    # Group by key immediately (more efficient)
-    groups = defaultdict(list)
+    # Running openRank/closeRank per key, updated as entries arrive
+    groups = RankAccumulator()
     
-    batch_size = 1000
     for idx, e in enumerate(entries):
-        if (idx + 1) % batch_size == 0:
-            print(f"   ... processed {idx + 1}/{len(entries)} entries (found {len(groups)} unique combinations)")
+        if metrics.progress_due("consolidate"):
+            print(f"   ... processed {idx + 1} entries (found {len(groups)} unique combinations)")
         
         # Create key for grouping
-        institute = extract_institute_and_place(e["institute"])
+        institute = canonicalize(e["institute"])
         key = (
             institute,
             e["course"],
@@ -604,33 +755,12 @@ def convert_to_orcr_format(entries):
             "Gender-Neutral"  # Fixed gender
         )
         
-        groups[key].append(e["rank"])
+        groups.add(key, e["rank"])
     
     print(f"   ✓ Grouped into {len(groups)} unique combinations")
-    print(f"   ✓ Will merge {len(entries) - len(groups)} duplicate entries")
-    
-    # Consolidate: openRank = min, closeRank = max
-    print(f"\n🔗 Consolidating groups...")
-    orcr = []
+    print(f"   ✓ Merged {groups.count - len(groups)} duplicate entries")
     
-    for idx, (key, ranks) in enumerate(groups.items()):
-        if (idx + 1) % batch_size == 0:
-            print(f"   ... consolidated {idx + 1}/{len(groups)} groups")
-        
-        institute, course, quota, seatType, gender = key
-        orcr.append({
-            "year": 2025,
-            "round": 2,
-            "type": "NEET_PG",
-            "exam": "NEET_PG",
-            "institute": institute,
-            "academicProgramName": course,
-            "quota": quota,
-            "seatType": seatType,
-            "gender": gender,
-            "openRank": min(ranks),
-            "closeRank": max(ranks),
-        })
+    orcr = groups.to_orcr(year=year, round=round)
 
     print(f"   ✓ Consolidation complete!\n")
     return orcr
@@ -638,23 +768,60 @@ def convert_to_orcr_format(entries):
 
 # -------------------- MAIN --------------------
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="NEET PG Round 2 PDF Parser - OPTIMIZED")
+    parser.add_argument("--pdf", default="neet/neet_pg_r2.pdf", help="allotment PDF to parse")
+    parser.add_argument("--r1", default="neet/neetPgR1_2025.ndjson",
+                        help="Round 1 parser output used for the R1 category fallback")
+    parser.add_argument("--out", default="neet/neetPgR2_2025_optimized.ndjson", help="NDJSON output path")
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--round", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="parallel tabula workers over page shards (0 = one per CPU core)")
+    parser.add_argument("--institute-cache", metavar="SQLITE_PATH",
+                        help="persist canonicalized institute names across runs in this SQLite file")
+    parser.add_argument("--page-cache", metavar="DIR",
+                        help="cache tabula output per PDF page in DIR; reruns on an unchanged PDF skip tabula")
+    parser.add_argument("--js", action="store_true",
+                        help="also write the legacy JS module (neetPgR2_<year>) next to the NDJSON output")
+    parser.add_argument("--shards", metavar="DIR",
+                        help="also write the CloudFront shard ({year}-{round}-NEET_PG-NEET_PG.json + .gz/.br) to DIR")
+    parser.add_argument("--columnar", action="store_true",
+                        help="with --shards, also write dictionary-encoded .columnar.json shards")
+    parser.add_argument("--colleges", metavar="PATH",
+                        help="{name: id} college map (e.g. scripts/clgMap.json) or SQLite db with a College "
+                             "table; required by --shards to set each row's collegeId")
+    parser.add_argument("--metrics", metavar="JSON_PATH",
+                        help="per-stage timing/memory report (default: <out>.metrics.json)")
+    args = parser.parse_args()
+    if args.shards and not args.colleges:
+        parser.error("--shards needs --colleges: shard rows link to /explore/{collegeId}")
+    return args
+
+
 def main():
-    pdf_path = "neet/neet_pg_r2.pdf"
-    r1_js_path = "neet/neetPgR1_2025.js"
-    output_js_path = "neet/neetPgR2_2025_optimized.js"
-    sample_path = "neet/cutoff_2025_r2_sample_optimized.json"
+    args = parse_args()
+    pdf_path = args.pdf
+    r1_path = args.r1
+    output_path = args.out
+    output_js_path = os.path.splitext(output_path)[0] + ".js"
+    metrics_path = args.metrics or os.path.splitext(output_path)[0] + ".metrics.json"
+    sample_path = os.path.join(os.path.dirname(output_path),
+                               f"cutoff_{args.year}_r{args.round}_sample_optimized.json")
+    metrics = PipelineMetrics(f"NEET_PG-{args.year}-R{args.round}")
+    metrics.info.update(parser="parseNeetPgR2_optimized.py", pdf=pdf_path, r1=r1_path,
+                        out=output_path, workers=args.workers)
 
     print("\n" + "=" * 60)
     print("      NEET PG Round 2 Parser - OPTIMIZED")
     print("=" * 60)
     print(f"📄 Input PDF: {pdf_path}")
-    print(f"📄 R1 Data: {r1_js_path} (for category lookup)")
-    print(f"💾 Output JS: {output_js_path}")
+    print(f"📄 R1 Data: {r1_path} (for category lookup)")
+    print(f"💾 Output: {output_path}")
     print(f"📋 Sample JSON: {sample_path}")
     print("=" * 60 + "\n")
 
     # Check if PDF exists
-    import os
     if not os.path.exists(pdf_path):
         print(f"❌ ERROR: PDF file not found at: {pdf_path}")
         print(f"   Current directory: {os.getcwd()}")
@@ -663,11 +830,31 @@ def main():
     
     print(f"✓ PDF file found: {pdf_path}\n")
     
-    # Load R1 data for category lookup
-    r1_lookup = load_r1_data(r1_js_path)
+    # Load R1 data for category lookup (older runs only wrote the JS module)
+    legacy_r1_path = os.path.splitext(r1_path)[0] + ".js"
+    if not os.path.exists(r1_path) and os.path.exists(legacy_r1_path):
+        r1_path = legacy_r1_path
+    with metrics.stage("r1_load"):
+        r1_lookup = load_r1_data(r1_path)
+    college_ids = load_college_ids(args.colleges) if args.colleges else {}
+    shards_failed = False
 
     try:
-        entries = extract_neet_r2_data(pdf_path, r1_lookup)
+        service = get_service(resolve_workers(args.workers), args.page_cache)
+        with InstituteCache(extract_institute_and_place, args.institute_cache) as canonicalize:
+            orcr, stats = parse_neet_r2(pdf_path, r1_lookup, service, canonicalize,
+                                        args.year, args.round, metrics)
+            cache_stats = canonicalize.stats()
+        metrics.counters.update(stats)
+        metrics.count("orcr_rows", len(orcr))
+        metrics.count("institute_cache.hits", cache_stats["hits"])
+        metrics.count("institute_cache.disk_hits", cache_stats["disk_hits"])
+        print(f"   🗂 Institute cache: {cache_stats['size']} names, "
+              f"{cache_stats['hits']} hits, {cache_stats['disk_hits']} from disk")
+        if service.page_cache is not None:
+            print(f"   🗄 Page cache: {service.page_cache.hits} pages reused, {service.page_cache.misses} read")
+            metrics.count("page_cache.hits", service.page_cache.hits)
+            metrics.count("page_cache.misses", service.page_cache.misses)
     except Exception as e:
         print(f"\n❌ ERROR during PDF extraction:")
         print(f"   {type(e).__name__}: {e}")
@@ -675,7 +862,8 @@ def main():
         traceback.print_exc()
         sys.exit(1)
     
-    if not entries:
+    entry_count = stats["entries"]
+    if not entry_count:
         print("\n❌ ERROR: No data extracted from PDF")
         print("   Please check:")
         print("   1. PDF file exists at: " + pdf_path)
@@ -684,60 +872,73 @@ def main():
         print("   4. PDF has the expected table structure")
         sys.exit(1)
 
-    # Count R1 fallbacks
-    r1_count = sum(1 for e in entries if e.get("used_r1", False))
-    r2_count = len(entries) - r1_count
+    r1_count = stats["rows_with_r1_only"]
+    r2_count = stats["rows_with_r2"]
 
-    print(f"✅ Successfully extracted {len(entries)} total entries")
+    print(f"✅ Successfully extracted {entry_count} total entries")
     print(f"   📊 Round 2 data: {r2_count} entries")
     print(f"   📊 Round 1 fallback: {r1_count} entries\n")
 
-    try:
-        orcr = convert_to_orcr_format(entries)
-    except Exception as e:
-        print(f"\n❌ ERROR during ORCR conversion:")
-        print(f"   {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
-
     print("=" * 60)
     print("📊 FINAL STATISTICS")
     print("=" * 60)
-    print(f"  Raw entries extracted: {len(entries)}")
+    print(f"  Raw entries extracted: {entry_count}")
     print(f"    - Round 2 data: {r2_count}")
     print(f"    - Round 1 fallback: {r1_count}")
     print(f"  After consolidation: {len(orcr)} unique entries")
-    print(f"  Duplicates merged: {len(entries) - len(orcr)}")
+    print(f"  Duplicates merged: {entry_count - len(orcr)}")
     print("=" * 60 + "\n")
 
     print("💾 Writing output files...")
     
     try:
-        # Export as JavaScript module
-        with open(output_js_path, "w", encoding="utf-8") as f:
-            f.write("// NEET PG Round 2 2025 Cutoff Data - OPTIMIZED PARSER\n")
-            f.write("// Generated by parseNeetPgR2_optimized.py\n")
-            f.write("// Total entries: " + str(len(orcr)) + "\n")
-            f.write(f"// Round 2 data: {r2_count}, Round 1 fallback: {r1_count}\n")
-            f.write("// Duplicates consolidated with openRank/closeRank\n")
-            f.write("// Note: Uses Round 2 data when available, falls back to Round 1 when R2 is absent\n\n")
-            f.write("export const neetPgR2_2025 = ")
-            f.write(json.dumps(orcr, indent=2))
-            f.write(";\n")
+        with metrics.stage("write"):
+            # Stream records out as NDJSON, one compact object per line
+            write_ndjson(orcr, output_path)
+            print(f"   ✓ Saved {len(orcr)} entries to {output_path}")
+
+            if args.js:
+                write_js_module(orcr, output_js_path, f"neetPgR{args.round}_{args.year}", [
+                    f"NEET PG Round {args.round} {args.year} Cutoff Data - OPTIMIZED PARSER",
+                    "Generated by parseNeetPgR2_optimized.py",
+                    "Total entries: " + str(len(orcr)),
+                    f"Round 2 data: {r2_count}, Round 1 fallback: {r1_count}",
+                    "Duplicates consolidated with openRank/closeRank",
+                    "Note: Uses Round 2 data when available, falls back to Round 1 when R2 is absent",
+                ])
+                print(f"   ✓ Saved {len(orcr)} entries to {output_js_path}")
+
+            # Save sample JSON for inspection
+            with open(sample_path, "w", encoding="utf-8") as f:
+                json.dump(orcr[:10], f, indent=2)
         
-        print(f"   ✓ Saved {len(orcr)} entries to {output_js_path}")
+            print(f"   ✓ Sample written to {sample_path}")
+
+            if args.shards:
+                shard_rows, missing = attach_college_ids(orcr, college_ids)
+                if missing:
+                    shards_failed = True
+                    print(f"   ❌ {len(missing)} institutes have no College in {args.colleges}; shards not written:")
+                    for institute in missing[:10]:
+                        print(f"      - {institute}")
+                    print(f"      Load {output_path} with loadOrcrSql.py (it creates missing colleges), "
+                          "re-export the college map and rerun")
+                else:
+                    for name, (count, suffixes) in write_cloudfront_shards(shard_rows, args.shards, columnar=args.columnar).items():
+                        print(f"   ✓ Shard {name} (+{'/'.join(suffixes)}): {count} entries → {args.shards}")
 
-        # Save sample JSON for inspection
-        with open(sample_path, "w", encoding="utf-8") as f:
-            json.dump(orcr[:10], f, indent=2)
-        
-        print(f"   ✓ Sample written to {sample_path}")
+        report = metrics.write(metrics_path)
+        print(f"   ✓ Metrics written to {metrics_path}")
     except Exception as e:
         print(f"\n❌ ERROR writing output files:")
         print(f"   {type(e).__name__}: {e}")
         sys.exit(1)
 
+    print()
+    metrics.print_summary(report)
+    if shards_failed:
+        sys.exit(1)
+
     print("\n" + "=" * 60)
     print("📋 SAMPLE OUTPUT (First 5 entries)")
     print("=" * 60)
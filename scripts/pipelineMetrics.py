@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Stage-level metrics for the cutoff parsers
+Records wall time, CPU time and peak RSS per pipeline stage (tabula
+extraction, column detection, R1 lookups, institute canonicalization,
+consolidation, output), plus named counters, and writes them as one JSON
+report per run.
+
+Stages nest, and time is charged to the innermost active stage only, so
+the stages of a lazy pipeline (tables -> rows -> groups) add up to the
+run's total instead of each one also counting everything it pulled from
+upstream. Use stage() around a block, timed() around a function and
+iterate() around a generator. Never yield from inside stage(): wrap the
+generator with iterate() instead.
+
+Console progress goes through progress_due(key), which is true at most
+once every PROGRESS_INTERVAL seconds per key, so each progress line keeps
+its own interval. A pass that may be thrown away (a retry in another
+mode) records into its own PipelineMetrics, which merge() then adds to
+the run, under a prefix if the pass was abandoned.
+"""
+
+import json
+import os
+import resource
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+# Seconds between rate-limited progress lines
+PROGRESS_INTERVAL = 2.0
+
+# Seconds between RSS samples (a stage is always sampled on first entry)
+RSS_INTERVAL = 0.05
+
+WALL, CPU, CALLS, ITEMS, RSS = range(5)
+
+PAGE_KB = os.sysconf("SC_PAGE_SIZE") // 1024 if hasattr(os, "sysconf") else 4
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process so far, in KB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def current_rss_kb():
+    """Current resident set size in KB (the peak where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * PAGE_KB
+    except (OSError, ValueError, IndexError):
+        return peak_rss_kb()
+
+
+class PipelineMetrics:
+    """Per-stage timings and counters for one parser run."""
+
+    def __init__(self, run="", progress_interval=PROGRESS_INTERVAL):
+        self.run = run
+        self.info = {}
+        self.counters = Counter()
+        self.progress_interval = progress_interval
+        self._stages = {}
+        self._stack = []
+        self._started_at = datetime.now(timezone.utc)
+        self._start = (time.perf_counter(), time.process_time())
+        self._mark = self._start
+        self._last_rss = float("-inf")
+        self._last_progress = {}
+
+    # -------------------- STAGES --------------------
+
+    def _switch(self):
+        # Charge the time since the last switch to the innermost active stage
+        wall, cpu = time.perf_counter(), time.process_time()
+        if self._stack:
+            stage = self._stages[self._stack[-1]]
+            stage[WALL] += wall - self._mark[0]
+            stage[CPU] += cpu - self._mark[1]
+            if not stage[RSS] or wall - self._last_rss >= RSS_INTERVAL:
+                self._last_rss = wall
+                stage[RSS] = max(stage[RSS], current_rss_kb())
+        self._mark = (wall, cpu)
+
+    def enter(self, name):
+        self._switch()
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = [0.0, 0.0, 0, 0, 0]
+        stage[CALLS] += 1
+        self._stack.append(name)
+
+    def exit(self):
+        self._switch()
+        self._stack.pop()
+
+    @contextmanager
+    def stage(self, name):
+        self.enter(name)
+        try:
+            yield self
+        finally:
+            self.exit()
+
+    def timed(self, name, fn):
+        """Wrap fn so every call is charged to stage name."""
+        def wrapper(*args, **kwargs):
+            self.enter(name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.exit()
+        return wrapper
+
+    def iterate(self, name, iterable):
+        """Yield from iterable, charging the work of producing each item to stage name."""
+        iterator = iter(iterable)
+        while True:
+            self.enter(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.exit()
+            self._stages[name][ITEMS] += 1
+            yield item
+
+    # -------------------- COUNTERS --------------------
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def progress_due(self, key=""):
+        """True at most once per progress_interval for key; print a progress line when it is."""
+        now = time.perf_counter()
+        if now - self._last_progress.get(key, float("-inf")) < self.progress_interval:
+            return False
+        self._last_progress[key] = now
+        return True
+
+    def merge(self, other, prefix=""):
+        """Add another run's stage totals and counters to this one, names prefixed with prefix."""
+        other._switch()
+        for name, (wall, cpu, calls, items, rss) in other._stages.items():
+            stage = self._stages.setdefault(prefix + name, [0.0, 0.0, 0, 0, 0])
+            stage[WALL] += wall
+            stage[CPU] += cpu
+            stage[CALLS] += calls
+            stage[ITEMS] += items
+            stage[RSS] = max(stage[RSS], rss)
+        for name, count in other.counters.items():
+            self.counters[prefix + name] += count
+
+    # -------------------- REPORT --------------------
+
+    def report(self):
+        self._switch()
+        wall = time.perf_counter() - self._start[0]
+        cpu = time.process_time() - self._start[1]
+        stages = {}
+        for name, (stage_wall, stage_cpu, calls, items, rss) in self._stages.items():
+            stages[name] = {
+                "wall_seconds": round(stage_wall, 4),
+                "cpu_seconds": round(stage_cpu, 4),
+                "calls": calls,
+                "peak_rss_kb": rss,
+            }
+            if items:
+                stages[name]["items"] = items
+        return {
+            "run": self.run,
+            "started_at": self._started_at.isoformat(timespec="seconds"),
+            "wall_seconds": round(wall, 4),
+            "cpu_seconds": round(cpu, 4),
+            "unstaged_wall_seconds": round(wall - sum(s[WALL] for s in self._stages.values()), 4),
+            "peak_rss_kb": peak_rss_kb(),
+            "info": self.info,
+            "stages": stages,
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def write(self, path):
+        """Write report() as JSON to path and return it."""
+        report = self.report()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        return report
+
+    def print_summary(self, report=None):
+        report = report or self.report()
+        print(f"⏱  {report['wall_seconds']:.2f}s wall, {report['cpu_seconds']:.2f}s CPU, "
+              f"peak RSS {report['peak_rss_kb'] / 1024:.0f} MB")
+        for name, stage in sorted(report["stages"].items(), key=lambda s: -s[1]["wall_seconds"]):
+            print(f"   {name:<16} {stage['wall_seconds']:>8.2f}s wall {stage['cpu_seconds']:>8.2f}s CPU "
+                  f"{stage['peak_rss_kb'] / 1024:>7.0f} MB  x{stage['calls']}")
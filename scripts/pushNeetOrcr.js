@@ -1,10 +1,26 @@
 import { PrismaClient } from "@prisma/client";
-import { neetPgR2_2025 } from "../neet/neetPgR2_2025_optimized.js";
+import { createReadStream } from "node:fs";
+import { createInterface } from "node:readline";
 
 const prisma = new PrismaClient();
 
 const CHUNK_SIZE = 500;
 
+// NDJSON written by parseNeetPgR2_optimized.py; pass another path to override
+const DATA_PATH = process.argv[2]
+  ?? new URL("../neet/neetPgR2_2025_optimized.ndjson", import.meta.url);
+
+// Yield one ORCR record per line without loading the whole file
+async function* readNdjson(path) {
+  const lines = createInterface({
+    input: createReadStream(path, { encoding: "utf-8" }),
+    crlfDelay: Infinity,
+  });
+  for await (const line of lines) {
+    if (line.trim()) yield JSON.parse(line);
+  }
+}
+
 function chunkArray(array, size) {
   const result = [];
   for (let i = 0; i < array.length; i += size) {
@@ -15,7 +31,7 @@ function chunkArray(array, size) {
 
 async function pushNeetData() {
   console.log("Starting NEET PG data import...");
-  console.log(`Total entries to process: ${neetPgR2_2025.length}`);
+  console.log(`Reading entries from: ${DATA_PATH}`);
 
   // await prisma.orcr.deleteMany({
   //   where: {
@@ -32,9 +48,11 @@ async function pushNeetData() {
 
   console.log(`Found ${colleges.length} existing colleges in database`);
 
-  // Extract unique institutes from NEET data
+  // Extract unique institutes from NEET data (first pass over the file)
   const uniqueInstitutes = new Map();
-  neetPgR2_2025.forEach((item) => {
+  let totalEntries = 0;
+  for await (const item of readNdjson(DATA_PATH)) {
+    totalEntries++;
     const parts = item.institute.split(',').map(s => s.trim());
     const instituteName = parts[0];
     const location = parts[1] || null;
@@ -46,8 +64,9 @@ async function pushNeetData() {
         institute: item.institute, // Full name with place
       });
     }
-  });
+  }
 
+  console.log(`Total entries to process: ${totalEntries}`);
   console.log(`Found ${uniqueInstitutes.size} unique institutes in NEET data`);
 
   // Create missing colleges
@@ -93,8 +112,8 @@ async function pushNeetData() {
     console.log("✓ All colleges already exist in database");
   }
 
-  // Map all data (now all colleges should exist)
-  const orcrData = neetPgR2_2025.map((item) => {
+  // Map and insert in chunks as records stream in (second pass over the file)
+  const toOrcr = (item) => {
     // Try exact match first
     let collegeId = collegeMap.get(item.institute);
 
@@ -124,32 +143,43 @@ async function pushNeetData() {
       openRank: item.openRank,
       closeRank: item.closeRank,
     };
-  }).filter(item => item !== null);
-
-  console.log(`\nPrepared ${orcrData.length} ORCR entries for insertion`);
-
-  // Show some examples of what will be inserted
-  console.log("\nSample entries to be inserted:");
-  orcrData.slice(0, 3).forEach((item, idx) => {
-    console.log(`\n${idx + 1}. ${item.institute}`);
-    console.log(`   Course: ${item.academicProgramName}`);
-    console.log(`   Ranks: ${item.openRank} - ${item.closeRank}`);
-    console.log(`   Type: ${item.type}, Exam: ${item.exam}`);
-  });
+  };
 
-  // Insert in chunks
-  console.log(`\nInserting ${orcrData.length} entries in chunks of ${CHUNK_SIZE}...`);
-  const chunks = chunkArray(orcrData, CHUNK_SIZE);
+  const totalChunks = Math.ceil(totalEntries / CHUNK_SIZE);
+  let chunk = [];
+  let chunkCount = 0;
+  let inserted = 0;
 
-  for (let i = 0; i < chunks.length; i++) {
-    const chunk = chunks[i];
+  const flush = async () => {
     await prisma.orcr.createMany({
       data: chunk,
       skipDuplicates: true,
     });
-    process.stdout.write(`\rProgress: ${i + 1}/${chunks.length} chunks (${((i + 1) / chunks.length * 100).toFixed(1)}%)`);
+    inserted += chunk.length;
+    chunkCount++;
+    chunk = [];
+    process.stdout.write(`\rProgress: ${chunkCount}/${totalChunks} chunks (${(chunkCount / totalChunks * 100).toFixed(1)}%)`);
+  };
+
+  console.log(`\nInserting ${totalEntries} entries in chunks of ${CHUNK_SIZE}...`);
+  for await (const item of readNdjson(DATA_PATH)) {
+    const row = toOrcr(item);
+    if (!row) continue;
+
+    // Show some examples of what will be inserted
+    if (inserted + chunk.length < 3) {
+      console.log(`\n${inserted + chunk.length + 1}. ${row.institute}`);
+      console.log(`   Course: ${row.academicProgramName}`);
+      console.log(`   Ranks: ${row.openRank} - ${row.closeRank}`);
+      console.log(`   Type: ${row.type}, Exam: ${row.exam}`);
+    }
+
+    chunk.push(row);
+    if (chunk.length === CHUNK_SIZE) await flush();
   }
+  if (chunk.length) await flush();
 
+  console.log(`\nInserted ${inserted} ORCR entries`);
   console.log("\n");
 }
 
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Manifest-driven batch runner for the cutoff parsers
+Runs every (exam, year, round, source, parser) job listed in a manifest,
+several at a time, as separate processes. A NEET PG Round 2 job waits for
+the Round 1 job of the same exam and year, whose output feeds its R1
+category fallback, and is skipped if that job fails.
+
+A job is skipped when its fingerprint matches the last successful run:
+the source file, the outputs of the jobs it depends on, the job's own
+settings and the parser version (the parser script plus every sibling
+module it imports) are all hashed. Edit any of them and the job reruns.
+
+Usage:
+    python scripts/runParsers.py                       # scripts/parseManifest.json
+    python scripts/runParsers.py my_manifest.json --jobs 4 --workers 2
+    python scripts/runParsers.py --only NEET_PG-2025-R2 --force
+
+Manifest:
+    {"jobs": [{"exam": "NEET_PG", "year": 2025, "round": 1,
+               "source": "neet/neet_pg_r1.pdf",
+               "parser": "parseNeetPgR1_final.py",
+               "output": "neet/neetPgR1_2025.ndjson"}, ...]}
+
+Optional per-job keys: "id" (default "{exam}-{year}-R{round}"),
+"depends_on" (list of job ids, added to the automatic R1 dependency) and
+"args" (extra command-line arguments for the parser).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MANIFEST = os.path.join(SCRIPTS_DIR, "parseManifest.json")
+STATE_FILE = ".parseState.json"
+
+LOCAL_IMPORT = re.compile(r"^\s*(?:from\s+(\w+)\s+import|import\s+(\w+))", re.MULTILINE)
+
+
+# -------------------- PARSERS --------------------
+
+def neet_r1_args(job, deps, options):
+    return ["--pdf", job["source"], "--out", job["output"],
+            "--year", str(job["year"]), "--round", str(job["round"]),
+            *neet_common_args(options)]
+
+
+def neet_r2_args(job, deps, options):
+    r1_jobs = [d for d in deps if d["parser"] in R1_PARSERS]
+    args = ["--pdf", job["source"], "--out", job["output"],
+            "--year", str(job["year"]), "--round", str(job["round"])]
+    if r1_jobs:
+        args += ["--r1", r1_jobs[0]["output"]]
+    return args + neet_common_args(options)
+
+
+def neet_common_args(options):
+    args = ["--workers", str(options.workers)]
+    if options.cache_dir:
+        args += ["--page-cache", os.path.join(options.cache_dir, "pages"),
+                 "--institute-cache", os.path.join(options.cache_dir, "institutes.sqlite")]
+    return args
+
+
+def iiitd_args(job, deps, options):
+    return ["--pdf", job["source"], "--out", job["output"]]
+
+
+# parser script -> (argument builder, round whose job it depends on or None)
+PARSERS = {
+    "parseNeetPgR1_final.py": (neet_r1_args, None),
+    "parseNeetPgR2_optimized.py": (neet_r2_args, 1),
+    "scrapIIITD.py": (iiitd_args, None),
+}
+
+R1_PARSERS = {"parseNeetPgR1_final.py"}
+
+
+# -------------------- FINGERPRINTS --------------------
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parser_version(parser, seen=None):
+    """Hash of a parser script and, recursively, the sibling modules it imports."""
+    seen = set() if seen is None else seen
+    path = os.path.join(SCRIPTS_DIR, parser)
+    seen.add(parser)
+
+    with open(path, "rb") as f:
+        source = f.read()
+    digest = hashlib.sha256(source)
+    for from_name, import_name in LOCAL_IMPORT.findall(source.decode("utf-8", "replace")):
+        module = (from_name or import_name) + ".py"
+        if module not in seen and os.path.exists(os.path.join(SCRIPTS_DIR, module)):
+            digest.update(module.encode())
+            digest.update(parser_version(module, seen).encode())
+    return digest.hexdigest()
+
+
+def job_fingerprint(job, deps, versions):
+    digest = hashlib.sha256()
+    settings = {k: job[k] for k in ("exam", "year", "round", "parser", "output", "args")}
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    digest.update(versions[job["parser"]].encode())
+    digest.update(file_digest(job["source"]).encode())
+    for dep in deps:
+        digest.update(file_digest(dep["output"]).encode())
+    return digest.hexdigest()
+
+
+def load_state(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(path, state):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+# -------------------- MANIFEST --------------------
+
+def load_manifest(path):
+    """Return the manifest's jobs with ids, args and dependencies filled in."""
+    with open(path, "r", encoding="utf-8") as f:
+        jobs = json.load(f)["jobs"]
+
+    by_id = {}
+    for job in jobs:
+        missing = {"exam", "year", "round", "source", "parser", "output"} - set(job)
+        if missing:
+            raise ValueError(f"manifest job {job} is missing {sorted(missing)}")
+        if job["parser"] not in PARSERS:
+            raise ValueError(f"unknown parser {job['parser']!r} (known: {', '.join(PARSERS)})")
+        job.setdefault("id", f"{job['exam']}-{job['year']}-R{job['round']}")
+        job.setdefault("args", [])
+        job["depends_on"] = list(job.get("depends_on", []))
+        if job["id"] in by_id:
+            raise ValueError(f"duplicate job id {job['id']!r}")
+        by_id[job["id"]] = job
+
+    for job in jobs:
+        dep_round = PARSERS[job["parser"]][1]
+        if dep_round is not None:
+            for other in jobs:
+                if (other["exam"], other["year"], other["round"]) == (job["exam"], job["year"], dep_round) \
+                        and other is not job and other["id"] not in job["depends_on"]:
+                    job["depends_on"].append(other["id"])
+        for dep_id in job["depends_on"]:
+            if dep_id not in by_id:
+                raise ValueError(f"job {job['id']!r} depends on unknown job {dep_id!r}")
+
+    check_acyclic(by_id)
+    return by_id
+
+
+def check_acyclic(by_id):
+    state = {}
+
+    def visit(job_id, path):
+        if state.get(job_id) == "done":
+            return
+        if state.get(job_id) == "visiting":
+            raise ValueError("dependency cycle: " + " -> ".join(path + [job_id]))
+        state[job_id] = "visiting"
+        for dep_id in by_id[job_id]["depends_on"]:
+            visit(dep_id, path + [job_id])
+        state[job_id] = "done"
+
+    for job_id in by_id:
+        visit(job_id, [])
+
+
+# -------------------- RUNNER --------------------
+
+def run_job(job, deps, options):
+    """Run one parser as a subprocess from the repo root. Returns (ok, seconds, log path)."""
+    build_args = PARSERS[job["parser"]][0]
+    cmd = [sys.executable, os.path.join(SCRIPTS_DIR, job["parser"]),
+           *build_args(job, deps, options), *job["args"]]
+
+    log_path = os.path.join(options.log_dir, f"{job['id']}.log")
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        log.write("$ " + " ".join(cmd) + "\n\n")
+        log.flush()
+        result = subprocess.run(cmd, stdout=log, stderr=subprocess.STDOUT, cwd=options.root)
+    return result.returncode == 0, time.perf_counter() - start, log_path
+
+
+def run_all(jobs, options):
+    """Run jobs respecting dependencies, up to options.jobs at a time. Returns failed job ids."""
+    os.makedirs(options.log_dir, exist_ok=True)
+    state_path = os.path.join(options.root, STATE_FILE)
+    state = load_state(state_path)
+    versions = {parser: parser_version(parser) for parser in {j["parser"] for j in jobs.values()}}
+
+    done, failed = set(), set()
+    pending = dict(jobs)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=options.jobs) as pool:
+        while pending or running:
+            progressed = False
+            for job_id, job in list(pending.items()):
+                if any(d in failed for d in job["depends_on"]):
+                    print(f"⏭  {job_id}: skipped, dependency failed")
+                    failed.add(job_id)
+                    del pending[job_id]
+                    progressed = True
+                    continue
+                if not all(d in done for d in job["depends_on"]):
+                    continue
+                del pending[job_id]
+                progressed = True
+
+                deps = [jobs[d] for d in job["depends_on"]]
+                if not os.path.exists(job["source"]):
+                    print(f"❌ {job_id}: source not found: {job['source']}")
+                    failed.add(job_id)
+                    continue
+
+                fingerprint = job_fingerprint(job, deps, versions)
+                unchanged = state.get(job_id) == fingerprint and os.path.exists(job["output"])
+                if unchanged and not options.force:
+                    print(f"✓  {job_id}: unchanged, skipped")
+                    done.add(job_id)
+                    continue
+
+                print(f"▶  {job_id}: {job['parser']} {job['source']}")
+                future = pool.submit(run_job, job, deps, options)
+                running[future] = (job_id, fingerprint)
+
+            if not running:
+                if pending and not progressed:
+                    raise RuntimeError(f"cannot schedule {sorted(pending)}")
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                job_id, fingerprint = running.pop(future)
+                ok, seconds, log_path = future.result()
+                if ok:
+                    print(f"✅ {job_id}: done in {seconds:.1f}s → {jobs[job_id]['output']}")
+                    done.add(job_id)
+                    state[job_id] = fingerprint
+                    save_state(state_path, state)
+                else:
+                    print(f"❌ {job_id}: failed after {seconds:.1f}s, see {log_path}")
+                    failed.add(job_id)
+
+    return failed
+
+
+# -------------------- MAIN --------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the cutoff parsers listed in a manifest")
+    parser.add_argument("manifest", nargs="?", default=DEFAULT_MANIFEST,
+                        help="manifest JSON (default: scripts/parseManifest.json)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="parser processes to run at once (default: one per CPU core)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="tabula workers per NEET parser job")
+    parser.add_argument("--cache-dir", metavar="DIR",
+                        help="shared page and institute caches for the NEET parsers")
+    parser.add_argument("--only", action="append", metavar="JOB_ID",
+                        help="run only these jobs (their dependencies run too); repeatable")
+    parser.add_argument("--force", action="store_true", help="rerun jobs even when unchanged")
+    parser.add_argument("--log-dir", default="logs/parsers", help="per-job log directory")
+    return parser.parse_args()
+
+
+def select(jobs, only):
+    """Restrict jobs to `only` plus everything they depend on."""
+    selected = set()
+    stack = list(only)
+    while stack:
+        job_id = stack.pop()
+        if job_id not in jobs:
+            raise ValueError(f"unknown job {job_id!r}")
+        if job_id not in selected:
+            selected.add(job_id)
+            stack.extend(jobs[job_id]["depends_on"])
+    return {job_id: job for job_id, job in jobs.items() if job_id in selected}
+
+
+def main():
+    options = parse_args()
+    options.root = os.getcwd()
+
+    try:
+        jobs = load_manifest(options.manifest)
+        if options.only:
+            jobs = select(jobs, options.only)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Invalid manifest {options.manifest}: {e}")
+        sys.exit(1)
+
+    print("=" * 60)
+    print(f"Parser batch: {len(jobs)} jobs, {options.jobs} at a time")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    failed = run_all(jobs, options)
+
+    print("=" * 60)
+    print(f"{len(jobs) - len(failed)}/{len(jobs)} jobs ok in {time.perf_counter() - start:.1f}s")
+    if failed:
+        print("Failed: " + ", ".join(sorted(failed)))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
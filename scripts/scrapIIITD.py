@@ -1,10 +1,34 @@
-import pytesseract
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+from ocrBackend import BACKENDS, get_backend
+from tableGrid import cell_box, find_tables, ink_mask, is_blank
+import argparse
+import math
+import os
 import re
 import json
+import subprocess
+import tempfile
 
 PDF_FILE = "./iiitd25R1.pdf"
+OUTPUT_FILE = "iiitd_cutoff_2025_without_bonus.json"
+DPI = 300
+
+TEXT_CONFIG = '--psm 6'
+LINE_CONFIG = '--psm 7'
+DIGITS_CONFIG = '--psm 7 -c tessedit_char_whitelist=0123456789'
+CATEGORY_CODE = re.compile(r'^[A-Z]{3,10}$')
+
+# White gap between rank cells stitched into one OCR batch
+CELL_GAP = 48
+# Skip OCR of text strips shorter than this (px)
+MIN_STRIP = 20
+# Scanned pages rendered and OCRed per backend call (at most; see extract_text_from_pdf)
+BATCH_PAGES = 8
+# Pages with fewer non-space characters in their text layer are treated as scanned
+MIN_TEXT_CHARS = 20
+
 INSTITUTE = "Indraprastha Institute of Information Technology Delhi"
 
 PROGRAM_NAME_MAP = {
@@ -25,13 +49,168 @@ def decode_category(code: str):
     quota = "HS" if "D" in code else "AI"
     return seat_type, gender, quota
 
-def extract_text_from_pdf(pdf_path):
-    images = convert_from_path(pdf_path, dpi=300)
-    all_text = ""
+def init_ocr_worker():
+    # One tesseract thread per process; the pool provides the parallelism
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+def stitch(images):
+    # Lay cell crops out left to right on white, separated by CELL_GAP
+    width = sum(image.width for image in images) + CELL_GAP * (len(images) + 1)
+    height = max(image.height for image in images) + 2 * CELL_GAP
+    sheet = Image.new("L", (width, height), 255)
+    x = CELL_GAP
     for image in images:
-        text = pytesseract.image_to_string(image, config='--psm 6')
-        all_text += text + "\n"
-    return all_text
+        sheet.paste(image, (x, CELL_GAP))
+        x += image.width + CELL_GAP
+    return sheet
+
+def ocr_rank_rows(image, mask, row_boxes, backend):
+    # Rank cells digits-only: one stitched image per row, every row in one batch;
+    # rows whose token count is off are redone cell by cell
+    values = [["-"] * len(boxes) for boxes in row_boxes]
+    inked = [[i for i, box in enumerate(boxes) if not is_blank(mask, box)] for boxes in row_boxes]
+    batch = [r for r, cols in enumerate(inked) if cols]
+    sheets = [stitch([image.crop(row_boxes[r][i]) for i in inked[r]]) for r in batch]
+
+    retry = []
+    for r, text in zip(batch, backend.ocr_batch(sheets, DIGITS_CONFIG)):
+        tokens = text.split()
+        if len(tokens) == len(inked[r]):
+            for i, token in zip(inked[r], tokens):
+                values[r][i] = token
+        else:
+            retry.extend((r, i) for i in inked[r])
+
+    cells = backend.ocr_batch([image.crop(row_boxes[r][i]) for r, i in retry], DIGITS_CONFIG)
+    for (r, i), text in zip(retry, cells):
+        values[r][i] = text.strip() or "-"
+    return values
+
+def ocr_page_cells(image, backend):
+    # Crop to the ruled tables and OCR them cell by cell in a few batches per page;
+    # whole-page OCR when no table is found
+    if image.mode != "L":
+        image = image.convert("L")
+    mask = ink_mask(image)
+    tables = find_tables(mask)
+    if not tables:
+        return backend.ocr_batch([image], TEXT_CONFIG)[0]
+
+    # Reading order: text between tables (e.g. "With Bonus", which parse_table needs) and table rows
+    strips, rows, layout = [], [], []
+    above = 0
+    for table in tables:
+        left, top, right, bottom = table.box
+        if top - above > MIN_STRIP:
+            layout.append((strips, len(strips)))
+            strips.append(image.crop((0, above, image.width, top)))
+        for row in table.rows:
+            layout.append((rows, len(rows)))
+            rows.append(((left, row[0], right, row[1] + 1), [cell_box(row, col) for col in table.cols]))
+        above = bottom + 1
+
+    # Category cell of every row as one line, without a whitelist so header rows read as text
+    codes = [text.strip() for text in backend.ocr_batch([image.crop(boxes[0]) for _, boxes in rows], LINE_CONFIG)]
+    data = [r for r, code in enumerate(codes) if CATEGORY_CODE.match(code)]
+    other = [r for r, code in enumerate(codes) if not CATEGORY_CODE.match(code)]
+
+    texts = backend.ocr_batch(strips + [image.crop(rows[r][0]) for r in other], TEXT_CONFIG)
+    strip_lines = [text.strip() for text in texts[:len(strips)]]
+    row_lines = dict(zip(other, (text.strip() for text in texts[len(strips):])))
+    ranks = ocr_rank_rows(image, mask, [rows[r][1][1:] for r in data], backend)
+    for r, values in zip(data, ranks):
+        # "-" keeps blank cells in place for parse_table's column alignment
+        row_lines[r] = " ".join([codes[r]] + values)
+
+    return "\n".join(strip_lines[i] if kind is strips else row_lines[i] for kind, i in layout)
+
+def render_page(pdf_path, page, output_folder):
+    # One grayscale page rendered to a file in output_folder; returns its path
+    return convert_from_path(pdf_path, dpi=DPI, first_page=page, last_page=page, grayscale=True,
+                             output_folder=output_folder, paths_only=True)[0]
+
+def ocr_pages(job):
+    # Render a batch of pages to temp files and OCR them with one backend call,
+    # so tesseract's startup is paid once per batch rather than once per page
+    pdf_path, pages, cells, backend_name = job
+    backend = get_backend(backend_name)
+    with tempfile.TemporaryDirectory(prefix="iiitd-ocr-") as tmp_dir:
+        paths = [render_page(pdf_path, page, tmp_dir) for page in pages]
+        if not cells:
+            return backend.ocr_batch(paths, TEXT_CONFIG)
+        texts = []
+        for path in paths:
+            with Image.open(path) as image:
+                texts.append(ocr_page_cells(image, backend))
+        return texts
+
+def extract_text_layer(pdf_path, page_count):
+    # Embedded text per page via poppler's pdftotext (pages are separated by form feeds)
+    try:
+        result = subprocess.run(["pdftotext", "-layout", "-enc", "UTF-8", pdf_path, "-"],
+                                capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return [""] * page_count
+    pages = result.stdout.decode("utf-8", "replace").split("\f")[:page_count]
+    return pages + [""] * (page_count - len(pages))
+
+def has_text(text):
+    return sum(not c.isspace() for c in text) >= MIN_TEXT_CHARS
+
+def token_centers(line):
+    return [((m.start() + m.end()) / 2, m.group()) for m in re.finditer(r'\S+', line)]
+
+def align_text_layer(text):
+    # pdftotext -layout keeps columns by position but drops blank cells; rewrite each
+    # category row as parse_table expects: code, then an (IIIT, JEE) pair per program,
+    # "-" for blank cells, by matching every value to the nearest IIIT/JEE sub-header
+    lines = []
+    columns = []
+    for line in text.splitlines():
+        words = line.split()
+        if words and words[0] == "Category":
+            lines.append("Category IIIT " + " ".join(words[1:]))
+            columns = []
+            continue
+        if words and set(words) <= {"IIIT", "JEE"}:
+            # Dropped once read: parse_table would take "IIIT" for a category code
+            columns = [center for center, _ in token_centers(line)]
+            continue
+        match = re.match(r'^\s*([A-Z]{3,10})\s', line)
+        if not columns or not match:
+            lines.append(line)
+            continue
+        values = ["-"] * len(columns)
+        for center, token in token_centers(line[match.end():]):
+            center += match.end()
+            nearest = min(range(len(columns)), key=lambda i: abs(columns[i] - center))
+            values[nearest] = token
+        lines.append(" ".join([match.group(1)] + values))
+    return "\n".join(lines)
+
+def extract_text_from_pdf(pdf_path, workers=1, cells=False, force_ocr=False,
+                          backend="auto", batch_pages=BATCH_PAGES):
+    # Read the text layer where there is one; render and OCR only the scanned pages,
+    # batch_pages at a time, batches spread over a process pool when workers > 1.
+    # Batches shrink when there are fewer than batch_pages per worker, so every worker gets pages
+    page_count = pdfinfo_from_path(pdf_path)["Pages"]
+    texts = [""] * page_count if force_ocr else extract_text_layer(pdf_path, page_count)
+    scanned = [i for i, text in enumerate(texts) if not has_text(text)]
+    texts = [text if i in scanned else align_text_layer(text) for i, text in enumerate(texts)]
+    print(f"📄 {page_count - len(scanned)} pages with a text layer, {len(scanned)} to OCR")
+
+    size = max(1, min(batch_pages, math.ceil(len(scanned) / workers)))
+    batches = [scanned[i:i + size] for i in range(0, len(scanned), size)]
+    jobs = [(pdf_path, [i + 1 for i in batch], cells, backend) for batch in batches]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=init_ocr_worker) as pool:
+            results = list(pool.map(ocr_pages, jobs))
+    else:
+        results = [ocr_pages(job) for job in jobs]
+    for batch, ocr_texts in zip(batches, results):
+        for i, text in zip(batch, ocr_texts):
+            texts[i] = text
+    return "".join(text + "\n" for text in texts)
 
 def parse_table(text):
     output = []
@@ -41,7 +220,9 @@ def parse_table(text):
         if "With Bonus" in line:
             break
         if "Category" in line and "IIIT" in line:
-            headers = re.findall(r'\b[A-Z]{3,10}\b', line)[1:]
+            # Program codes after the IIIT(D) column label; mixed case too (CSEcon)
+            headers = [code for code in re.findall(r'\b[A-Z][A-Za-z]{2,9}\b', line)
+                       if code != "Category" and not code.startswith("IIIT")]
             continue
         parts = re.split(r'\s+', line.strip())
         if not parts or not re.match(r'^[A-Z]{3,10}$', parts[0]):
@@ -66,10 +247,28 @@ def parse_table(text):
             })
     return output
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="IIITD cutoff PDF scraper (text layer, OCR fallback)")
+    parser.add_argument("--pdf", default=PDF_FILE, help="cutoff PDF to parse")
+    parser.add_argument("--out", default=OUTPUT_FILE, help="JSON output path")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="pages rendered and OCRed in parallel (default: one per CPU core)")
+    parser.add_argument("--cells", action="store_true",
+                        help="crop to ruled tables and OCR rank cells digits-only instead of whole pages")
+    parser.add_argument("--ocr", action="store_true",
+                        help="OCR every page, even those with a text layer")
+    parser.add_argument("--backend", choices=("auto", *BACKENDS), default="auto",
+                        help="OCR backend: persistent tesserocr or batched tesseract CLI (default: auto)")
+    parser.add_argument("--batch-pages", type=int, default=BATCH_PAGES,
+                        help=f"scanned pages per OCR batch (default: {BATCH_PAGES})")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    print("🔍 Converting PDF to images and extracting text...")
-    raw_text = extract_text_from_pdf(PDF_FILE)
+    args = parse_args()
+    print("🔍 Extracting text (OCR for scanned pages)...")
+    raw_text = extract_text_from_pdf(args.pdf, max(1, args.workers), args.cells, args.ocr,
+                                    args.backend, max(1, args.batch_pages))
     parsed = parse_table(raw_text)
-    with open("iiitd_cutoff_2025_without_bonus.json", "w") as f:
+    with open(args.out, "w") as f:
         json.dump(parsed, f, indent=2)
-    print(f"✅ Extracted {len(parsed)} entries to iiitd_cutoff_2025_without_bonus.json")
+    print(f"✅ Extracted {len(parsed)} entries to {args.out}")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Ruled-table detection for scanned cutoff PDFs
+Finds tables on a rendered page and their row/column grid from ink
+projection profiles: long horizontal runs of ink are row rulings, and
+columns of ink spanning most of a table's height are column rulings.
+
+The OCR path uses this to crop a page down to its tables and cells, so
+tesseract only sees the pixels that matter (see scrapIIITD.py --cells).
+Pages without ruled tables return no tables and are OCRed whole.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+
+# Grayscale level below which a pixel counts as ink
+INK_THRESHOLD = 160
+
+# A row ruling covers at least this share of the page width, a column
+# ruling at least this share of its table's height
+MIN_ROW_RULING = 0.3
+MIN_COL_RULING = 0.5
+
+# Rulings further apart than this many times the median row height start a new table
+TABLE_GAP = 3
+
+# Pixels trimmed inside each cell so ruling lines don't reach OCR
+CELL_INSET = 4
+
+# Cells with less ink than this share of their area are blank
+BLANK_INK = 0.003
+
+# box: (left, top, right, bottom) of the whole table
+# rows/cols: (start, end) pixel spans between rulings, top to bottom / left to right
+Table = namedtuple("Table", ["box", "rows", "cols"])
+
+
+def ink_mask(image):
+    """Boolean array, True where a PIL page image has ink."""
+    return np.asarray(image.convert("L")) < INK_THRESHOLD
+
+
+def runs(flags):
+    """(start, end) inclusive index spans of consecutive True values."""
+    padded = np.concatenate(([False], flags, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return [(int(start), int(end) - 1) for start, end in zip(edges[::2], edges[1::2])]
+
+
+def between(rulings):
+    """Spans strictly between consecutive rulings."""
+    return [(a[1] + 1, b[0] - 1) for a, b in zip(rulings, rulings[1:]) if b[0] - a[1] > 1]
+
+
+def group_rulings(rulings):
+    """Split row rulings into one group per table at unusually large gaps."""
+    if len(rulings) < 3:
+        return [rulings] if len(rulings) == 2 else []
+
+    gaps = [b[0] - a[1] for a, b in zip(rulings, rulings[1:])]
+    limit = TABLE_GAP * float(np.median(gaps))
+
+    groups = [[rulings[0]]]
+    for ruling, gap in zip(rulings[1:], gaps):
+        if gap > limit:
+            groups.append([])
+        groups[-1].append(ruling)
+    return [g for g in groups if len(g) >= 2]
+
+
+def find_tables(mask):
+    """Return the ruled tables on a page (see Table), top to bottom."""
+    height, width = mask.shape
+    row_rulings = runs(mask.sum(axis=1) >= MIN_ROW_RULING * width)
+
+    tables = []
+    for group in group_rulings(row_rulings):
+        top, bottom = group[0][0], group[-1][1]
+
+        # Horizontal extent of the table: the ink of its rulings
+        ruled = np.flatnonzero(mask[group[0][0]:group[0][1] + 1].any(axis=0))
+        left, right = int(ruled[0]), int(ruled[-1])
+
+        band = mask[top:bottom + 1, left:right + 1]
+        col_rulings = runs(band.sum(axis=0) >= MIN_COL_RULING * band.shape[0])
+        if len(col_rulings) < 2:
+            continue
+
+        cols = [(left + a, left + b) for a, b in between(col_rulings)]
+        tables.append(Table((left, top, right, bottom), between(group), cols))
+    return tables
+
+
+def cell_box(row, col, inset=CELL_INSET):
+    """PIL crop box for one cell, trimmed by inset on every side."""
+    (top, bottom), (left, right) = row, col
+    return (left + inset, top + inset, max(left + inset + 1, right - inset + 1),
+            max(top + inset + 1, bottom - inset + 1))
+
+
+def is_blank(mask, box):
+    left, top, right, bottom = box
+    cell = mask[top:bottom, left:right]
+    return cell.size == 0 or cell.mean() < BLANK_INK
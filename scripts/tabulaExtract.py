@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Tabula extraction helpers for the NEET PG parsers
+Splits a PDF's page range into contiguous shards, reads each shard with
+tabula in a process pool and merges the tables back in page order.
+
+TabulaService keeps its JVMs warm between jobs: tabula-py runs Java
+in-process through jpype (pip install jpype1), so the in-process backend
+and every pool worker pay JVM startup and class loading once. One shared
+service per Python process is reused by the parsers and the batch runner.
+
+TabulaService.iter_tables streams tables a few pages at a time, keeping
+only a bounded window of page jobs in flight, so callers can process a
+PDF of any size with flat memory.
+
+PageCache stores tabula's output on disk per page, keyed by the PDF's
+content hash, the page number and the read options (lattice/stream), so
+re-running a parser on an unchanged PDF skips tabula entirely.
+
+tabula-py is only required once a TabulaService is created, so the
+parsers' table-processing functions (and benchParsers.py) import without it.
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import pickle
+import sys
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import tabula
+except ImportError:
+    tabula = None
+
+
+# Shards per worker; small enough to balance uneven pages across cores
+SHARDS_PER_WORKER = 4
+
+# Pages per streamed job, and streamed jobs in flight per worker
+PAGES_PER_JOB = 8
+JOBS_IN_FLIGHT_PER_WORKER = 2
+
+
+class TabulaReadError(Exception):
+    """tabula failed to read a page range."""
+
+
+# -------------------- PAGES --------------------
+
+def count_pages(pdf_path):
+    """Return the page count of a PDF, or None if pypdf is not installed."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    return len(PdfReader(pdf_path).pages)
+
+
+def shard_pages(page_count, shard_count):
+    """
+    Split pages 1..page_count into at most shard_count contiguous ranges.
+    Returns tabula page specs like "1-25", in page order.
+    """
+    shard_count = max(1, min(shard_count, page_count))
+    size, extra = divmod(page_count, shard_count)
+
+    shards = []
+    first = 1
+    for i in range(shard_count):
+        last = first + size - 1 + (1 if i < extra else 0)
+        shards.append(f"{first}-{last}" if last > first else str(first))
+        first = last + 1
+    return shards
+
+
+def resolve_workers(workers):
+    """0 or None means one worker per CPU core."""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, workers)
+
+
+# -------------------- PAGE CACHE --------------------
+
+def file_digest(path, chunk_size=1 << 20):
+    """sha256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def options_key(options):
+    """Short, stable name for a set of read options, e.g. 'lattice-3f2a91c0'."""
+    if options.get("lattice"):
+        mode = "lattice"
+    elif options.get("stream"):
+        mode = "stream"
+    else:
+        mode = "default"
+    encoded = json.dumps(
+        {"options": options, "tabula": getattr(tabula, "__version__", "")},
+        sort_keys=True, default=repr,
+    )
+    return f"{mode}-{hashlib.sha256(encoded.encode()).hexdigest()[:8]}"
+
+
+class PageCache:
+    """
+    On-disk cache of tabula tables, one file per (PDF content, page, options).
+
+    Layout: <cache_dir>/<pdf sha256>/<options key>/p<page>.pkl.gz, each file
+    holding that page's list of DataFrames as a gzipped pickle. Pickle keeps
+    tabula's frames exactly (integer column labels, mixed-type object
+    columns, NaN cells), which parquet/feather would coerce.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._digests = {}
+        self.hits = 0
+        self.misses = 0
+
+    def pdf_key(self, pdf_path):
+        """Content hash of a PDF, memoized per (path, size, mtime)."""
+        st = os.stat(pdf_path)
+        stamp = (os.path.abspath(pdf_path), st.st_size, st.st_mtime_ns)
+        if stamp not in self._digests:
+            self._digests[stamp] = file_digest(pdf_path)
+        return self._digests[stamp]
+
+    def _path(self, pdf_key, page, options):
+        return os.path.join(self.cache_dir, pdf_key, options_key(options), f"p{page:05d}.pkl.gz")
+
+    def get(self, pdf_key, page, options):
+        """Return the cached tables of a page, or None."""
+        path = self._path(pdf_key, page, options)
+        try:
+            with gzip.open(path, "rb") as f:
+                tables = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # Truncated or corrupt entry: treat as a miss, it gets rewritten
+            self.misses += 1
+            return None
+        self.hits += 1
+        return tables
+
+    def put(self, pdf_key, page, options, tables):
+        path = self._path(pdf_key, page, options)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write then rename, so concurrent runs never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+                pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+# -------------------- SERVICE --------------------
+
+def _read_pages(job):
+    pdf_path, pages, options = job
+    try:
+        return tabula.read_pdf(pdf_path, pages=pages, **options)
+    except Exception as e:
+        raise TabulaReadError(f"pages {pages}: {type(e).__name__}: {e}") from e
+
+
+def has_jpype():
+    try:
+        import jpype  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class TabulaService:
+    """
+    Long-lived tabula backend accepting page-range jobs.
+
+    workers == 1 runs jobs in this process; workers > 1 keeps a pool of
+    spawned processes, each holding its own warm JVM, for sharded reads.
+    With a page_cache, iter_tables/read_pdf read and fill it page by page.
+    """
+
+    def __init__(self, workers=1, page_cache=None):
+        if tabula is None:
+            print("Error: tabula-py not installed.")
+            print("Install with: pip install tabula-py")
+            sys.exit(1)
+
+        self.workers = workers
+        self.page_cache = page_cache
+        self._pool = None
+
+        if not has_jpype():
+            print("   ⚠ jpype1 not installed, tabula will start a JVM per call (pip install jpype1)")
+
+        if workers > 1:
+            # Spawn, not fork: a JVM started in this process is not fork-safe
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    def read_pages(self, pdf_path, pages, **options):
+        """Read the tables of one page spec ("all", "3", "1-25")."""
+        job = (pdf_path, pages, options)
+        if self._pool is None:
+            return _read_pages(job)
+        return self._pool.submit(_read_pages, job).result()
+
+    def read_pdf(self, pdf_path, **options):
+        """
+        Read every table of a PDF.
+
+        With a worker pool the page range is sharded and the tables are
+        concatenated in page order, so the result matches a single
+        tabula.read_pdf(pages="all") call. Falls back to one job when the
+        page count cannot be determined.
+        """
+        if self.page_cache is not None:
+            return list(self.iter_tables(pdf_path, **options))
+
+        if self._pool is None:
+            return self.read_pages(pdf_path, "all", **options)
+
+        page_count = count_pages(pdf_path)
+        if not page_count:
+            print("   ⚠ Could not count PDF pages (pip install pypdf), reading in one job...")
+            return self.read_pages(pdf_path, "all", **options)
+
+        shards = shard_pages(page_count, self.workers * SHARDS_PER_WORKER)
+        print(f"   ⏳ Reading {page_count} pages in {len(shards)} shards across {self.workers} workers...")
+
+        dfs = []
+        jobs = [(pdf_path, pages, options) for pages in shards]
+        for tables in self._pool.map(_read_pages, jobs):
+            dfs.extend(tables)
+        return dfs
+
+    def iter_tables(self, pdf_path, pages_per_job=PAGES_PER_JOB, **options):
+        """
+        Yield the tables of a PDF lazily, in page order.
+
+        Pages are read pages_per_job at a time; with a worker pool at most
+        JOBS_IN_FLIGHT_PER_WORKER jobs per worker are pending, so memory
+        stays at a few pages' worth of tables. Raises TabulaReadError when
+        a page range cannot be read.
+        """
+        page_count = count_pages(pdf_path)
+        if not page_count:
+            print("   ⚠ Could not count PDF pages (pip install pypdf), reading in one job...")
+            yield from self.read_pages(pdf_path, "all", **options)
+            return
+
+        if self.page_cache is not None:
+            yield from self._iter_cached_tables(pdf_path, page_count, options)
+            return
+
+        shards = shard_pages(page_count, math.ceil(page_count / pages_per_job))
+
+        if self._pool is None:
+            for pages in shards:
+                yield from self.read_pages(pdf_path, pages, **options)
+            return
+
+        pending = deque()
+        for pages in shards:
+            pending.append(self._pool.submit(_read_pages, (pdf_path, pages, options)))
+            if len(pending) >= self.workers * JOBS_IN_FLIGHT_PER_WORKER:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    def _iter_cached_tables(self, pdf_path, page_count, options):
+        """
+        iter_tables through the page cache: cached pages are loaded from
+        disk, the rest are read one page per job and stored as they arrive.
+        """
+        cache = self.page_cache
+        pdf_key = cache.pdf_key(pdf_path)
+        max_pending = self.workers * JOBS_IN_FLIGHT_PER_WORKER * PAGES_PER_JOB
+
+        # (page, future, tables) in page order; future is None once tables are known
+        pending = deque()
+        for page in range(1, page_count + 1):
+            tables = cache.get(pdf_key, page, options)
+            if tables is not None:
+                pending.append((page, None, tables))
+            elif self._pool is None:
+                tables = _read_pages((pdf_path, str(page), options))
+                cache.put(pdf_key, page, options, tables)
+                pending.append((page, None, tables))
+            else:
+                future = self._pool.submit(_read_pages, (pdf_path, str(page), options))
+                pending.append((page, future, None))
+
+            while pending and (pending[0][1] is None or len(pending) >= max_pending):
+                yield from self._finish_page(pdf_key, options, *pending.popleft())
+        while pending:
+            yield from self._finish_page(pdf_key, options, *pending.popleft())
+
+    def _finish_page(self, pdf_key, options, page, future, tables):
+        if future is not None:
+            tables = future.result()
+            self.page_cache.put(pdf_key, page, options, tables)
+        return tables
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_service = None
+
+
+def get_service(workers=None, cache_dir=None):
+    """
+    Return the process-wide TabulaService, creating it on first use.
+    Passing a different worker count replaces the running service;
+    passing cache_dir turns on the on-disk page cache there.
+    """
+    global _service
+    if _service is None or (workers is not None and workers != _service.workers):
+        if _service is not None:
+            _service.close()
+        _service = TabulaService(workers or 1)
+
+    if cache_dir and (_service.page_cache is None or _service.page_cache.cache_dir != cache_dir):
+        _service.page_cache = PageCache(cache_dir)
+    return _service
+
+
+def close_service():
+    global _service
+    if _service is not None:
+        _service.close()
+        _service = None
+
+
+atexit.register(close_service)
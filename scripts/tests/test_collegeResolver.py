@@ -0,0 +1,38 @@
+from collegeResolver import CollegeResolver, same_word, words_conflict
+
+
+COLLEGES = {
+    "Government Medical College Kozhikode": "kozhikode",
+    "Christian Medical College Vellore": "vellore",
+    "Government Medical College and Hospital Chandigarh": "chandigarh",
+}
+
+
+def test_spelling_variants_resolve():
+    resolver = CollegeResolver(COLLEGES)
+    assert resolver.resolve("Govt. Medical College, Kozhikode, Kerala, 673008")[0] == "kozhikode"
+    assert resolver.resolve("Govt Medical College Kozhikkode")[0] == "kozhikode"
+    assert resolver.resolve("Government Medical College, Chandigarh, 160030")[0] == "chandigarh"
+
+
+def test_same_prefix_in_another_city_does_not_merge():
+    resolver = CollegeResolver(COLLEGES)
+    assert resolver.resolve("Government Medical College, Kottayam, Kerala, 686008") is None
+    assert resolver.resolve("Christian Medical College, Ludhiana, Punjab") is None
+
+
+def test_add_indexes_new_college():
+    resolver = CollegeResolver(COLLEGES)
+    assert resolver.resolve("Govt. Medical College Kottayam") is None
+    resolver.add("Government Medical College Kottayam", "kottayam")
+    assert resolver.resolve("Govt. Medical College Kottayam")[0] == "kottayam"
+    assert resolver.resolve("Govt. Medical College, Kozhikode")[0] == "kozhikode"
+    assert len(resolver) == 4
+
+
+def test_word_variants():
+    assert same_word("kozhikode", "kozhikkode")
+    assert same_word("si", "sri")
+    assert not same_word("kozhikode", "kottayam")
+    assert words_conflict({"kozhikode"}, {"kottayam", "kerala"})
+    assert not words_conflict({"kozhikode"}, {"kozhikode", "kerala"})
@@ -0,0 +1,41 @@
+from collegeResolver import CollegeResolver
+from loadOrcrSql import resolve_colleges
+
+
+def orcr_row(institute):
+    return {
+        "year": 2025, "round": 1, "type": "NEET_PG", "exam": "NEET_PG",
+        "institute": institute, "academicProgramName": "MD (General Medicine)",
+        "quota": "All India", "seatType": "Open", "gender": "Gender-Neutral",
+        "openRank": 1, "closeRank": 1,
+    }
+
+
+def test_fuzzy_matches_keep_cities_apart():
+    colleges = {
+        "Government Medical College Kozhikode": "kozhikode",
+        "Government Medical College Kottayam": "kottayam",
+    }
+    records = [orcr_row("Govt. Medical College, Kozhikode, Kerala"),
+               orcr_row("Govt. Medical College, Kottayam, Kerala"),
+               orcr_row("Govt. Medical College, Kozhikode, Kerala")]
+
+    rows, new_colleges = resolve_colleges(
+        records, dict(colleges), "NEET_PG", "t", CollegeResolver(colleges))
+
+    assert [row["collegeId"] for row in rows] == ["kozhikode", "kottayam", "kozhikode"]
+    assert new_colleges == []
+
+
+def test_new_college_is_found_by_later_variants():
+    colleges = {"Government Medical College Kozhikode": "kozhikode"}
+    records = [orcr_row("Government Medical College Kottayam, Kerala"),
+               orcr_row("Govt. Medical College Kottayam, Kerala, 686008"),
+               orcr_row("Govt Medical College Kozhikode, Kerala")]
+
+    rows, new_colleges = resolve_colleges(
+        records, dict(colleges), "NEET_PG", "t", CollegeResolver(colleges))
+
+    assert [c["name"] for c in new_colleges] == ["Government Medical College Kottayam"]
+    assert rows[0]["collegeId"] == rows[1]["collegeId"] == new_colleges[0]["id"]
+    assert rows[2]["collegeId"] == "kozhikode"
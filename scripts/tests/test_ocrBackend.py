@@ -0,0 +1,82 @@
+import os
+import stat
+
+import pytest
+
+import ocrBackend
+from ocrBackend import TesseractCli, get_backend, parse_config, split_pages
+
+
+FAKE_TESSERACT = """#!/usr/bin/env python3
+# Stands in for tesseract: the "OCR text" of an image file is its content.
+# A list file (.txt) OCRs every listed file, separated by form feeds.
+import sys
+source = sys.argv[1]
+with open(source, encoding="utf-8") as f:
+    content = f.read()
+if source.endswith(".txt"):
+    texts = []
+    for path in content.split():
+        with open(path, encoding="utf-8") as f:
+            texts.append(f.read())
+    sys.stdout.write("\\f".join(texts) + "\\f")
+else:
+    sys.stdout.write(content)
+"""
+
+
+@pytest.fixture
+def fake_tesseract(tmp_path):
+    path = tmp_path / "tesseract"
+    path.write_text(FAKE_TESSERACT)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def write_images(tmp_path, texts):
+    paths = []
+    for i, text in enumerate(texts):
+        path = tmp_path / f"page{i}.png"
+        path.write_text(text, encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def test_parse_config():
+    assert parse_config("--psm 7 -c tessedit_char_whitelist=0123456789") == (
+        7, {"tessedit_char_whitelist": "0123456789"})
+    assert parse_config("") == (None, {})
+    with pytest.raises(ValueError):
+        parse_config("--oem 1")
+
+
+def test_split_pages():
+    assert split_pages("a\fb\f", 2) == ["a", "b"]
+    assert split_pages("a\fb", 2) == ["a", "b"]
+    assert split_pages("a\fb\fc", 2) is None
+
+
+def test_cli_batch_is_one_call_in_order(tmp_path, fake_tesseract):
+    backend = TesseractCli(cmd=fake_tesseract)
+    texts = [f"page {i}\n" for i in range(5)]
+    assert backend.ocr_batch(write_images(tmp_path, texts), "--psm 6") == texts
+    assert backend.calls == 1
+    assert backend.ocr_batch([], "--psm 6") == []
+    assert backend.calls == 1
+
+
+def test_cli_batch_falls_back_per_image(tmp_path, fake_tesseract):
+    # A page whose own text holds the separator can't be split back reliably
+    backend = TesseractCli(cmd=fake_tesseract)
+    texts = ["one", "two\fhalf", "three"]
+    assert backend.ocr_batch(write_images(tmp_path, texts)) == texts
+    assert backend.calls == 1 + len(texts)
+
+
+def test_get_backend_is_shared_per_process(monkeypatch):
+    monkeypatch.setattr(ocrBackend, "_backends", {})
+    backend = get_backend("cli")
+    assert isinstance(backend, TesseractCli)
+    assert get_backend("cli") is backend
+    with pytest.raises(ValueError):
+        get_backend("nope")
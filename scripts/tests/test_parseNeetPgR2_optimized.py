@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from generateNeetData import generate
+from parseNeetPgR2_optimized import (
+    PLACEHOLDERS, ROW_INVALID, ROW_NO_DATA, ROW_USE_R1, ROW_USE_R2,
+    clean_text, detect_columns, resolve_table_rows,
+)
+
+
+def per_row(rows):
+    """The iterrows loop resolve_table_rows replaced: detect_columns on every row."""
+    out = []
+    for row in rows.itertuples(index=False):
+        row = list(row)
+        rank = clean_text(row[0])
+        if not rank or not rank.isdigit():
+            out.append((ROW_INVALID, rank))
+            continue
+
+        cols = detect_columns(row)
+        r2_valid = False
+        if cols['r2_institute'] is not None and cols['r2_course'] is not None:
+            institute = clean_text(row[cols['r2_institute']])
+            course = clean_text(row[cols['r2_course']])
+            remarks = clean_text(row[cols['r2_remarks']]) if cols['r2_remarks'] is not None else ""
+            r2_valid = (institute and course and institute not in PLACEHOLDERS
+                        and course not in PLACEHOLDERS and "not opt" not in remarks.lower())
+
+        def pick(name, default):
+            return clean_text(row[cols[name]]) if cols[name] is not None else default
+
+        if r2_valid:
+            out.append((ROW_USE_R2, rank, pick('r2_quota', "All India"), pick('r2_institute', ""),
+                        pick('r2_course', ""), pick('r2_allotted_cat', "Open"),
+                        pick('r2_cand_cat', "General")))
+        elif cols['r1_institute'] is not None and cols['r1_course'] is not None:
+            institute = pick('r1_institute', "")
+            course = pick('r1_course', "")
+            if not institute or not course or institute in PLACEHOLDERS or course in PLACEHOLDERS:
+                out.append((ROW_INVALID, rank))
+            else:
+                out.append((ROW_USE_R1, rank, pick('r1_quota', "All India"), institute, course, "", ""))
+        else:
+            out.append((ROW_NO_DATA, rank))
+    return out
+
+
+def vectorized(rows, layout_cache):
+    out = []
+    for status, rank, *fields in zip(*resolve_table_rows(rows, layout_cache)):
+        out.append((status, rank, *fields) if status in (ROW_USE_R2, ROW_USE_R1) else (status, rank))
+    return out
+
+
+def ragged(body):
+    """Rows as tabula mangles them: lost R2 cells, merged columns, stray breaks."""
+    rows = []
+    for i, row in enumerate(body.values.tolist()):
+        kind = i % 7
+        if kind == 1:
+            row[7:] = [np.nan] * 6
+        elif kind == 2:
+            row = [row[0]] + row[2:] + [None]
+        elif kind == 3:
+            row[0] = int(row[0])
+        elif kind == 4:
+            row[0] = f" {row[0]}\r\n"
+            row[8] = row[8].replace(" ", "\n", 1)
+        elif kind == 5:
+            row[12] = "Not Opted for Upgradation"
+        elif kind == 6:
+            row[1:7] = [None] * 6
+        rows.append(row)
+    rows += [
+        [None] * 13,
+        [0] + ["-"] * 12,
+        ["12.0"] + body.iloc[0, 1:].tolist(),
+        [float("nan")] + body.iloc[1, 1:].tolist(),
+        ["77", "All India", "N/A", "MD (Anatomy)"] + [""] * 9,
+    ]
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture(scope="module")
+def tables():
+    bodies = [table.iloc[1:].reset_index(drop=True)
+              for table in generate(400, seed=7, rows_per_table=60).r2_tables]
+    numeric = bodies[1].copy()
+    numeric[0] = numeric[0].astype(int)
+    float_rank = bodies[2].copy()
+    float_rank[0] = pd.to_numeric(float_rank[0]).where(float_rank.index % 5 != 0)
+    return [
+        # A notes table of the same width first, so no layout gets cached from it
+        pd.DataFrame([["Note"] + ["-"] * 12, ["1", "see", "below"] + [None] * 10]),
+        *bodies,
+        ragged(bodies[3]),
+        numeric,
+        float_rank,
+        # Short tables: fewer rows than the layout sample, and narrower
+        bodies[4].iloc[:3],
+        bodies[5].iloc[:4, [0, 7, 8, 9, 10, 11, 12]].T.reset_index(drop=True).T,
+        bodies[5].iloc[4:9, :5],
+    ]
+
+
+@pytest.mark.parametrize("dtype", [None, "string", "str"])
+def test_resolve_table_rows_matches_per_row_detection(tables, dtype):
+    layout_cache = {}
+    resolved = 0
+    for table in tables:
+        table = table if dtype is None else table.astype(dtype)
+        expected = per_row(table)
+        assert vectorized(table, layout_cache) == expected
+        resolved += sum(row[0] in (ROW_USE_R2, ROW_USE_R1) for row in expected)
+    assert resolved > 300
+    assert 13 in layout_cache
@@ -0,0 +1,204 @@
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pdf2image")
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+
+import ocrBackend
+import scrapIIITD
+from tableGrid import find_tables, ink_mask
+
+
+# Widths of ink blobs the stub backend reads back as words; other widths read as digits
+WORDS = {30: "Category", 40: "GNGNO", 50: "OBGNO", 60: "IIIT", 70: "CSAM", 80: "CSAI", 90: "Without"}
+
+
+class StubBackend:
+    """OCR stand-in: image files read as their text; images read as their blobs' widths."""
+
+    name = "stub"
+
+    def __init__(self, lang="eng"):
+        self.batches = []
+
+    def ocr_batch(self, images, config=""):
+        self.batches.append((config, len(images)))
+        return [self.read(image) for image in images]
+
+    @staticmethod
+    def read(image):
+        if isinstance(image, str):
+            with open(image, encoding="utf-8") as f:
+                return f.read()
+        ink = (np.asarray(image.convert("L")) < 160).any(axis=0)
+        padded = np.concatenate(([False], ink, [False]))
+        edges = np.flatnonzero(padded[1:] != padded[:-1])
+        # Narrow runs are ruling lines, not text
+        widths = [int(end - start) for start, end in zip(edges[::2], edges[1::2]) if end - start >= 8]
+        return " ".join(WORDS.get(w, str(w)) for w in widths) + "\n"
+
+
+@pytest.fixture
+def stub_backend(monkeypatch):
+    monkeypatch.setitem(ocrBackend.BACKENDS, "stub", StubBackend)
+    monkeypatch.setattr(ocrBackend, "_backends", {})
+    return ocrBackend.get_backend("stub")
+
+
+class InlinePool:
+    """ProcessPoolExecutor stand-in that runs the jobs in order in this process."""
+
+    instances = []
+
+    def __init__(self, max_workers, initializer=None):
+        self.max_workers = max_workers
+        self.jobs = []
+        InlinePool.instances.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, fn, jobs):
+        self.jobs = list(jobs)
+        return [fn(job) for job in self.jobs]
+
+
+@pytest.fixture
+def fake_pdf(monkeypatch, stub_backend):
+    """A PDF whose text layer and rendered scanned pages are given per page."""
+    def install(text_layer, scanned_text):
+        def render_page(pdf_path, page, output_folder):
+            path = os.path.join(output_folder, f"page{page}.png")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(scanned_text[page])
+            return path
+
+        InlinePool.instances = []
+        monkeypatch.setattr(scrapIIITD, "pdfinfo_from_path", lambda path: {"Pages": len(text_layer)})
+        monkeypatch.setattr(scrapIIITD, "extract_text_layer", lambda path, count: list(text_layer))
+        monkeypatch.setattr(scrapIIITD, "render_page", render_page)
+        monkeypatch.setattr(scrapIIITD, "ProcessPoolExecutor", InlinePool)
+    return install
+
+
+LAYOUT_PAGE = """\
+                              Without Bonus
+Category            CSAM                   CSAI
+               IIIT       JEE         IIIT       JEE
+              Rank       Rank        Rank       Rank
+OBCWD        12562      109496                        
+OBGND         9871       77936       4814      33753
+"""
+
+
+def test_batches_spread_over_workers(fake_pdf):
+    pages = 6
+    fake_pdf([""] * pages, {p: f"page {p}" for p in range(1, pages + 1)})
+
+    text = scrapIIITD.extract_text_from_pdf("x.pdf", workers=4, backend="stub")
+
+    pool, = InlinePool.instances
+    assert [job[1] for job in pool.jobs] == [[1, 2], [3, 4], [5, 6]]
+    assert pool.max_workers == 3
+    assert text == "".join(f"page {p}\n" for p in range(1, pages + 1))
+
+
+def test_batch_pages_caps_batches_and_one_worker_runs_inline(fake_pdf, stub_backend):
+    fake_pdf([""] * 5, {p: f"page {p}" for p in range(1, 6)})
+
+    text = scrapIIITD.extract_text_from_pdf("x.pdf", workers=1, backend="stub", batch_pages=2)
+
+    assert InlinePool.instances == []
+    assert stub_backend.batches == [("--psm 6", 2), ("--psm 6", 2), ("--psm 6", 1)]
+    assert text.splitlines() == [f"page {p}" for p in range(1, 6)]
+
+
+def test_text_layer_and_ocr_pages_merge_in_page_order(fake_pdf):
+    # Pages 1 and 3 have a text layer, pages 2 and 4 are scanned
+    ocr_page = "GNGNO 135 2288 90 1675\n"
+    fake_pdf([LAYOUT_PAGE, "", LAYOUT_PAGE, ""], {2: ocr_page, 4: "With Bonus\n"})
+
+    text = scrapIIITD.extract_text_from_pdf("x.pdf", workers=2, backend="stub")
+
+    aligned = ["Category IIIT CSAM CSAI", "OBCWD 12562 109496 - -", "OBGND 9871 77936 4814 33753"]
+    lines = [line for line in text.splitlines()
+             if line.split()[:1] in (["Category"], ["OBCWD"], ["OBGND"], ["GNGNO"], ["With"])]
+    assert lines == aligned + ["GNGNO 135 2288 90 1675"] + aligned + ["With Bonus"]
+
+    rows = [(r["seatType"], r["academicProgramName"].split(" (")[0], r["closeRank"])
+            for r in scrapIIITD.parse_table(text)]
+    assert rows == [
+        ("OBC", "Computer Science and Applied Mathematics", "109496"),
+        ("OBGN", "Computer Science and Applied Mathematics", "77936"),
+        ("OBGN", "Computer Science and Artificial Intelligence", "33753"),
+        ("GNGN", "Computer Science and Applied Mathematics", "2288"),
+        ("GNGN", "Computer Science and Artificial Intelligence", "1675"),
+        ("OBC", "Computer Science and Applied Mathematics", "109496"),
+        ("OBGN", "Computer Science and Applied Mathematics", "77936"),
+        ("OBGN", "Computer Science and Artificial Intelligence", "33753"),
+    ]
+
+
+def draw_table_page():
+    """A page with a text line above a ruled table: header row, then two category rows."""
+    image = Image.new("L", (1100, 400), 255)
+    draw = ImageDraw.Draw(image)
+
+    def blob(x, y, width):
+        draw.rectangle((x, y, x + width - 1, y + 19), fill=0)
+
+    blob(100, 30, 90)  # "Without" above the table
+    row_lines, col_lines = [100, 160, 220, 280], [100, 300, 450, 600, 750, 900]
+    for y in row_lines:
+        draw.rectangle((col_lines[0], y, col_lines[-1] + 2, y + 2), fill=0)
+    for x in col_lines:
+        draw.rectangle((x, row_lines[0], x + 2, row_lines[-1] + 2), fill=0)
+
+    cells = [
+        [30, 60, 70, None, 80],  # Category | IIIT | CSAM | | CSAI
+        [40, 12, 25, 33, 41],    # GNGNO 12 25 33 41
+        [50, 14, None, 36, 45],  # OBGNO 14 - 36 45
+    ]
+    for top, row in zip(row_lines, cells):
+        for left, width in zip(col_lines, row):
+            if width:
+                blob(left + 20, top + 20, width)
+    return image
+
+
+def test_find_tables_on_ruled_page():
+    tables = find_tables(ink_mask(draw_table_page()))
+    assert len(tables) == 1
+    table, = tables
+    assert len(table.rows) == 3
+    assert len(table.cols) == 5
+
+
+def test_cells_ocr_feeds_parse_table(stub_backend):
+    text = scrapIIITD.ocr_page_cells(draw_table_page(), stub_backend)
+
+    assert text.splitlines() == [
+        "Without",
+        "Category IIIT CSAM CSAI",
+        "GNGNO 12 25 33 41",
+        "OBGNO 14 - 36 45",
+    ]
+    # Category cells in one batch, rank rows stitched into one digits-only batch
+    configs = [config for config, _ in stub_backend.batches]
+    assert configs.count(scrapIIITD.DIGITS_CONFIG) == 2  # rows, then (empty) per-cell retries
+    assert (scrapIIITD.LINE_CONFIG, 3) in stub_backend.batches
+    assert (scrapIIITD.DIGITS_CONFIG, 2) in stub_backend.batches
+
+    rows = [(r["seatType"], r["academicProgramName"].split(" (")[0], r["closeRank"])
+            for r in scrapIIITD.parse_table(text)]
+    assert rows == [
+        ("GNGN", "Computer Science and Applied Mathematics", "25"),
+        ("GNGN", "Computer Science and Artificial Intelligence", "41"),
+        ("OBGN", "Computer Science and Artificial Intelligence", "45"),
+    ]